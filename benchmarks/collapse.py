@@ -0,0 +1,72 @@
+"""Benchmark the array collapse against the list reference.
+
+Usage:
+    python -m benchmarks.collapse
+"""
+import random
+from timeit import default_timer as timer
+
+import numpy as np
+
+from utils.list_utils import collapse
+from utils.list_utils import collapse_codes
+from utils.list_utils import collapse_list
+
+SAMPLE_COUNTS = (360, 1000, 2500, 5000)
+CENTER_COLOR = 'white'
+COLORS = ('red', 'orange', 'yellow', 'green', 'blue', 'purple', 'black')
+
+
+def ring(samples, dashes=18, noise=0.05):
+    """Return the colors sampled around a dashed ring with some misreads."""
+    colors = []
+
+    for sample in range(samples):
+        dash = sample * dashes * 2 // samples
+        color = CENTER_COLOR if dash % 2 else COLORS[dash // 2 % len(COLORS)]
+
+        if random.random() < noise:
+            color = random.choice(COLORS)
+
+        colors.append(color)
+
+    # Start the ring part way through a dash.
+    start = random.randrange(samples)
+
+    return colors[start:] + colors[:start]
+
+
+def benchmark(function, rings, center):
+    """Return the average time per ring in milliseconds and the results."""
+    start = timer()
+    results = [function(colors, center) for colors in rings]
+
+    return (timer() - start) / len(rings) * 1000, results
+
+
+def main():
+    random.seed(0)
+
+    for samples in SAMPLE_COUNTS:
+        rings = [ring(samples) for _ in range(20)]
+        numbers = {
+            color: number
+            for number, color in enumerate((CENTER_COLOR,) + COLORS)
+        }
+        codes = [
+            np.array([numbers[color] for color in colors]) for colors in rings
+        ]
+        center_code = numbers[CENTER_COLOR]
+
+        list_time, expected = benchmark(collapse_list, rings, CENTER_COLOR)
+        collapse_time, actual = benchmark(collapse, rings, CENTER_COLOR)
+        codes_time, _ = benchmark(collapse_codes, codes, center_code)
+
+        assert expected == actual
+        print(f'{samples} samples: collapse_list {list_time:.3f}ms, '
+              f'collapse {collapse_time:.3f}ms, '
+              f'collapse_codes {codes_time:.3f}ms')
+
+
+if __name__ == '__main__':
+    main()
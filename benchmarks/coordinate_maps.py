@@ -0,0 +1,42 @@
+"""Compare the detection latency of the ring coordinate maps.
+
+Usage:
+    python -m benchmarks.coordinate_maps [image directory]
+"""
+import os
+import sys
+from timeit import default_timer as timer
+
+from object.coordinate_maps.dashed_ring_map import DashedRingMap
+from object.coordinate_maps.polar_ring_map import PolarRingMap
+from object.detector import Detector
+from object.image import Image
+from object.product import ProductException
+
+COORDINATE_MAPS = (DashedRingMap, PolarRingMap)
+
+
+def detect(image, coordinate_map):
+    """Return the detected product name, or None if nothing was found."""
+    try:
+        return Detector(image, coordinate_map).detect_product()
+    except ProductException:
+        return None
+
+
+def main(image_dir):
+    paths = [
+        os.path.join(image_dir, name) for name in sorted(os.listdir(image_dir))
+    ]
+    images = [Image(path) for path in paths]
+
+    for coordinate_map in COORDINATE_MAPS:
+        start = timer()
+        found = sum(1 for image in images if detect(image, coordinate_map))
+        total = (timer() - start) / len(images) * 1000
+        print(f'{coordinate_map.__name__}: {total:.1f}ms per image, '
+              f'{found}/{len(images)} detected')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'tests/test_images')
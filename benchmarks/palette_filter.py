@@ -0,0 +1,69 @@
+"""Compare the palette filter with the median filter and the RAG merge filter.
+
+Each filter is timed over opening and filtering every image, then the
+products are detected in the filtered images.
+
+Usage:
+    python -m benchmarks.palette_filter [image directory]
+"""
+import os
+import sys
+import warnings
+from timeit import default_timer as timer
+
+from object.detector import Detector
+from object.image import Image
+from object.product import ProductException
+
+REPEATS = 5
+
+FILTERS = {
+    'median + sharpen': {},
+    'palette': {
+        'quantize': True
+    },
+    'rag merge': {
+        'merge_filter': True
+    },
+    'rag merge at 128px': {
+        'merge_filter': True,
+        'merge_size': 128
+    },
+}
+
+
+def detect(path, options):
+    """Return the product name and the seconds spent opening the image."""
+    start = timer()
+    image = Image(path, **options)
+    seconds = timer() - start
+
+    try:
+        product_name = Detector(image).detect_product()
+    except ProductException:
+        product_name = None
+
+    return product_name, seconds
+
+
+def main(image_dir):
+    warnings.simplefilter('ignore')
+    paths = [
+        os.path.join(image_dir, name) for name in sorted(os.listdir(image_dir))
+    ]
+
+    for name, options in FILTERS.items():
+        # The RAG merge filter is too slow to repeat.
+        repeats = 1 if options.get('merge_filter') else REPEATS
+        results = [
+            detect(path, options) for _ in range(repeats) for path in paths
+        ]
+        seconds = sum(result[1] for result in results) / len(results)
+        found = sum(1 for result in results[:len(paths)] if result[0])
+
+        print(f'{name}: {seconds * 1000:.1f}ms per image, '
+              f'{found}/{len(paths)} detected')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'tests/test_images')
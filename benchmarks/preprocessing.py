@@ -0,0 +1,130 @@
+"""Compare the PIL and array preprocessing pipelines, stage by stage.
+
+The peak memory of each pipeline is measured in a fresh process, as the
+growth of its peak resident set size once the peak is reset after the
+imports. Resetting the peak needs Linux.
+
+Usage:
+    python -m benchmarks.preprocessing [image path] [scale]
+"""
+import io
+import sys
+import multiprocessing
+from timeit import default_timer as timer
+
+import numpy as np
+from PIL import Image
+
+from image_filters.filters import median_filter
+from image_filters.filters import median_sharpen_filter
+from image_filters.filters import sharpen
+from image_filters.filters import to_array
+
+REPEATS = 20
+
+
+def load(image_path, scale):
+    """Return the image encoded as PNG bytes, scaled up by a whole factor."""
+    image = Image.open(image_path)
+    image = image.resize((image.size[0] * scale, image.size[1] * scale),
+                         Image.NEAREST)
+    encoded = io.BytesIO()
+    image.save(encoded, 'PNG')
+
+    return encoded.getvalue()
+
+
+def pil_pipeline(encoded):
+    """Run the PIL pipeline, returning the time of each stage and the array."""
+    start = timer()
+    image = Image.open(io.BytesIO(encoded))
+    image.load()
+    decoded = timer()
+    image = median_filter.__wrapped__(image)
+    median = timer()
+    image = sharpen.__wrapped__(image)
+    sharpened = timer()
+    pixels = np.asarray(image)
+    sampled = timer()
+
+    return {
+        'decode': decoded - start,
+        'median': median - decoded,
+        'sharpen': sharpened - median,
+        'to sampler': sampled - sharpened,
+    }, pixels
+
+
+def array_pipeline(encoded):
+    """Run the array pipeline, returning the time of each stage and the array."""
+    start = timer()
+    pixels = to_array(Image.open(io.BytesIO(encoded)))
+    decoded = timer()
+    pixels = median_sharpen_filter.__wrapped__(pixels)
+    filtered = timer()
+    pixels = np.asarray(pixels)
+    sampled = timer()
+
+    return {
+        'decode': decoded - start,
+        'median + sharpen': filtered - decoded,
+        'to sampler': sampled - filtered,
+    }, pixels
+
+
+PIPELINES = {'pil': pil_pipeline, 'array': array_pipeline}
+
+
+def resident_memory(field):
+    """Return a resident set size of this process from /proc in KiB."""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(f'{field}:'):
+                return int(line.split()[1])
+
+    return 0
+
+
+def peak_memory(name, encoded):
+    """Return how much a pipeline raises the peak resident set size in KiB."""
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+
+    before = resident_memory('VmRSS')
+    PIPELINES[name](encoded)
+
+    return resident_memory('VmHWM') - before
+
+
+def main(image_path, scale):
+    encoded = load(image_path, scale)
+    results = {}
+
+    for name, pipeline in PIPELINES.items():
+        timings = {}
+
+        for _ in range(REPEATS):
+            stages, results[name] = pipeline(encoded)
+
+            for stage, seconds in stages.items():
+                timings[stage] = timings.get(stage, 0) + seconds
+
+        spawn = multiprocessing.get_context('spawn')
+        with spawn.Pool(1) as pool:
+            memory = pool.apply(peak_memory, (name, encoded))
+
+        total = sum(timings.values()) / REPEATS * 1000
+        stages = ', '.join(f'{stage} {seconds / REPEATS * 1000:.2f}ms'
+                           for stage, seconds in timings.items())
+        print(f'{name}: {total:.2f}ms ({stages}), peak memory +{memory}KiB')
+
+    assert np.array_equal(results['pil'], results['array'])
+    shape = results['array'].shape
+    print(f'{shape[1]}x{shape[0]} pixels, identical output')
+
+
+if __name__ == '__main__':
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else
+        'tests/test_images/circle_thick_18_square_all_colors.png',
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1)
@@ -0,0 +1,78 @@
+"""Benchmark the approximate product matcher against `Product.check_similar`.
+
+Usage:
+    python -m benchmarks.product_matching [number of products]
+"""
+import sys
+import random
+from timeit import default_timer as timer
+
+from object.product import Product
+from utils.approximate_matcher import ApproximateMatcher
+
+COLORS = '012345678'
+
+
+def random_code(length):
+    """Return a random product code."""
+    return ''.join(random.choice(COLORS) for _ in range(length))
+
+
+def scan(code, edits):
+    """Return a random rotation of the code with a number of random edits."""
+    rotation = random.randrange(len(code))
+    scanned = list(code[rotation:] + code[:rotation])
+
+    for _ in range(edits):
+        index = random.randrange(len(scanned))
+        edit = random.random()
+
+        if edit < 0.33:
+            del scanned[index]
+        elif edit < 0.66:
+            scanned.insert(index, random.choice(COLORS))
+        else:
+            scanned[index] = random.choice(COLORS)
+
+    return ''.join(scanned)
+
+
+def benchmark(match, queries):
+    """Return the average time per query in milliseconds and the results."""
+    start = timer()
+    results = [match(query) for query in queries]
+
+    return (timer() - start) / len(queries) * 1000, results
+
+
+def main(product_count):
+    random.seed(0)
+    products = {
+        random_code(random.choice((18, 36, 50))): f'product-{index}'
+        for index in range(product_count)
+    }
+    codes = list(products)
+    queries = [scan(random.choice(codes), edits) for edits in (0, 1, 2) * 100]
+
+    start = timer()
+    matcher = ApproximateMatcher(products)
+    print(f'Indexed {len(matcher)} products in '
+          f'{(timer() - start) * 1000:.1f}ms')
+
+    matcher_time, matches = benchmark(matcher.match, queries)
+    found = sum(1 for match, _ in matches if match)
+    print(f'ApproximateMatcher: {matcher_time:.3f}ms per query, '
+          f'{found}/{len(queries)} matched')
+
+    # The reference implementation is far too slow for the full catalogue, so
+    # it only runs on a sample of the queries.
+    sample = queries[::60]
+    reference_time, references = benchmark(
+        lambda query: Product.check_similar(query, products), sample)
+    found = sum(1 for match, _ in references if match)
+    print(f'Product.check_similar: {reference_time:.3f}ms per query, '
+          f'{found}/{len(sample)} matched')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,64 @@
+"""Compare the RAG merge filter at full resolution with the downscaled one.
+
+Each working size is timed over opening and filtering every image. Its
+accuracy is the share of pixels given the same color code as the full
+resolution filter, and the products detected.
+
+Usage:
+    python -m benchmarks.rag_merge [image directory] [working sizes...]
+"""
+import os
+import sys
+import warnings
+from timeit import default_timer as timer
+
+from object.detector import Detector
+from object.image import Image
+from object.product import ProductException
+from utils.color_tables import lookup_color_codes
+
+WORKING_SIZES = (256, 128, 96, 64)
+
+
+def filter_image(path, working_size):
+    """Return the filtered image, the seconds it took and the product."""
+    start = timer()
+    image = Image(path, merge_filter=True, merge_size=working_size)
+    seconds = timer() - start
+
+    try:
+        product_name = Detector(image).detect_product()
+    except ProductException:
+        product_name = None
+
+    return image, seconds, product_name
+
+
+def main(image_dir, working_sizes):
+    warnings.simplefilter('ignore')
+    paths = [
+        os.path.join(image_dir, name) for name in sorted(os.listdir(image_dir))
+    ]
+    full = [filter_image(path, None) for path in paths]
+
+    for working_size in (None,) + tuple(working_sizes):
+        results = full if working_size is None else [
+            filter_image(path, working_size) for path in paths
+        ]
+        seconds = sum(result[1] for result in results) / len(paths)
+        agreement = sum((lookup_color_codes(result[0].image[..., :3]) ==
+                         lookup_color_codes(expected[0].image[..., :3])).mean()
+                        for result, expected in zip(results, full)) / len(paths)
+        found = sum(1 for result in results if result[2])
+        same = sum(1 for result, expected in zip(results, full)
+                   if result[2] == expected[2])
+
+        print(f'working size {working_size or "full"}: '
+              f'{seconds * 1000:.0f}ms per image, {agreement:.1%} of pixels '
+              f'the same color, {found}/{len(paths)} detected, '
+              f'{same}/{len(paths)} the same product as full size')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'tests/test_images',
+         [int(size) for size in sys.argv[2:]] or WORKING_SIZES)
@@ -0,0 +1,66 @@
+"""Compare filtering the whole image with filtering only the rings sampled.
+
+The whole image is filtered when it's opened, the rings are filtered as the
+detector reaches them, so both the opening and the detection are timed.
+
+Usage:
+    python -m benchmarks.roi_filter [image directory]
+"""
+import os
+import sys
+from timeit import default_timer as timer
+
+from object.detector import Detector
+from object.image import Image
+from object.localizer import RadialLocalizer
+from object.product import ProductException
+
+REPEATS = 5
+
+
+def detect(path, roi):
+    """Return the product name, the share of the image that was filtered and
+    the time spent opening the image and detecting the product."""
+    start = timer()
+    image = Image(path, roi=roi)
+    opened = timer()
+
+    try:
+        product_name = Detector(
+            image, localizer=RadialLocalizer).detect_product()
+    except ProductException:
+        product_name = None
+
+    filtered = image.preprocessor.roi_tiles.mean() if roi else 1
+
+    return product_name, filtered, opened - start, timer() - opened
+
+
+def main(image_dir):
+    paths = [
+        os.path.join(image_dir, name) for name in sorted(os.listdir(image_dir))
+    ]
+    results = {}
+
+    for roi in (False, True):
+        opening = detecting = 0
+
+        for _ in range(REPEATS):
+            results[roi] = [detect(path, roi) for path in paths]
+            opening += sum(result[2] for result in results[roi])
+            detecting += sum(result[3] for result in results[roi])
+
+        runs = REPEATS * len(paths)
+        filtered = sum(result[1] for result in results[roi]) / len(paths)
+        found = sum(1 for result in results[roi] if result[0])
+        print(f'roi={roi}: open {opening / runs * 1000:.1f}ms + detect '
+              f'{detecting / runs * 1000:.1f}ms per image, {filtered:.0%} of '
+              f'the image filtered, {found}/{len(paths)} detected')
+
+    assert [result[0] for result in results[False]] == [
+        result[0] for result in results[True]
+    ]
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'tests/test_images')
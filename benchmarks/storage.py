@@ -0,0 +1,60 @@
+"""Compare reading the uploaded images through the disk with reading them
+from memory.
+
+Each image is downloaded from an in-memory storage, so no network is
+involved. It's either written to disk and opened from there, as the app
+used to, or opened straight from the downloaded buffer.
+
+Usage:
+    python -m benchmarks.storage [image directory]
+"""
+import os
+import sys
+import tempfile
+from timeit import default_timer as timer
+
+from object.image import Image
+from object.storage import MemoryStorage
+
+REPEATS = 5
+
+
+def through_disk(storage, path, directory):
+    """Download the image to a file, open it, then remove the file."""
+    file_path = os.path.join(directory, os.path.basename(path))
+
+    with open(file_path, 'wb') as f:
+        storage.download(path, f)
+
+    image = Image(file_path)
+    os.remove(file_path)
+
+    return image
+
+
+def in_memory(storage, path, directory):  #pylint: disable=unused-argument
+    """Download the image into memory and open it from there."""
+    return Image(storage.open(path))
+
+
+def main(image_dir):
+    storage = MemoryStorage()
+
+    for name in sorted(os.listdir(image_dir)):
+        with open(os.path.join(image_dir, name), 'rb') as f:
+            storage.upload(name, f.read())
+
+    with tempfile.TemporaryDirectory() as directory:
+        for read in (through_disk, in_memory):
+            start = timer()
+
+            for _ in range(REPEATS):
+                for path in storage.files:
+                    read(storage, path, directory)
+
+            seconds = (timer() - start) / (REPEATS * len(storage.files))
+            print(f'{read.__name__}: {seconds * 1000:.2f}ms per image')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'tests/test_images')
@@ -3,6 +3,9 @@ import json
 from pathlib import Path
 from multiprocessing import Lock
 
+from utils.rotation_index import RotationIndex
+from utils.approximate_matcher import ApproximateMatcher
+
 OBJECT_DIR = os.getcwd()
 LOCK = Lock()
 
@@ -136,8 +139,68 @@ def load_config(file_name):
 
 PRODUCT_MAP = load_config('product_map.json')
 
+PRODUCT_INDEX = RotationIndex(PRODUCT_MAP)
+
+PRODUCT_MATCHER = ApproximateMatcher(PRODUCT_MAP)
+
 COLOR_CODE_MAP = load_config('color_code_map.json')
 
 COLOR_RANGE_MAP = generate_color_range_map()
 
+# The saturation and brightness limits for the colors that aren't named by hue.
+COLOR_THRESHOLDS = {
+    'black_brightness': 0.20,
+    'white_saturation': 0.09,
+    'white_brightness': 0.8,
+    'dark_grey_saturation': 0.25,
+    'dark_grey_brightness': 0.40,
+    'light_grey_saturation': 0.15,
+    'light_grey_brightness': 0.80
+}
+
+CACHE_DIR = os.path.join(OBJECT_DIR, 'cache')
+
+# The number of threads to search the candidate rings on, 0 searches them
+# one at a time.
+DETECTOR_WORKERS = int(os.environ.get('DETECTOR_WORKERS', 0))
+
+# Whether the app applies the RAG merge filter, the number of processes it
+# runs on and the seconds each image gets before the median filter and
+# sharpen are used instead.
+MERGE_FILTER = os.environ.get('MERGE_FILTER', '') == 'true'
+FILTER_WORKERS = int(os.environ.get('FILTER_WORKERS', 1))
+FILTER_DEADLINE = float(os.environ.get('FILTER_DEADLINE', 2))
+
+# Whether the app measures the quality of each image to choose its filters,
+# the RAG merge filter included, instead of MERGE_FILTER.
+AUTO_FILTER = os.environ.get('AUTO_FILTER', '') == 'true'
+
+# The seconds each image gets, from when it's opened, to find a product by
+# escalating through the filters. Without it every filter is applied up front.
+DETECTION_BUDGET = (float(os.environ['DETECTION_BUDGET'])
+                    if os.environ.get('DETECTION_BUDGET') else None)
+
+# The longest side the uploaded images are decoded at, 0 decodes them at
+# full size. JPEG images are decoded straight at a reduced scale.
+WORKING_SIZE = int(os.environ.get('WORKING_SIZE', 384))
+
+# Whether the app crops the uploaded images around the ring before they are
+# filtered.
+CROP_IMAGES = os.environ.get('CROP_IMAGES', '') == 'true'
+
+# The directory the app reads the uploaded images from, instead of Firebase.
+STORAGE_DIR = os.environ.get('STORAGE_DIR')
+
+# The image formats the app accepts uploads in, by extension. An upload
+# without one is a PNG.
+UPLOAD_EXTENSIONS = ('.png', '.jpg', '.webp')
+
+# The images are handed to the filter processes through files here, which
+# are only held in memory where /dev/shm is available.
+SHARED_MEMORY_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# The ring templates for photos of these aspect ratios, decoded at the
+# working size, are built when the app starts.
+COMMON_ASPECT_RATIOS = [(1, 1), (4, 3), (3, 4), (16, 9), (9, 16)]
+
 CREDENTIALS_FILE = save_credentials_file('configs/cloud_credentials.ejson')
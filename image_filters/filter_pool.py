@@ -0,0 +1,170 @@
+import os
+import multiprocessing
+import tempfile
+from threading import Lock
+from threading import Thread
+from timeit import default_timer as timer
+import numpy as np
+
+from configs.config import FILTER_WORKERS
+from configs.config import SHARED_MEMORY_DIR
+from image_filters import filters
+from utils.logging_utils import logger
+
+LOGGER = logger('object')
+
+# The filters that can be run in the pool, by name, so that only the name
+# has to be sent to the processes.
+POOL_FILTERS = ('rag_merge_filter', 'rag_merge_multiscale')
+
+
+def filter_shared(path, shape, filter_name, kwargs):
+    """Filter an RGB image array held in a shared file, in place.
+
+    Runs in the pool processes.
+
+    Args:
+        path (str): The path to the file holding the array.
+        shape (Tuple[int, int, int]): The shape of the array.
+        filter_name (str): The name of the filter in `image_filters.filters`.
+        kwargs (dict): The keyword arguments for the filter.
+    """
+    pixels = np.memmap(path, dtype=np.uint8, mode='r+', shape=shape)
+    filtered = getattr(filters, filter_name)(filters.Image.fromarray(
+        np.array(pixels)), **kwargs)
+    pixels[:] = filters.to_array(filtered)
+    pixels.flush()
+
+
+def warm(_):
+    """Load the filters in a pool process before the first image arrives.
+
+    Returns:
+        int: The process ID.
+    """
+    return os.getpid()
+
+
+class FilterPool:
+    """A warm pool of processes to run the heavy filters with a deadline.
+
+    The image arrays are passed through a memory mapped file rather than
+    pickled, and the filtered array is written back to the same file. A call
+    that misses its deadline can't be interrupted, so the whole pool is
+    terminated to free the process and started again, in the background.
+    Until it's running again every call misses its deadline straight away.
+    """
+
+    def __init__(self, workers=FILTER_WORKERS, shared_dir=SHARED_MEMORY_DIR):
+        self.workers = workers
+        self.shared_dir = shared_dir
+        self.pool = None
+        self.lock = Lock()
+
+    def start(self):
+        """Start the processes if they aren't running, and wait for them.
+
+        The processes are spawned rather than forked, as forking a process
+        that's running threads can copy locks that are held. The pool is
+        only made available once every process has loaded the filters.
+
+        Returns:
+            multiprocessing.pool.Pool: The pool.
+        """
+        with self.lock:
+            if self.pool is None:
+                pool = multiprocessing.get_context('spawn').Pool(self.workers)
+                pool.map(warm, range(self.workers), chunksize=1)
+                self.pool = pool
+
+            return self.pool
+
+    def start_in_background(self):
+        """Start the processes without waiting for them."""
+        Thread(target=self.start, daemon=True).start()
+
+    def stop(self):
+        """Terminate the processes, even in the middle of a filter."""
+        with self.lock:
+            if self.pool is not None:
+                self.pool.terminate()
+                self.pool.join()
+                self.pool = None
+
+    def discard(self, pool):
+        """Stop sending filters to a pool and replace it in the background.
+
+        Args:
+            pool (multiprocessing.pool.Pool): The pool, which is left alone
+                if it was already replaced.
+        """
+        with self.lock:
+            if self.pool is not pool:
+                return
+
+            self.pool = None
+
+        Thread(target=self.replace, args=(pool,), daemon=True).start()
+
+    def replace(self, pool):
+        """Terminate a pool, then start a new one.
+
+        Args:
+            pool (multiprocessing.pool.Pool): The pool to terminate.
+        """
+        pool.terminate()
+        pool.join()
+        self.start()
+
+    def run(self, filter_name, pixels, deadline, **kwargs):
+        """Filter an image array in the pool.
+
+        Args:
+            filter_name (str): One of `POOL_FILTERS`.
+            pixels (numpy.ndarray): The uint8 RGB image array.
+            deadline (float): The seconds the filter may take, copying the
+                image to and from the processes included.
+            **kwargs: The keyword arguments for the filter.
+
+        Returns:
+            numpy.ndarray: The filtered image array, or None if the filter
+                failed or missed its deadline.
+        """
+        if filter_name not in POOL_FILTERS:
+            raise ValueError(f'{filter_name} can\'t be run in the pool.')
+
+        start = timer()
+        pool = self.pool
+
+        # Starting the processes takes longer than any deadline, so the image
+        # isn't held up waiting for them.
+        if pool is None:
+            LOGGER.warning('The filter pool isn\'t running for %s.',
+                           filter_name)
+            self.start_in_background()
+            return None
+
+        with tempfile.NamedTemporaryFile(dir=self.shared_dir) as shared:
+            shared_pixels = np.memmap(
+                shared.name, dtype=np.uint8, mode='w+', shape=pixels.shape)
+            shared_pixels[:] = pixels
+            shared_pixels.flush()
+
+            try:
+                pool.apply_async(
+                    filter_shared,
+                    (shared.name, pixels.shape, filter_name, kwargs)).get(
+                        max(deadline - (timer() - start), 0))
+            except multiprocessing.TimeoutError:
+                LOGGER.warning('%s missed its %ss deadline.', filter_name,
+                               deadline)
+                self.discard(pool)
+                return None
+            except Exception as exception:  #pylint: disable=broad-except
+                LOGGER.warning('%s failed: %r', filter_name, exception)
+                return None
+
+            return np.array(shared_pixels)
+
+
+FILTER_POOL = FilterPool()
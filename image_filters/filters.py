@@ -1,14 +1,39 @@
 import sys
 import warnings
+from functools import lru_cache
 import cv2
 import numpy as np
+import webcolors
 from skimage import segmentation
-from skimage import color
 from skimage.future import graph
 from profilehooks import timecall
 from PIL.ImageFilter import SHARPEN
 from PIL import Image
 
+from utils.color_tables import lookup_color_codes
+from utils.color_utils import COLOR_CODES
+
+# PIL's SHARPEN kernel, applied with the same integer rounding as PIL.
+SHARPEN_SIZE, SHARPEN_SCALE, SHARPEN_OFFSET, _SHARPEN_WEIGHTS = SHARPEN.filterargs
+SHARPEN_KERNEL = np.array(
+    _SHARPEN_WEIGHTS, dtype=np.float32).reshape(SHARPEN_SIZE)
+SHARPEN_BAND_ROWS = 64
+
+# The overhead of filtering a block of border tiles, as the number of pixels
+# that could be filtered in the same time.
+TILE_BLOCK_COST = 3000
+# How many pixels of the whole image could be filtered in the time it takes
+# to gather, filter and write back a pixel of a tile.
+TILE_PIXEL_COST = 1.6
+
+# The longest side the multi-resolution RAG merge filter segments images at.
+RAG_WORKING_SIZE = 128
+
+# The color code of pixels that aren't any color of the palette.
+NO_COLOR = 255
+# The palette colors follow a shade of each color code at every brightness.
+PALETTE_ROWS = (NO_COLOR + 1) * 256
+
 
 def _weight_mean_color(graph, src, dst, n):  #pylint: disable=unused-argument
     """Callback to handle merging nodes by recomputing mean color.
@@ -47,12 +72,62 @@ def merge_mean_color(graph, src, dst):
         graph.node[dst]['total color'] / graph.node[dst]['pixel count'])
 
 
+def rag_merge_labels(pixels, filter_level=100):
+    """Segment an image and merge the segments of similar mean color.
+
+    Args:
+        pixels (numpy.ndarray): The RGB image array.
+        filter_level (int): The amount of merging that should be applied.
+
+    Returns:
+        numpy.ndarray: The merged segment label of each pixel.
+    """
+    labels = segmentation.slic(pixels, compactness=30, n_segments=640)
+    g = graph.rag_mean_color(pixels, labels)
+
+    return graph.merge_hierarchical(
+        labels,
+        g,
+        thresh=filter_level,
+        rag_copy=False,
+        in_place_merge=True,
+        merge_func=merge_mean_color,
+        weight_func=_weight_mean_color)
+
+
+def label_means(pixels, labels):
+    """Replace every pixel with the mean color of its label.
+
+    The means are truncated to integers, the same as
+    `color.label2rgb(kind='avg')` does for uint8 images, but every label is
+    averaged at once rather than one at a time.
+
+    Args:
+        pixels (numpy.ndarray): The image array.
+        labels (numpy.ndarray): The non-negative label of each pixel.
+
+    Returns:
+        numpy.ndarray: The image array of mean colors.
+    """
+    labels = labels.ravel()
+    channels = pixels.reshape(len(labels), -1)
+    counts = np.maximum(np.bincount(labels), 1)
+    means = np.stack(
+        [
+            np.bincount(labels, weights=channel) / counts
+            for channel in channels.T
+        ],
+        axis=1)
+
+    return means.astype(pixels.dtype)[labels].reshape(pixels.shape)
+
+
 @timecall
 def rag_merge_filter(image, filter_level=100):
     """Use the RAG merge filter algorithm to consolidate local pixel colors.
 
     Notes:
-        The imput image must be RGB or this won't work.
+        Images that aren't RGB are converted to it first.
 
     Args:
         image (numpy.ndarray): The image to filter.
@@ -61,25 +136,51 @@ def rag_merge_filter(image, filter_level=100):
     Returns:
         numpy.ndarray: The filtered image.
     """
-    if image.mode == 'RGBA':
-        image = rgba_to_rgb(image)
+    image = to_rgb(image)
 
     image = np.asarray(image)
-    labels = segmentation.slic(image, compactness=30, n_segments=640)
-    g = graph.rag_mean_color(image, labels)
+    labels2 = rag_merge_labels(image, filter_level)
 
-    labels2 = graph.merge_hierarchical(
-        labels,
-        g,
-        thresh=filter_level,
-        rag_copy=False,
-        in_place_merge=True,
-        merge_func=merge_mean_color,
-        weight_func=_weight_mean_color)
+    return Image.fromarray(label_means(image, labels2))
 
-    image = color.label2rgb(labels2, image, kind='avg')
 
-    return Image.fromarray(image)
+@timecall
+def rag_merge_multiscale(image, working_size=RAG_WORKING_SIZE,
+                         filter_level=100):
+    """Use the RAG merge filter on a downscaled copy of an image.
+
+    The image is segmented and merged at the working size, then the merged
+    labels are scaled back up to the full image and each full resolution
+    pixel takes the mean color of its label. Images that are already
+    smaller than the working size are merged at full resolution.
+
+    Args:
+        image (Image): The image to filter.
+        working_size (int): The longest side to segment the image at.
+        filter_level (int): The amount of merging that should be applied.
+
+    Returns:
+        Image: The filtered image.
+    """
+    pixels = np.asarray(to_rgb(image))
+    height, width = pixels.shape[:2]
+    scale = working_size / max(width, height)
+
+    if scale >= 1:
+        return Image.fromarray(
+            label_means(pixels, rag_merge_labels(pixels, filter_level)))
+
+    small = cv2.resize(  #pylint: disable=no-member
+        pixels, (max(int(width * scale), 1), max(int(height * scale), 1)),
+        interpolation=cv2.INTER_AREA)  #pylint: disable=no-member
+    labels = rag_merge_labels(small, filter_level)
+
+    # Each full resolution pixel takes the label of the pixel it shrank into.
+    rows = np.arange(height) * labels.shape[0] // height
+    columns = np.arange(width) * labels.shape[1] // width
+
+    return Image.fromarray(
+        label_means(pixels, labels[rows[:, None], columns[None, :]]))
 
 
 @timecall
@@ -124,6 +225,510 @@ def sharpen(image, sharpness=1):
     return image
 
 
+def to_array(image):
+    """Decode an image into a contiguous uint8 RGB or RGBA array.
+
+    Images in any other mode are converted to RGBA first, like the median
+    filter does for black and white images.
+
+    Args:
+        image (Image): The image to decode.
+
+    Returns:
+        numpy.ndarray: The height x width x channels array.
+    """
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+
+    return np.ascontiguousarray(np.asarray(image), dtype=np.uint8)
+
+
+@lru_cache(maxsize=None)
+def palette_colors():
+    """Get the RGB color that stands for each color code of the palette.
+
+    Each color takes the CSS value of its name, which is classified as that
+    same color.
+
+    Returns:
+        numpy.ndarray: The RGB value of each color code, indexed by code.
+    """
+    colors = np.zeros((NO_COLOR + 1, 3), dtype=np.uint8)
+
+    for name, code in COLOR_CODES.items():
+        colors[code] = webcolors.name_to_rgb(name)
+
+    colors.setflags(write=False)
+
+    return colors
+
+
+@lru_cache(maxsize=None)
+def palette_shades():
+    """Get each palette color at every brightness.
+
+    The brightness is the value of the brightest channel. The black, white
+    and grey colors are all shaded as the grey of that brightness. The
+    palette colors themselves follow the shades, so a pixel can be given
+    either with a single lookup.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]: The RGB values, indexed by
+            `code * 256 + brightness` for the shades or by `PALETTE_ROWS +
+            code` for the palette colors, and whether each shade is still
+            classified as its color code.
+    """
+    colors = palette_colors().astype(float)
+    brightest = colors.max(axis=1, keepdims=True)
+    scales = np.divide(
+        colors,
+        brightest,
+        out=np.ones_like(colors),
+        where=colors.min(axis=1, keepdims=True) < brightest)
+    shades = np.round(scales[:, None, :] * np.arange(256)[None, :, None])
+    shades = shades.astype(np.uint8)
+    valid = lookup_color_codes(shades) == np.arange(NO_COLOR + 1)[:, None]
+
+    table = np.concatenate((shades.reshape(-1, 3), palette_colors()))
+    table.setflags(write=False)
+    valid = valid.ravel()
+    valid.setflags(write=False)
+
+    return table, valid
+
+
+def mode_filter(codes, size=3):
+    """Replace each color code with the most common code around it.
+
+    The codes are counted with a box filter for each code present, and a tie
+    is settled in favour of the pixel's own code, then the lowest code.
+
+    Args:
+        codes (numpy.ndarray): The 2D uint8 color codes.
+        size (int): The side of the square neighbourhood.
+
+    Returns:
+        numpy.ndarray: The most common code around each pixel.
+    """
+    present = np.flatnonzero(np.bincount(codes.ravel()))
+    best = np.zeros(codes.shape, dtype=np.uint16)
+    mode = np.full(codes.shape, present[0], dtype=np.uint8)
+
+    for code in present.tolist():
+        matches = (codes == code).astype(np.uint16)
+        # Counting every vote twice leaves the pixel's own vote to settle ties.
+        votes = cv2.boxFilter(  #pylint: disable=no-member
+            matches,
+            -1, (size, size),
+            normalize=False,
+            borderType=cv2.BORDER_REPLICATE) * 2 + matches  #pylint: disable=no-member
+        mode[votes > best] = code
+        np.maximum(best, votes, out=best)
+
+    return mode
+
+
+@timecall
+def palette_filter(pixels, mode_size=3):
+    """Quantize an image array to the colors of the product palette.
+
+    Each pixel is classified with the color table and the noise is smoothed
+    out with a mode filter over the color codes. The pixels the mode filter
+    changed take the palette color of their new code. The others take their
+    palette color at their own brightness, as some products are only told
+    apart by brightness, unless that would change their code. Pixels that
+    aren't any color of the palette are left as they are, and the alpha
+    channel is kept.
+
+    Args:
+        pixels (numpy.ndarray): The uint8 RGB or RGBA image array.
+        mode_size (int): The side of the mode filter neighbourhood.
+
+    Returns:
+        numpy.ndarray: The quantized image array.
+    """
+    rgb = pixels[..., :3]
+    codes = lookup_color_codes(rgb)
+    mode = mode_filter(codes, mode_size)
+    brightness = np.maximum(np.maximum(rgb[..., 0], rgb[..., 1]), rgb[..., 2])
+    table, valid = palette_shades()
+
+    code = mode.astype(np.intp)
+    shade = code * 256 + brightness
+    keep_brightness = (mode == codes) & valid[shade]
+    quantized = pixels.copy()
+    np.copyto(
+        quantized[..., :3],
+        table[np.where(keep_brightness, shade, PALETTE_ROWS + code)],
+        where=(mode != NO_COLOR)[..., None])
+
+    return quantized
+
+
+@timecall
+def median_sharpen_filter(pixels, blur_level=3, sharpness=1):
+    """Apply the median filter and then sharpen an image array.
+
+    The array equivalent of `median_filter` followed by `sharpen`, with the
+    same result to the value. The median is taken of each channel on its
+    own, so the channels don't need to be reordered for OpenCV. The sharpen
+    kernel is summed with integer weights and rounded the same as PIL, and
+    the border pixels are left as they are, as PIL leaves them.
+
+    The median filter makes the only full size copy, the image is sharpened
+    in place.
+
+    Args:
+        pixels (numpy.ndarray): The uint8 image array.
+        blur_level (int): The amount the image should be blurred.
+        sharpness (int): The number of times to sharpen the image.
+
+    Returns:
+        numpy.ndarray: The filtered image array.
+    """
+    pixels = cv2.medianBlur(pixels, blur_level)  #pylint: disable=no-member
+
+    for _ in range(sharpness):
+        sharpen_rows(pixels)
+
+    return pixels
+
+
+def sharpen_rows(pixels, band_rows=SHARPEN_BAND_ROWS):
+    """Sharpen an image array in place, a band of rows at a time.
+
+    Each band is only written back once the band after it has been read, as
+    that band still needs the unsharpened row above it. The weighted sums
+    therefore never take more than two bands of memory.
+
+    Args:
+        pixels (numpy.ndarray): The uint8 image array.
+        band_rows (int): The number of rows to sharpen at once.
+    """
+    height = pixels.shape[0]
+    pending = None
+
+    for start in range(1, height - 1, band_rows):
+        stop = min(start + band_rows, height - 1)
+
+        # The weighted sums of uint8 values always fit in 16 bits.
+        sums = cv2.filter2D(
+            pixels[start - 1:stop + 1],
+            cv2.CV_16S,  #pylint: disable=no-member
+            SHARPEN_KERNEL)
+        sums += SHARPEN_SCALE // 2
+        sums //= SHARPEN_SCALE
+        sums += SHARPEN_OFFSET
+        np.clip(sums, 0, 255, out=sums)
+
+        if pending is not None:
+            pixels[pending[0]:pending[1], 1:-1] = pending[2][1:-1, 1:-1]
+
+        pending = (start, stop, sums)
+
+    if pending is not None:
+        pixels[pending[0]:pending[1], 1:-1] = pending[2][1:-1, 1:-1]
+
+
+def tile_blocks(tiles):
+    """Split the used tiles into blocks of neighbouring tiles.
+
+    Each row is split into runs of neighbouring tiles, and runs that span the
+    same columns in consecutive rows are joined into one block.
+
+    Args:
+        tiles (numpy.ndarray): Whether each tile is used.
+
+    Returns:
+        List[Tuple[int, int, int, int]]: The first row, row after the last,
+            first column and column after the last of each block.
+    """
+    padded = np.pad(tiles.astype(np.int8), ((0, 0), (1, 1)), 'constant')
+    rows, columns = np.nonzero(np.diff(padded, axis=1))
+    blocks = []
+    open_blocks = {}
+
+    # The edges alternate between the start and the end of a run.
+    for row, start, stop in zip(rows[::2].tolist(), columns[::2].tolist(),
+                                columns[1::2].tolist()):
+        index = open_blocks.get((start, stop))
+
+        if index is not None and blocks[index][1] == row:
+            blocks[index][1] = row + 1
+        else:
+            open_blocks[(start, stop)] = len(blocks)
+            blocks.append([row, row + 1, start, stop])
+
+    return [tuple(block) for block in blocks]
+
+
+def split_tiles(tiles, tile_size, padding, image_size):
+    """Split the used tiles into those inside the image and the rest.
+
+    A tile is inside the image when the padding around it is too.
+
+    Args:
+        tiles (numpy.ndarray): Whether each tile is used.
+        tile_size (int): The side of each tile.
+        padding (int): The pixels filtered around each tile.
+        image_size (Tuple[int, int]): The width and height of the image.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]: Whether each tile is used and
+            reaches the border, and the row and column of each used inner
+            tile.
+    """
+    width, height = image_size
+    starts = [np.arange(count) * tile_size for count in tiles.shape]
+    rows, columns = [(start >= padding) & (start + tile_size + padding <= end)
+                     for start, end in zip(starts, (height, width))]
+    inside = rows[:, None] & columns[None, :]
+
+    return tiles & ~inside, np.argwhere(tiles & inside)
+
+
+def tile_view(pixels, tile_size, side, grid_shape):
+    """View an image array as a grid of square windows, one every tile.
+
+    The windows start at the top left of the array and may overlap, or run
+    past its end, so only the windows inside the array may be used.
+
+    Args:
+        pixels (numpy.ndarray): The image array.
+        tile_size (int): The distance between the windows.
+        side (int): The side of each window.
+        grid_shape (Tuple[int, int]): The rows and columns of windows.
+
+    Returns:
+        numpy.ndarray: The windows, indexed by their row and column.
+    """
+    row_stride, column_stride = pixels.strides[:2]
+
+    return np.lib.stride_tricks.as_strided(
+        pixels,
+        shape=tuple(grid_shape) + (side, side) + pixels.shape[2:],
+        strides=(row_stride * tile_size, column_stride * tile_size, row_stride,
+                 column_stride) + pixels.strides[2:])
+
+
+def to_mosaic(windows):
+    """Lay square windows out side by side, in a roughly square mosaic.
+
+    OpenCV filters a few long rows much quicker than many short ones, so the
+    windows are laid out in a square rather than stacked in a column. The
+    windows after the last are left black.
+
+    Args:
+        windows (numpy.ndarray): The windows.
+
+    Returns:
+        numpy.ndarray: The mosaic.
+    """
+    count, side = windows.shape[:2]
+    columns = int(np.ceil(np.sqrt(count)))
+    rows = -(-count // columns)
+    mosaic = np.zeros(
+        (rows * columns, side, side) + windows.shape[3:], dtype=windows.dtype)
+    mosaic[:count] = windows
+
+    return np.ascontiguousarray(
+        mosaic.reshape((rows, columns, side, side) + windows.shape[3:])
+        .swapaxes(1,
+                  2).reshape((rows * side, columns * side) + windows.shape[3:]))
+
+
+def from_mosaic(mosaic, count, side):
+    """Get the windows back out of a mosaic.
+
+    Args:
+        mosaic (numpy.ndarray): The mosaic.
+        count (int): The number of windows in it.
+        side (int): The side of each window.
+
+    Returns:
+        numpy.ndarray: The windows.
+    """
+    rows, columns = mosaic.shape[0] // side, mosaic.shape[1] // side
+
+    return mosaic.reshape(
+        (rows, side, columns, side) + mosaic.shape[2:]).swapaxes(
+            1,
+            2).reshape((rows * columns, side, side) + mosaic.shape[2:])[:count]
+
+
+def tile_filter_cost(tiles, tile_size, image_size, padding=2):
+    """Estimate the cost of filtering some tiles of an image, in pixels.
+
+    Each tile is filtered with the padding around it. The inner tiles also
+    have to be gathered and written back, and each block of border tiles
+    costs a fixed overhead.
+
+    Args:
+        tiles (numpy.ndarray): Whether each tile is used.
+        tile_size (int): The side of each tile.
+        image_size (Tuple[int, int]): The width and height of the image.
+        padding (int): The pixels filtered around each tile.
+
+    Returns:
+        float: The number of pixels of the whole image that could be
+            filtered in the same time.
+    """
+    border, inner = split_tiles(tiles, tile_size, padding, image_size)
+
+    return len(inner) * (tile_size + 2 * padding)**2 * TILE_PIXEL_COST + sum(
+        ((bottom - top) * tile_size + 2 * padding) * (
+            (stop - start) * tile_size + 2 * padding) + TILE_BLOCK_COST
+        for top, bottom, start, stop in tile_blocks(border))
+
+
+@timecall
+def median_sharpen_tiles(pixels,
+                         tiles,
+                         tile_size,
+                         blur_level=3,
+                         sharpness=1,
+                         out=None):
+    """Apply the median filter and sharpen only some tiles of an image array.
+
+    Each tile is filtered with enough of the pixels around it for the result
+    to be the same as `median_sharpen_filter` over the whole image. The
+    padded inner tiles are laid out in one mosaic and filtered at once, since
+    the pixels one tile's padding takes from the next only change that
+    padding. The border tiles are filtered in blocks, as the image border is
+    handled differently. The tiles that aren't used are left unfiltered, or
+    as they are in the output array.
+
+    Args:
+        pixels (numpy.ndarray): The uint8 image array.
+        tiles (numpy.ndarray): Whether each tile is used.
+        tile_size (int): The side of each tile.
+        blur_level (int): The amount the image should be blurred.
+        sharpness (int): The number of times to sharpen the image.
+        out (numpy.ndarray): The array to write the filtered tiles to,
+            defaults to a copy of the image array.
+
+    Returns:
+        numpy.ndarray: The filtered image array.
+    """
+    height, width = pixels.shape[:2]
+    padding = blur_level // 2 + sharpness
+    filtered = pixels.copy() if out is None else out
+    border, inner = split_tiles(tiles, tile_size, padding, (width, height))
+
+    if len(inner):
+        # The windows start a tile early, as inner tiles are never in the
+        # first row or column.
+        side = tile_size + 2 * padding
+        windows = tile_view(pixels[tile_size - padding:, tile_size - padding:],
+                            tile_size, side, tiles.shape)
+        mosaic = cv2.medianBlur(  #pylint: disable=no-member
+            to_mosaic(windows[inner[:, 0] - 1, inner[:, 1] - 1]), blur_level)
+
+        for _ in range(sharpness):
+            sharpen_rows(mosaic)
+
+        tile_view(filtered, tile_size, tile_size,
+                  tiles.shape)[inner[:, 0], inner[:, 1]] = from_mosaic(
+                      mosaic, len(inner),
+                      side)[:, padding:-padding, padding:-padding]
+
+    for first_row, last_row, start, stop in tile_blocks(border):
+        top, bottom = first_row * tile_size, min(last_row * tile_size, height)
+        left, right = start * tile_size, min(stop * tile_size, width)
+        region_top, region_left = max(top - padding, 0), max(left - padding, 0)
+
+        region = cv2.medianBlur(  #pylint: disable=no-member
+            np.ascontiguousarray(pixels[region_top:bottom +
+                                        padding, region_left:right + padding]),
+            blur_level)
+
+        for _ in range(sharpness):
+            sharpen_rows(region)
+
+        filtered[top:bottom, left:
+                 right] = region[top - region_top:bottom - region_top, left -
+                                 region_left:right - region_left]
+
+    return filtered
+
+
+@timecall
+def rag_merge_tiles(image,
+                    tiles,
+                    tile_size,
+                    filter_level=100,
+                    working_size=None):
+    """Use the RAG merge filter on the bounding box of some tiles of an image.
+
+    The merge works on regions rather than on neighbourhoods of pixels, so
+    it's applied to the box around the tiles that are used rather than to
+    each run of tiles. Everything outside the box is left unfiltered.
+
+    Args:
+        image (Image): The image to filter.
+        tiles (numpy.ndarray): Whether each tile is used.
+        tile_size (int): The side of each tile.
+        filter_level (int): The amount of merging that should be applied.
+        working_size (int): The longest side to segment the box at, or None
+            to segment it at full resolution.
+
+    Returns:
+        numpy.ndarray: The filtered image array.
+    """
+    pixels = np.array(to_rgb(image))
+    rows = np.flatnonzero(tiles.any(axis=1))
+    columns = np.flatnonzero(tiles.any(axis=0))
+
+    if not rows.size:
+        return pixels
+
+    top, left = rows[0] * tile_size, columns[0] * tile_size
+    bottom, right = (rows[-1] + 1) * tile_size, (columns[-1] + 1) * tile_size
+    box = Image.fromarray(pixels[top:bottom, left:right])
+
+    if working_size:
+        box = rag_merge_multiscale(box, working_size, filter_level)
+    else:
+        box = rag_merge_filter(box, filter_level)
+
+    pixels[top:bottom, left:right] = to_array(box)
+
+    return pixels
+
+
+def pyramid_down(image):
+    """Halve the size of an image for the next level of an image pyramid.
+
+    The image is blurred before it's subsampled so that thin features are
+    averaged in rather than skipped.
+
+    Args:
+        image (numpy.ndarray): The image array to downsample.
+
+    Returns:
+        numpy.ndarray: The downsampled image array.
+    """
+    return cv2.pyrDown(np.asarray(image))  #pylint: disable=no-member
+
+
+def to_rgb(image):
+    """Convert an image to RGB, compositing any transparency onto white.
+
+    Args:
+        image (Image): The image.
+
+    Returns:
+        Image: The RGB image.
+    """
+    if image.mode == 'RGBA':
+        return rgba_to_rgb(image)
+
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+
+    return image
+
+
 @timecall
 def rgba_to_rgb(image, color=(255, 255, 255)):
     """Alpha composite an RGBA Image with a specified color.
@@ -0,0 +1,134 @@
+from collections import namedtuple
+import cv2
+import numpy as np
+from PIL import Image
+
+from image_filters.filters import to_rgb
+from utils.color_tables import lookup_color_codes
+
+# The longest side of the thumbnail the image quality is measured on.
+QUALITY_SIZE = 128
+
+# The filter paths an image can take, from the cheapest.
+UNFILTERED = 'unfiltered'
+MEDIAN = 'median'
+MERGE = 'merge'
+
+# The noise below which an image is clean enough to sample unfiltered, and
+# above which an image with enough colors is merged.
+CLEAN_NOISE = 0.3
+NOISY_NOISE = 0.4
+# The Laplacian variance below which an image is blurred enough that it's
+# always sharpened.
+BLURRED_SHARPNESS = 200
+# The entropy of the color codes, in bits, above which the colors are
+# scattered enough to need merging.
+SCATTERED_COLOR_SPREAD = 1.75
+
+# How far the median of the pixels around a pixel may range for it to be in
+# a flat region, where the noise is measured.
+FLAT_RANGE = 8
+
+QualityScores = namedtuple(
+    'QualityScores',
+    ['sharpness', 'noise', 'color_spread', 'exposure', 'clipped'])
+
+
+def thumbnail(image, size=QUALITY_SIZE):
+    """Shrink an image to measure its quality on.
+
+    Args:
+        image (Image): The image.
+        size (int): The longest side of the thumbnail.
+
+    Returns:
+        numpy.ndarray: The uint8 RGB thumbnail array.
+    """
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+
+    width, height = image.size
+    scale = size / max(width, height)
+
+    if scale < 1:
+        image = image.resize(
+            (max(int(width * scale), 1), max(int(height * scale), 1)),
+            Image.BOX)
+
+    return np.asarray(to_rgb(image))
+
+
+def flat_noise(gray):
+    """Measure the noise in the flat regions of a grayscale image.
+
+    The edges would be counted as noise, so only the pixels whose median
+    filtered surroundings barely change are measured.
+
+    Args:
+        gray (numpy.ndarray): The uint8 grayscale image array.
+
+    Returns:
+        float: The mean difference of the flat pixels from their median.
+    """
+    median = cv2.medianBlur(gray, 5)  #pylint: disable=no-member
+    kernel = np.ones((5, 5), dtype=np.uint8)
+    spread = cv2.dilate(median, kernel).astype(np.int16) - cv2.erode(  #pylint: disable=no-member
+        median, kernel)  #pylint: disable=no-member
+    flat = spread <= FLAT_RANGE
+
+    if not flat.any():
+        return 0.0
+
+    return float(np.abs(gray.astype(np.int16) - median)[flat].mean())
+
+
+def estimate_quality(image, size=QUALITY_SIZE):
+    """Measure the quality of an image on a thumbnail.
+
+    Args:
+        image (Image): The image.
+        size (int): The longest side of the thumbnail.
+
+    Returns:
+        QualityScores: The Laplacian variance, the noise in the flat regions,
+            the entropy of the color codes in bits, the mean brightness and
+            the share of pixels clipped to black or white.
+    """
+    pixels = thumbnail(image, size)
+    gray = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)  #pylint: disable=no-member
+    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()  #pylint: disable=no-member
+
+    codes = np.bincount(lookup_color_codes(pixels).ravel()) / gray.size
+    codes = codes[codes > 0]
+    color_spread = -(codes * np.log2(codes)).sum()
+
+    return QualityScores(
+        sharpness=float(sharpness),
+        noise=flat_noise(gray),
+        color_spread=float(color_spread),
+        exposure=float(gray.mean() / 255),
+        clipped=float(((gray <= 5) | (gray >= 250)).mean()))
+
+
+def choose_filter_path(scores):
+    """Choose the cheapest filters that an image of the quality needs.
+
+    Clean, sharp images are sampled unfiltered. Noisy images whose colors
+    are scattered get the RAG merge filter, and the rest the median filter
+    and sharpen. The exposure isn't used, as on the test images it doesn't
+    tell the paths apart.
+
+    Args:
+        scores (QualityScores): The quality of the image.
+
+    Returns:
+        str: `UNFILTERED`, `MEDIAN` or `MERGE`.
+    """
+    if scores.noise < CLEAN_NOISE and scores.sharpness >= BLURRED_SHARPNESS:
+        return UNFILTERED
+
+    if (scores.noise >= NOISY_NOISE and
+            scores.color_spread >= SCATTERED_COLOR_SPREAD):
+        return MERGE
+
+    return MEDIAN
@@ -1,18 +1,60 @@
+import os
 from flask import Flask
 from flask import render_template
 from profilehooks import timecall
 
+from configs.config import AUTO_FILTER
+from configs.config import COMMON_ASPECT_RATIOS
+from configs.config import CROP_IMAGES
+from configs.config import DETECTION_BUDGET
+from configs.config import DETECTOR_WORKERS
+from configs.config import FILTER_DEADLINE
+from configs.config import MERGE_FILTER
+from configs.config import STORAGE_DIR
+from configs.config import UPLOAD_EXTENSIONS
+from configs.config import WORKING_SIZE
+from object.candidates import candidate_rings
+from object.candidates import image_center
+from object.coordinate_maps.dashed_ring_map import DashedRingMap
 from object.graphql import GraphQL
 from object.product import ProductException
 from object.detector import Detector
 from object.image import Image
+from object.localizer import RadialLocalizer
+from object.preprocessor import Preprocessor
 from object.firebase import Firebase
+from object.storage import LocalStorage
+from image_filters.filter_pool import FILTER_POOL
 from utils.logging_utils import logger
+from utils.color_tables import load_color_table
 
 app = Flask(__name__)
 
 LOGGER = logger('object')
 
+# Build or memory map the color table before the first request needs it.
+load_color_table()
+
+# Build the ring templates for photos of the usual aspect ratios, as they're
+# decoded at the working size, ahead of time too. Without a working size the
+# photos keep their own sizes, which can't be foreseen.
+PHOTO_SIZES = [
+    Preprocessor.shrunk_size((width * WORKING_SIZE, height * WORKING_SIZE),
+                             WORKING_SIZE)
+    for width, height in COMMON_ASPECT_RATIOS
+] if WORKING_SIZE else []
+DashedRingMap.warm_cache(
+    ring for size in PHOTO_SIZES
+    for ring in candidate_rings(image_center(size)))
+
+# Start the merge filter processes so the first image doesn't wait for them.
+if MERGE_FILTER or AUTO_FILTER:
+    FILTER_POOL.start()
+
+# The uploads are read from Firebase, through a single bucket, unless a local
+# directory stands in for it.
+STORAGE = LocalStorage(STORAGE_DIR) if STORAGE_DIR else Firebase()
+
 
 @app.route('/')
 def index():
@@ -36,18 +78,31 @@ def get_graphql_products():
 
 @timecall
 def download_image(image_path):
-    """Download the image from Firebase
+    """Download the image from the storage into memory.
 
     Args:
         image_path (str): The remote path to the image.
 
     Returns:
-        Firebase: The Firebase database reference.
+        BytesIO: The image file.
+    """
+    return STORAGE.open(image_path)
+
+
+def upload_path(product_id):
+    """Return the path of an uploaded image.
+
+    Args:
+        product_id (str): The image ID, with the extension of its format
+            unless it's a PNG.
+
+    Returns:
+        str: The path to the image in the storage.
     """
-    database = Firebase(image_path)
-    database.download_image()
+    if os.path.splitext(product_id)[1] not in UPLOAD_EXTENSIONS:
+        product_id += '.png'
 
-    return database
+    return 'images/' + product_id
 
 
 @app.route('/images/<product_id>', methods=["GET"])
@@ -57,15 +112,43 @@ def get_product(product_id):
     Returns:
         str: The product checkout URL.
     """
-    image_path = "images/" + product_id + ".png"
-    database = download_image(image_path)
+    image_file = download_image(upload_path(product_id))
 
     try:
-        image = Image(image_path)
-        product = Detector(image).detect_product()
+        image = Image(
+            image_file,
+            crop=CROP_IMAGES,
+            merge_filter=MERGE_FILTER,
+            merge_deadline=FILTER_DEADLINE,
+            auto_filter=AUTO_FILTER,
+            budget=DETECTION_BUDGET,
+            working_size=WORKING_SIZE)
+
+        preprocessor = image.preprocessor
+
+        if preprocessor.crop_box:
+            LOGGER.info(
+                'Cropped %.0f%% of %s, saving about %.3fs of filtering.',
+                preprocessor.crop_reduction * 100, product_id,
+                preprocessor.crop_savings)
+
+        if preprocessor.quality:
+            LOGGER.info('Chose the %s filters for %s: %s',
+                        preprocessor.filter_path, product_id,
+                        preprocessor.quality)
+
+        # With a budget, the product is searched for in stages and the merge
+        # filter is only applied if the earlier stages leave time for it.
+        detector = Detector(
+            image, workers=DETECTOR_WORKERS, localizer=RadialLocalizer)
+        product = detector.detect_product()
+
+        if preprocessor.merge_fallback:
+            LOGGER.warning(
+                'Used the median filter instead of the merge filter.')
+
+        LOGGER.debug('Label planes used %s bytes.', image.planes_nbytes)
     except ProductException as exception:
         return exception.args[0]
 
-    database.clean_up()
-
     return GraphQL.create_checkout(product)
@@ -0,0 +1,109 @@
+#pylint: skip-file
+
+from profilehooks import timecall
+
+from object.detector import Detector
+from object.product import Product
+from object.product import ProductException
+from object.sequence import Sequence
+from utils.logging_utils import logger
+
+LOGGER = logger('object')
+
+
+class BatchDetector(Detector):
+    """
+    Detect an object from a given image, sampling every candidate ring at once.
+
+    The rings for every center and radius variation are gathered and
+    classified in one pass per sampler, then each ring is collapsed and
+    looked up in the same order as `Detector`.
+    """
+
+    def get_rings(self):
+        """Get the coordinate map of every candidate ring.
+
+        Returns:
+            List[CoordinateMap]: The rings, in the order they are tried.
+        """
+        return [
+            self.coordinate_map(center_point, radius)
+            for center_point, radius in self.get_candidates()
+        ]
+
+    def sample_rings(self, rings):
+        """Sample the color codes and brightness values of every ring.
+
+        The rings are grouped by the sampler they are read from, so that each
+        sampler gathers all of its rings at once.
+
+        Args:
+            rings (List[CoordinateMap]): The rings.
+
+        Returns:
+            List[Tuple[numpy.ndarray, numpy.ndarray]]: The color codes and
+                brightness percentages of each ring, or None if it is out of
+                bounds.
+        """
+        groups = {}
+
+        for index, ring in enumerate(rings):
+            sampler = ring.get_sampler(self.image)
+            groups.setdefault(id(sampler), (sampler, []))[1].append(index)
+
+        samples = [None] * len(rings)
+
+        for sampler, indices in groups.values():
+            ring_samples = sampler.sample_rings(
+                [rings[index].points for index in indices])
+
+            for index, ring_sample in zip(indices, ring_samples):
+                samples[index] = ring_sample
+
+        return samples
+
+    def read_product_name(self, ring, samples):
+        """Return the product for a ring that has already been sampled.
+
+        Args:
+            ring (CoordinateMap): The ring.
+            samples (Tuple[numpy.ndarray, numpy.ndarray]): The color codes and
+                brightness values of the ring.
+
+        Returns:
+            str: The product name or an empty string.
+        """
+        sequence = Sequence(
+            self.image, ring.center_point, ring.points, samples=samples)
+
+        if self.debug:
+            self.image.draw_ring(ring.coordinates)
+
+        return Product(sequence, self.fuzzy).product_name
+
+    @timecall
+    def detect_product(self):
+        """Detect a product based on the image.
+
+        Returns:
+            str: The product name.
+
+        Raises:
+            PixelException: If a ring before the product is out of bounds.
+        """
+        rings = self.get_rings()
+        self.image.filter_rings(
+            [(ring.center_point.coords, ring.radius) for ring in rings])
+
+        for ring, samples in zip(rings, self.sample_rings(rings)):
+            if samples is None:
+                # Sample the ring on its own to raise the same exception as
+                # the sequential detector.
+                ring.get_sampler(self.image).sample(ring.points)
+
+            product_name = self.read_product_name(ring, samples)
+
+            if product_name:
+                return product_name
+
+        raise ProductException("Product not found.")
@@ -0,0 +1,149 @@
+import numpy as np
+
+# The side of the square tiles the region of interest is made of.
+ROI_TILE_SIZE = 32
+
+
+def center_variations(center):
+    """Get slight variations of the center point for sampling.
+
+    The variations are ordered by how likely the ring is to be centered on
+    them, starting with the center point itself.
+
+    Args:
+        center (Tuple[int, int]): The center coordinates of the image.
+
+    Returns:
+        List[Tuple]: The varied center coordinates.
+    """
+    x, y = center
+
+    return [
+        (x, y),
+        (int(x * 0.85), y),
+        (x, int(y * 0.85)),
+        (int(x * 1.15), y),
+        (x, int(y * 1.15)),
+        (int(x * 0.85), y * 0.85),
+        (x * 1.15, int(y * 0.85)),
+        (int(x * 1.15), y * 1.15),
+        (x * 0.85, int(y * 1.15)),
+    ]
+
+
+def radius_variations(center):
+    """Get slight variations of the radius for sampling.
+
+    Note: We want the radius to be 66% of the image, so that's a diameter
+    of .66 or a radius of .33.
+
+    Args:
+        center (Tuple[int, int]): The center coordinates of the image.
+
+    Returns:
+        Tuple[float]: The varied radii.
+    """
+    radius = (center[1] + center[0]) * .34
+
+    return (radius, radius * 1.2, radius * 0.8)
+
+
+def candidate_rings(center):
+    """Get every center and radius combination in the order they are tried.
+
+    Args:
+        center (Tuple[int, int]): The center coordinates of the image.
+
+    Returns:
+        List[Tuple[Tuple, float]]: The center coordinates and radius of each
+            candidate ring.
+    """
+    return [(center_coords, radius)
+            for center_coords in center_variations(center)
+            for radius in radius_variations(center)]
+
+
+def image_center(image_size):
+    """Get the center coordinates for an image of the given size.
+
+    Args:
+        image_size (Tuple[int, int]): The width and height of the image.
+
+    Returns:
+        Tuple[int, int]: The center coordinates.
+    """
+    return (int(image_size[0] / 2), int(image_size[1] / 2))
+
+
+def ring_tiles(image_size, rings, tile_size=ROI_TILE_SIZE, margin=2):
+    """Find the tiles of an image that any of the rings pass through.
+
+    The image is split into square tiles, and a tile is kept if the circle of
+    any ring passes within the margin of it. The tile holding the center of
+    each ring is always kept, as the center color is read from it too.
+
+    Args:
+        image_size (Tuple[int, int]): The width and height of the image.
+        rings (List[Tuple[Tuple, float]]): The center coordinates and radius
+            of each ring.
+        tile_size (int): The side of each tile.
+        margin (int): How far the sampled pixels can be from the circle.
+
+    Returns:
+        numpy.ndarray: Whether each tile is used, with a row for each row of
+            tiles.
+    """
+    width, height = image_size
+    left = np.arange(0, width, tile_size)
+    top = np.arange(0, height, tile_size)
+    right = np.minimum(left + tile_size, width)
+    bottom = np.minimum(top + tile_size, height)
+
+    if not rings:
+        return np.zeros((len(top), len(left)), dtype=bool)
+
+    centers = np.array([center for center, _ in rings], dtype=float)
+    radii = np.array([radius for _, radius in rings], dtype=float)
+    x, y = centers[:, 0, None], centers[:, 1, None]
+
+    # The distances along each axis from every center to the nearest and
+    # furthest edges of every column and row of tiles.
+    near_x = np.maximum(np.maximum(left - x, x - right), 0)
+    near_y = np.maximum(np.maximum(top - y, y - bottom), 0)
+    far_x = np.maximum(np.abs(x - left), np.abs(x - right))
+    far_y = np.maximum(np.abs(y - top), np.abs(y - bottom))
+
+    nearest = np.hypot(near_y[:, :, None], near_x[:, None, :])
+    furthest = np.hypot(far_y[:, :, None], far_x[:, None, :])
+    radii = radii[:, None, None]
+
+    on_circle = (nearest <= radii + margin) & (furthest >= radii - margin)
+
+    return (on_circle | (nearest <= margin)).any(axis=0)
+
+
+def point_tiles(image_size, points, tile_size=ROI_TILE_SIZE, margin=2):
+    """Find the tiles of an image that any of the points fall in or near.
+
+    Args:
+        image_size (Tuple[int, int]): The width and height of the image.
+        points (numpy.ndarray): The (x, y) points.
+        tile_size (int): The side of each tile.
+        margin (int): How far the sampled pixels can be from the points.
+
+    Returns:
+        numpy.ndarray: Whether each tile is used, with a row for each row of
+            tiles.
+    """
+    width, height = image_size
+    tiles = np.zeros(
+        (-(-height // tile_size), -(-width // tile_size)), dtype=bool)
+    points = np.asarray(points, dtype=int).reshape(-1, 2)
+
+    for x_offset in (-margin, margin):
+        for y_offset in (-margin, margin):
+            x = np.clip(points[:, 0] + x_offset, 0, width - 1) // tile_size
+            y = np.clip(points[:, 1] + y_offset, 0, height - 1) // tile_size
+            tiles[y, x] = True
+
+    return tiles
@@ -9,6 +9,17 @@ class CoordinateMap:
         """
         pass
 
+    def get_sampler(self, image):
+        """Return the sampler that the points of the map are read from.
+
+        Args:
+            image (Image): The image.
+
+        Returns:
+            RingSampler: The sampler.
+        """
+        return image.sampler
+
     @staticmethod
     def deduplicate(elements):
         """Deduplicate a list of tuples.
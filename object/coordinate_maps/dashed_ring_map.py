@@ -1,8 +1,59 @@
-from math import atan2, cos, degrees, sin
+from functools import lru_cache
+from math import atan2, cos, degrees, floor, sin
 from operator import sub
+import numpy as np
 
 from object.coordinate_maps.coordinate_map import CoordinateMap
 
+RING_TEMPLATE_CACHE_SIZE = 256
+
+
+def sort_around(coordinates, center):
+    """Sort the coordinates counter clockwise around a center, from the left.
+
+    Args:
+        coordinates (List[Tuple[int, int]]): The ring coordinates.
+        center (Tuple[float, float]): The center coordinates.
+
+    Returns:
+        List[Tuple[int, int]]: The sorted coordinates.
+    """
+    leftmost_degree = 180
+    return sorted(coordinates, key=lambda coord: (leftmost_degree - degrees(
+        atan2(*tuple(map(sub, coord, center))[::-1]))) % 360)
+
+
+@lru_cache(maxsize=RING_TEMPLATE_CACHE_SIZE)
+def ring_template(radius, x_offset, y_offset):
+    """Return the sorted ring coordinates relative to the center pixel.
+
+    The shape of the ring only depends on the radius and on where the center
+    falls inside its pixel, so the same template is translated to every
+    center rather than recomputing the ring.
+
+    Args:
+        radius (float): The radius of the ring.
+        x_offset (float): The sub-pixel x offset of the center.
+        y_offset (float): The sub-pixel y offset of the center.
+
+    Returns:
+        numpy.ndarray: The read only (x, y) offsets of the ring.
+    """
+    offsets = set()
+
+    for point in range(360):
+        offsets.add((floor(radius * cos(point) + x_offset),
+                     floor(radius * sin(point) + y_offset)))
+
+    # Sort the offsets first so that points at the same angle always come out
+    # in the same order.
+    template = np.array(
+        sort_around(sorted(offsets), (x_offset, y_offset)), dtype=int).reshape(
+            -1, 2)
+    template.setflags(write=False)
+
+    return template
+
 
 class DashedRingMap(CoordinateMap):
     """A coordinate map for sampling the coordinates from a dashed ring."""
@@ -11,7 +62,37 @@ class DashedRingMap(CoordinateMap):
         super(DashedRingMap, self).__init__()
         self.center_point = center_point
         self.radius = radius
-        self.coordinates = self.get_coordinates()
+        self.points = self.get_points()
+
+    @property
+    def coordinates(self):
+        """Return the sorted coordinates of the ring.
+
+        Returns:
+            List[Tuple[int, int]]: The sorted coordinates.
+        """
+        return [tuple(point) for point in self.points.tolist()]
+
+    @staticmethod
+    def cache_info():
+        """Return the hit and miss counts of the ring template cache.
+
+        Returns:
+            CacheInfo: The cache statistics.
+        """
+        return ring_template.cache_info()
+
+    @staticmethod
+    def warm_cache(rings):
+        """Build the ring templates ahead of the first request.
+
+        Args:
+            rings (List[Tuple[Tuple, float]]): The center coordinates and
+                radius of each ring.
+        """
+        for center, radius in rings:
+            ring_template(radius, center[0] - floor(center[0]),
+                          center[1] - floor(center[1]))
 
     def sort_coordinates(self, coordinates):
         """Sort the coordinates counter clockwise around the center.
@@ -39,12 +120,31 @@ class DashedRingMap(CoordinateMap):
         Returns:
             List[Tuple[int, int]]: The sorted coordinates.
         """
-        leftmost_degree = 180
-        return sorted(coordinates, key=lambda coord: (leftmost_degree - degrees(
-            atan2(*tuple(map(sub, coord, self.center_point.coords))[::-1]))) % 360)
+        return sort_around(coordinates, self.center_point.coords)
 
-    def get_coordinates(self):
-        """Find all the coordinates on the circumference on the ring.
+    def get_points(self):
+        """Find all the points on the circumference on the ring.
+
+        The cached template for the radius is translated to the center.
+
+        Returns:
+            numpy.ndarray: The sorted (x, y) points.
+        """
+        x_pixel = floor(self.center_point.x)
+        y_pixel = floor(self.center_point.y)
+        template = ring_template(self.radius, self.center_point.x - x_pixel,
+                                 self.center_point.y - y_pixel)
+        points = template + (x_pixel, y_pixel)
+
+        # Truncating negative values rounds them up rather than down, so rings
+        # that cross the top or left edge are traced directly instead.
+        if (points < 0).any():
+            return np.array(self.trace_coordinates(), dtype=int).reshape(-1, 2)
+
+        return points
+
+    def trace_coordinates(self):
+        """Find the coordinates on the ring without the template cache.
 
         Increasing the grain will potentially increase accuracy, but will be
         negligable beyond a certain point and will also increase runtime.
@@ -63,3 +163,11 @@ class DashedRingMap(CoordinateMap):
         coordinates = CoordinateMap.deduplicate(coordinates)
 
         return self.sort_coordinates(coordinates)
+
+    def get_coordinates(self):
+        """Find all the coordinates on the circumference on the ring.
+
+        Returns:
+            List[Tuple[int, int]]: The sorted coordinates.
+        """
+        return self.coordinates
@@ -0,0 +1,71 @@
+from math import cos, pi, sin
+import numpy as np
+
+from object.coordinate_maps.coordinate_map import CoordinateMap
+
+POLAR_ANGLES = 360
+
+
+class PolarRingMap(CoordinateMap):
+    """A coordinate map for reading a ring from a polar unwrapped image.
+
+    Rather than tracing the ring through the image, the image is unwrapped
+    around the center once and the ring is read as the row of its radius.
+    The points are (angle, radius) positions in the unwrapped image.
+    """
+
+    def __init__(self, center_point, radius, angles=POLAR_ANGLES):
+        super(PolarRingMap, self).__init__()
+        self.center_point = center_point
+        self.radius = radius
+        self.angles = angles
+        self.points = self.get_points()
+
+    @property
+    def coordinates(self):
+        """Return the image coordinates that the ring is read from.
+
+        Returns:
+            List[Tuple[int, int]]: The coordinates, counter clockwise from the
+                leftmost point.
+        """
+        coordinates = []
+
+        for angle in range(self.angles):
+            angle = 2 * pi * angle / self.angles
+            coordinates.append(
+                (int(self.center_point.x - self.radius * cos(angle)),
+                 int(self.center_point.y + self.radius * sin(angle))))
+
+        return coordinates
+
+    def get_points(self):
+        """Find the points of the ring in the unwrapped image.
+
+        Returns:
+            numpy.ndarray: The (angle, radius) points.
+        """
+        points = np.empty((self.angles, 2), dtype=int)
+        points[:, 0] = np.arange(self.angles)
+        points[:, 1] = int(round(self.radius))
+
+        return points
+
+    def get_sampler(self, image):
+        """Return the polar sampler for the center of the ring.
+
+        Args:
+            image (Image): The image.
+
+        Returns:
+            PolarSampler: The sampler.
+        """
+        return image.get_polar_sampler(self.center_point.coords, self.angles)
+
+    def get_coordinates(self):
+        """Find the image coordinates that the ring is read from.
+
+        Returns:
+            List[Tuple[int, int]]: The coordinates.
+        """
+        return self.coordinates
@@ -1,7 +1,14 @@
 #pylint: skip-file
 
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from timeit import default_timer as timer
+
 from profilehooks import timecall
 
+from object.candidates import center_variations
+from object.candidates import radius_variations
 from object.coordinate_maps.dashed_ring_map import DashedRingMap
 from object.product import Product
 from object.product import ProductException
@@ -11,16 +18,61 @@ from utils.logging_utils import logger
 
 LOGGER = logger('object')
 
+CandidateTiming = namedtuple('CandidateTiming',
+                             ['center', 'radius', 'seconds', 'product_name'])
+
+# The outcome of a cascade, the product name is empty if none was found, and
+# `timed_out` tells whether the budget ran out before every stage was tried.
+DetectionResult = namedtuple(
+    'DetectionResult',
+    ['product_name', 'filter_path', 'stages', 'seconds', 'timed_out'])
+
+
+def passed(deadline):
+    """Return whether a deadline has passed.
+
+    Args:
+        deadline (float): The deadline, or None.
+
+    Returns:
+        bool: Whether there is a deadline and it has passed.
+    """
+    return deadline is not None and timer() >= deadline
+
+
+def seconds_left(deadline):
+    """Return the seconds left until a deadline.
+
+    Args:
+        deadline (float): The deadline, or None.
+
+    Returns:
+        float: The seconds left, or None without a deadline.
+    """
+    return None if deadline is None else max(deadline - timer(), 0)
+
 
 class Detector:
     """
     Detect an object from a given image.
     """
 
-    def __init__(self, image, coordinate_map=DashedRingMap, debug=False):
+    def __init__(self,
+                 image,
+                 coordinate_map=DashedRingMap,
+                 debug=False,
+                 fuzzy=False,
+                 workers=0,
+                 localizer=None,
+                 budget=None):
         self.image = image
         self.coordinate_map = coordinate_map
         self.debug = debug
+        self.fuzzy = fuzzy
+        self.workers = workers
+        self.localizer = localizer
+        self.budget = budget
+        self.timings = []
 
     def get_center_variations(self, center_point):
         """Get slight variations of the center point for sampling.
@@ -29,33 +81,20 @@ class Detector:
             Tuple[Pixel]: The list of varied center points.
         """
         image = self.image.image
+        variations = center_variations(center_point.coords)
+        self.image.filter_rings([(coords, 0) for coords in variations])
 
-        variations = [
-            center_point,
-            Pixel(image, (int(center_point.x * 0.85), center_point.y)),
-            Pixel(image, (center_point.x, int(center_point.y * 0.85))),
-            Pixel(image, (int(center_point.x * 1.15), center_point.y)),
-            Pixel(image, (center_point.x, int(center_point.y * 1.15))),
-            Pixel(image, (int(center_point.x * 0.85), center_point.y * 0.85)),
-            Pixel(image, (center_point.x * 1.15, int(center_point.y * 0.85))),
-            Pixel(image, (int(center_point.x * 1.15), center_point.y * 1.15)),
-            Pixel(image, (center_point.x * 0.85, int(center_point.y * 1.15)))
-        ]
-
-        return variations
-
-    def get_radius_variations(self, center_point):
-        """Get slight variations of the radius for sampling.
+        return [center_point] + Pixel.from_array(image, variations[1:],
+                                                 self.image.sampler.pixels)
 
-        Note: We want the radius to be 66% of the image, so that's a diameter
-        of .66 or a radius of .33.
+    @staticmethod
+    def get_radius_variations(center_point):
+        """Get slight variations of the radius for sampling.
 
         Returns:
             Tuple[int]: The list of varied radii.
         """
-        radius = (center_point.y + center_point.x) * .34
-
-        return (radius, radius * 1.2, radius * 0.8)
+        return radius_variations(center_point.coords)
 
     def get_product_name(self, center_point, radius):
         """Detect an object in an image and return the corresponding product.
@@ -68,31 +107,272 @@ class Detector:
             Product: The product.
         """
         # We want to use the same radius for all rings.
-        coordinates = self.coordinate_map(center_point, radius).coordinates
-        sequence = Sequence(self.image, center_point, coordinates)
+        ring = self.coordinate_map(center_point, radius)
+        sequence = Sequence(self.image, center_point, ring.points,
+                            ring.get_sampler(self.image))
 
         if self.debug:
-            # When this is enabled it will put black pixels on the debug image
-            # which will cause the tests to fail if it draws more than one ring.
-            self.image.draw_ring(coordinates)
+            self.image.draw_ring(ring.coordinates)
+
+        return Product(sequence, self.fuzzy).product_name
+
+    def get_located_candidates(self):
+        """Get the rings at the center and radius found by the localizer.
+
+        Returns:
+            List[Tuple[Pixel, float]]: The located candidates, if any.
+        """
+        if not self.localizer:
+            return []
+
+        candidates = self.localizer(self.image).get_candidates()
+
+        return [(Pixel(self.image.image, center), radius)
+                for center, radius in candidates]
+
+    def get_grid_candidates(self):
+        """Get the fixed grid of center and radius variations.
+
+        Returns:
+            List[Tuple[Pixel, float]]: The grid candidates.
+        """
+        center_points = self.get_center_variations(self.image.center_point)
+        radii = self.get_radius_variations(self.image.center_point)
+
+        return [(center_point, radius)
+                for center_point in center_points
+                for radius in radii]
+
+    def get_single_candidate(self):
+        """Get the ring at the center of the image with the usual radius.
+
+        Returns:
+            List[Tuple[Pixel, float]]: The single candidate.
+        """
+        center_point = self.image.center_point
+
+        return [(center_point, self.get_radius_variations(center_point)[0])]
+
+    def get_candidates(self):
+        """Get every center point and radius combination to try.
+
+        The rings found by the localizer come first, the fixed grid of center
+        and radius variations is only a fallback.
+
+        Returns:
+            List[Tuple[Pixel, float]]: The candidates, highest priority first.
+        """
+        return self.get_located_candidates() + self.get_grid_candidates()
+
+    def time_product_name(self, center_point, radius):
+        """Get the product name for a candidate and record how long it took.
+
+        Args:
+            center_point (Pixel): The center point.
+            radius (float): The radius of the circle.
+
+        Returns:
+            str: The product name or an empty string.
+        """
+        start = timer()
+        product_name = self.get_product_name(center_point, radius)
+        self.timings.append(
+            CandidateTiming(center_point.coords, radius,
+                            timer() - start, product_name))
+
+        return product_name
+
+    def search_serial(self, candidates, deadline=None):
+        """Search the candidates one at a time, in priority order.
+
+        Args:
+            candidates (List[Tuple[Pixel, float]]): The candidates.
+            deadline (float): The time after which no more candidates are
+                started, or None.
+
+        Returns:
+            str: The product name or an empty string.
+        """
+        for center_point, radius in candidates:
+            if passed(deadline):
+                break
+
+            product_name = self.time_product_name(center_point, radius)
+
+            if product_name:
+                return product_name
 
-        return Product(sequence).product_name
+        return ''
+
+    def search_parallel(self, candidates, deadline=None):
+        """Search the candidates on a thread pool.
+
+        The results are read in priority order, so the highest priority
+        candidate with a product wins as in the serial search. Once any
+        candidate finds a product, or the deadline passes, the lower priority
+        candidates that haven't started are skipped. The candidates that are
+        already running are waited for, so the timings are complete when the
+        search returns.
+
+        Args:
+            candidates (List[Tuple[Pixel, float]]): The candidates.
+            deadline (float): The time after which no more candidates are
+                started, or None.
+
+        Returns:
+            str: The product name or an empty string.
+        """
+        lock = Lock()
+        found = [len(candidates)]
+
+        def search(priority, center_point, radius):
+            if priority > found[0] or passed(deadline):
+                return ''
+
+            product_name = self.time_product_name(center_point, radius)
+
+            if product_name:
+                with lock:
+                    found[0] = min(found[0], priority)
+
+            return product_name
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [
+                pool.submit(search, priority, center_point, radius)
+                for priority, (center_point, radius) in enumerate(candidates)
+            ]
+
+            try:
+                for future in futures:
+                    product_name = future.result()
+
+                    if product_name:
+                        return product_name
+            finally:
+                for future in futures:
+                    future.cancel()
+
+        return ''
+
+    def search(self, candidates, deadline=None):
+        """Filter around the candidates and search them.
+
+        Args:
+            candidates (List[Tuple[Pixel, float]]): The candidates.
+            deadline (float): The time after which no more candidates are
+                started, or None.
+
+        Returns:
+            str: The product name or an empty string.
+        """
+        self.image.filter_rings([
+            (center_point.coords, radius) for center_point, radius in candidates
+        ])
+
+        if self.workers:
+            return self.search_parallel(candidates, deadline)
+
+        return self.search_serial(candidates, deadline)
+
+    def get_deadline(self, start):
+        """Get the time the budgets of the detector and the image run out.
+
+        Args:
+            start (float): The time the detection started.
+
+        Returns:
+            float: The earliest deadline, or None without a budget.
+        """
+        deadline = self.image.preprocessor.deadline
+        deadlines = [] if deadline is None else [deadline]
+
+        if self.budget is not None:
+            deadlines.append(start + self.budget)
+
+        return min(deadlines) if deadlines else None
+
+    @timecall
+    def detect_cascade(self):
+        """Detect a product, escalating from the cheapest search.
+
+        The single ring at the center is searched first, in the image as it
+        was opened. Each following stage applies the next filters to the
+        image, in place, and searches every candidate. The stages stop once
+        a product is found, the filters run out, or the budget does. Without
+        a budget, every stage is tried.
+
+        Returns:
+            DetectionResult: The product name, or an empty string, and how
+                far the cascade got.
+        """
+        start = timer()
+        deadline = self.get_deadline(start)
+        self.timings = []
+        stages = 1
+        product_name = self.search(self.get_single_candidate(), deadline)
+
+        while not product_name and not passed(deadline):
+            escalated = self.image.escalate(seconds_left(deadline))
+
+            # Without new filters, only the first stage is worth repeating
+            # with every candidate.
+            if (stages > 1 and not escalated) or passed(deadline):
+                break
+
+            stages += 1
+
+            for get_candidates in (self.get_located_candidates,
+                                   self.get_grid_candidates):
+                product_name = self.search(get_candidates(), deadline)
+
+                if product_name:
+                    break
+
+        return DetectionResult(
+            product_name, self.image.preprocessor.filter_path, stages,
+            timer() - start, not product_name and passed(deadline))
 
     @timecall
     def detect_product(self):
         """Detect a product based on the image.
 
+        The candidates are searched one at a time unless there are workers
+        to search them in parallel. The time spent on each candidate is
+        recorded in `timings`.
+
+        The located candidates are searched before the grid is even built,
+        and the image is only filtered around each group of rings as it's
+        reached, so the grid isn't filtered when a located ring is found.
+
+        With a budget, on the detector or the image, the product is detected
+        with `detect_cascade` instead.
+
         Returns:
             str: The product name.
+
+        Raises:
+            ProductException: If no product is found, or none is found
+                before the budget runs out.
         """
-        center_points = self.get_center_variations(self.image.center_point)
-        radii = self.get_radius_variations(self.image.center_point)
+        if self.budget is not None or self.image.preprocessor.deadline is not None:
+            result = self.detect_cascade()
 
-        for center_point in center_points:
-            for radius in radii:
-                product_name = self.get_product_name(center_point, radius)
+            if result.product_name:
+                return result.product_name
 
-                if product_name:
-                    return product_name
+            if result.timed_out:
+                raise ProductException("Product not found within budget.")
+
+            raise ProductException("Product not found.")
+
+        self.timings = []
+
+        for get_candidates in (self.get_located_candidates,
+                               self.get_grid_candidates):
+            product_name = self.search(get_candidates())
+
+            if product_name:
+                return product_name
 
         raise ProductException("Product not found.")
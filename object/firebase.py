@@ -1,10 +1,10 @@
 #pylint: disable=global-at-module-level
 
-import os
 import firebase_admin
 from firebase_admin import credentials
 from firebase_admin import storage
 from configs.config import CREDENTIALS_FILE
+from object.storage import Storage
 
 global admin
 
@@ -13,27 +13,24 @@ admin = firebase_admin.initialize_app(
     name='object-is',
     options={'databaseURL': 'https://object-is.firebaseio.com/'})
 
+BUCKET_NAME = 'object-is.appspot.com'
 
-class Firebase:
+
+class Firebase(Storage):
     """
     An interface for Firebase Google Cloud Storage.
-    """
-
-    def __init__(self, file_path):
-        self.file_path = file_path
 
-    def download_image(self):
-        """Download the given image from Firebase to a local directory.
-        """
-        base_image_directory = 'images/'
+    The bucket is looked up once and reused for every download.
+    """
 
-        if not os.path.exists(base_image_directory):
-            os.makedirs(base_image_directory)
+    def __init__(self, bucket_name=BUCKET_NAME):
+        self.bucket = storage.bucket(name=bucket_name, app=admin)
 
-        bucket = storage.bucket(name='object-is.appspot.com', app=admin)
-        bucket.blob(self.file_path).download_to_filename(self.file_path)
+    def download(self, path, file_object):
+        """Stream the given file from Firebase into a file object.
 
-    def clean_up(self):
-        """Remove the file that was downloaded locally.
+        Args:
+            path (str): The path to the file in the bucket.
+            file_object (BinaryIO): The file object to write to.
         """
-        os.remove(self.file_path)
+        self.bucket.blob(path).download_to_file(file_object)
@@ -1,28 +1,48 @@
-import warnings
 from os.path import dirname, abspath
 from profilehooks import timecall
 from PIL import Image as pil_image
 
+from object.candidates import ROI_TILE_SIZE
+from object.candidates import image_center
 from object.pixel import Pixel
-from image_filters.filters import rag_merge_filter
-from image_filters.filters import median_filter
-from image_filters.filters import sharpen
+from object.pixel import image_size
+from object.preprocessor import ImageOptions
+from object.preprocessor import create_preprocessor
+from object.ring_sampler import PolarSampler
+from object.ring_sampler import RingSampler
+from object.ring_sampler import UNCLASSIFIED
+from image_filters.filters import pyramid_down
+from image_filters.filters import tile_blocks
+
+
+class ImageLevel:
+    """A downsampled level of an image pyramid."""
+
+    def __init__(self, image, scale, sampler=None):
+        self.image = image
+        self.scale = scale
+        self.sampler = sampler or RingSampler(self.image)
 
 
 class Image:
-    """An interface for an image."""
-
-    def __init__(self,
-                 image_path,
-                 crop=False,
-                 compress=False,
-                 apply_filters=True,
-                 merge_filter=False):
-        self.crop = crop
-        self.compress = compress
-        self.apply_filters = apply_filters
-        self.merge_filter = merge_filter
-        self.image = self.preprocess_image(image_path)
+    """An interface for an image.
+
+    The image is decoded once into a contiguous uint8 array, filtered in
+    place, and that same array is sampled. A PIL image is only made from it
+    to draw the debug rings.
+
+    The image is opened and filtered by the preprocessor its options ask
+    for, see `ImageOptions`. How it was cropped and filtered is kept on the
+    `preprocessor`.
+    """
+
+    def __init__(self, image_path, **options):
+        self.preprocessor = create_preprocessor(ImageOptions(**options))
+        self.image = self.preprocessor.preprocess(image_path)
+        self.sampler = RingSampler(self.image)
+        self.polar_samplers = {}
+        self.levels = {}
+        self.debug_image = None
         self.center_point = self.set_center_point()
 
     def set_center_point(self):
@@ -31,104 +51,162 @@ class Image:
         Returns:
             Pixel: The center pixel of the image.
         """
-        coords = (int(self.image.size[0] / 2), int(self.image.size[1] / 2))
+        center = image_center(image_size(self.image))
+        self.filter_rings([(center, 0)])
+
+        return Pixel(self.image, center)
+
+    def filter_rings(self, rings):
+        """Filter the tiles that the rings pass through, if they aren't yet.
+
+        Args:
+            rings (List[Tuple[Tuple, float]]): The center coordinates and
+                radius of each ring.
+        """
+        self.preprocessor.filter_rings(self, rings)
+
+    def filter_points(self, points):
+        """Filter the tiles that the points fall in, if they aren't yet.
 
-        return Pixel(self.image, coords)
+        Args:
+            points (numpy.ndarray): The (x, y) points.
+        """
+        self.preprocessor.filter_points(self, points)
+
+    def escalate(self, deadline=None):
+        """Apply the next filters of the cascade to the image, in place.
+
+        Args:
+            deadline (float): The seconds the filters may take, or None to
+                use the budget of the image.
 
-    def preprocess_image(self, image_path):
-        """Crop, compress, and filter to image.
+        Returns:
+            str: The filter path now applied, or None if there are no more
+                filters or the merge filter missed the deadline.
+        """
+        return self.preprocessor.escalate(self, deadline)
 
-        The image needs to be saved and reopened so that it can be manipulated
-        as an array, where as the processing happens on the image object.
+    def drop_samples(self, tiles=None):
+        """Drop what was sampled from the pixels before they were filtered.
 
-        Todo:
-            Find a way to being the image size as low as possible.
+        The colors classified in the filtered tiles and the images derived
+        from the pixels are dropped, so they're read again from the filtered
+        pixels. Once the whole image is filtered, so is the center pixel.
 
         Args:
-            image_path (str): The path to the image.
+            tiles (numpy.ndarray): Whether each tile was filtered, or None if
+                the whole image was.
+        """
+        color_plane = self.sampler.color_plane
+
+        if tiles is None:
+            self.center_point = Pixel(self.image, self.center_point.coords)
+
+        if color_plane is not None and tiles is None:
+            color_plane[:] = UNCLASSIFIED
+        elif color_plane is not None:
+            for top, bottom, start, stop in tile_blocks(tiles):
+                color_plane[top * ROI_TILE_SIZE:bottom * ROI_TILE_SIZE, start *
+                            ROI_TILE_SIZE:stop * ROI_TILE_SIZE] = UNCLASSIFIED
+
+        self.polar_samplers = {}
+        self.levels = {}
+
+    @property
+    def color_plane(self):
+        """Return the color code of each pixel classified so far.
 
         Returns:
-            Image: The processed image.
+            numpy.ndarray: The uint8 color codes, `UNCLASSIFIED` where the
+                image hasn't been sampled.
         """
-        image = pil_image.open(image_path)
+        return self.sampler.get_planes()[0]
 
-        if self.compress:
-            image = image.resize((256, 256))
+    @property
+    def brightness_plane(self):
+        """Return the brightness percentage of each pixel classified so far.
 
-        if self.crop:
-            image = Image.crop(image)
+        Returns:
+            numpy.ndarray: The uint8 brightness percentages.
+        """
+        return self.sampler.get_planes()[1]
 
-        if self.apply_filters:
-            image = Image.filter(image, self.merge_filter)
+    @property
+    def planes_nbytes(self):
+        """Return the memory used by the planes of every sampler of the image.
 
-        return image
+        Returns:
+            int: The size of the planes in bytes.
+        """
+        samplers = [self.sampler] + list(self.polar_samplers.values()) + [
+            level.sampler for level in self.levels.values()
+        ]
 
-    @staticmethod
-    def filter(image, merge_filter):
-        """Filter the image so that it consolidates colors.
+        return sum(
+            {id(sampler): sampler.nbytes for sampler in samplers}.values())
 
-        Notes:
-            The merge filter is separate because it is considerably more
-            computaionally intensive than the other filters, on the order of
-            multiple seconds.
+    def get_polar_sampler(self, center, angles=360):
+        """Get the polar unwrapped image around a center.
+
+        The image is only unwrapped the first time each center is used.
 
         Args:
-            image (Image): The image.
-            merge_filter (bool): Whether to apply the RAG merge filter.
+            center (Tuple[int, int]): The center coordinates.
+            angles (int): The number of angles to unwrap the image into.
 
         Returns:
-            image (Image): The filtered image.
+            PolarSampler: The sampler for the unwrapped image.
         """
-        if merge_filter:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                image = rag_merge_filter(image)
-        else:
-            image = median_filter(image)
-            image = sharpen(image)
+        key = (tuple(center), angles)
+
+        if key not in self.polar_samplers:
+            self.polar_samplers[key] = PolarSampler(self.image, center, angles)
 
-        return image
+        return self.polar_samplers[key]
 
-    @staticmethod
-    def crop(image):
-        """Crop the photo by creating to slightly larger than the ring overlay.
+    def get_level(self, level):
+        """Get a level of the image pyramid.
 
-        Todo:
-            Will need to adjust these values to match the actual overlay.
-            Maybe we could check if all the edges of the image are the same as
-            the center color and keep cropping in until that's true.
+        Each level is half the size of the one before it, level 0 being the
+        image itself. The levels are only built the first time they are used.
 
         Args:
-            image (Image): The image to crop.
+            level (int): The pyramid level.
 
         Returns:
-            Image: A cropped image.
+            ImageLevel: The image level.
         """
-        center_point = (int(image.size[0] / 2), int(image.size[1] / 2))
+        if level not in self.levels and level == 0:
+            self.levels[level] = ImageLevel(self.image, 1, self.sampler)
+        elif level not in self.levels:
+            previous = self.get_level(level - 1)
+            self.levels[level] = ImageLevel(
+                pyramid_down(previous.image), previous.scale * 2)
 
-        return image.crop((center_point[0] - (center_point[0] * 0.75),
-                           center_point[1] - (center_point[1] * 0.75),
-                           center_point[0] + (center_point[0] * 0.75),
-                           center_point[1] + (center_point[1] * 0.75)))
+        return self.levels[level]
 
     @timecall
     def draw_ring(self, coordinates):
         """Draw onto a new image the potentially found ring.
 
         Convert each edge and center coordinate black for a visual
-        representation of the found ring.
+        representation of the found ring. The rings are drawn onto a copy of
+        the image, so they don't change what is sampled.
 
         Args:
             coordinates (List[Tuple]): The sequence coordinates.
         """
+        if self.debug_image is None:
+            self.debug_image = pil_image.fromarray(self.image)
+
         base_path = dirname(dirname(abspath(__file__)))
-        self.image.save(f'{base_path}/images/debug.png')
-        pixel_matrix = self.image.load()
+        self.debug_image.save(f'{base_path}/images/debug.png')
+        pixel_matrix = self.debug_image.load()
         pixel_matrix[self.center_point.coords] = (0, 0, 0)
 
         for point in coordinates:
             pixel_matrix[point] = (0, 0, 0)
-        self.image.save(f'{base_path}/images/debug_ring.png')
+        self.debug_image.save(f'{base_path}/images/debug_ring.png')
         #     from time import sleep
         #     sleep(0.001)
         # sleep(1)
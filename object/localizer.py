@@ -0,0 +1,206 @@
+import numpy as np
+
+from utils.color_tables import lookup_color_codes
+
+# The located radius is tried first, then slightly outside and inside it in
+# case a dash is misread at exactly that radius.
+RADIUS_SCALES = (1, 1.05, 0.95)
+
+
+class RadialLocalizer:
+    """Locate the ring by walking outwards from the center of the image.
+
+    Rays are cast from the center pixel in every direction. Along each ray
+    the first pixels that aren't the center color are the inner edge of the
+    ring and the next pixels of the center color are the outer edge. Rays
+    that pass between the dashes never change color and are ignored.
+
+    The middle of the ring on each ray is a point on the circle the dashes
+    are centered on, so a circle fitted through them gives the true center
+    and radius, however off center the ring was photographed.
+    """
+
+    def __init__(self, image, rays=48, run=2, min_hits=6):
+        self.image = image
+        self.sampler = image.sampler
+        self.rays = rays
+        self.run = run
+        self.min_hits = min_hits
+
+    def walk(self, center):
+        """Get the color codes along each ray from the center.
+
+        Args:
+            center (Tuple[int, int]): The center coordinates.
+
+        Returns:
+            numpy.ndarray: The color codes, with a row for each ray and a
+                column for each step along it.
+        """
+        x, y = center
+        length = int(
+            min(x, y, self.sampler.width - self.sampler.steps - x,
+                self.sampler.height - self.sampler.steps - y))
+        angles = 2 * np.pi * np.arange(self.rays) / self.rays
+        steps = np.arange(max(length, 0))
+        xs = (x + np.cos(angles)[:, None] * steps).astype(int)
+        ys = (y + np.sin(angles)[:, None] * steps).astype(int)
+        self.image.filter_points(np.stack((xs.ravel(), ys.ravel()), axis=1))
+
+        return lookup_color_codes(self.sampler.pixels[ys, xs])
+
+    def find_edges(self, codes, center_code):
+        """Find where each ray enters and leaves the ring.
+
+        An edge is only counted once the color has changed for `run` steps
+        in a row, so that single noisy pixels don't end the walk.
+
+        Args:
+            codes (numpy.ndarray): The color codes along each ray.
+            center_code (int): The color code of the center.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: Whether each
+                ray crossed the ring, and the inner and outer edge distances.
+        """
+        outside = codes != center_code
+        length = codes.shape[1] - self.run + 1
+
+        if length <= 0:
+            empty = np.zeros(len(codes), dtype=int)
+            return empty.astype(bool), empty, empty
+
+        # Whether the color is different for the next `run` steps.
+        entering = np.ones((len(codes), length), dtype=bool)
+        leaving = np.ones((len(codes), length), dtype=bool)
+
+        for offset in range(self.run):
+            entering &= outside[:, offset:offset + length]
+            leaving &= ~outside[:, offset:offset + length]
+
+        steps = np.arange(length)
+        inner = np.where(entering.any(axis=1), entering.argmax(axis=1), length)
+        leaving &= steps > inner[:, None]
+        outer = np.where(leaving.any(axis=1), leaving.argmax(axis=1), length)
+
+        return outer < length, inner, outer
+
+    @staticmethod
+    def fit_circle(x, y):
+        """Fit a circle through points with linear least squares.
+
+        Args:
+            x (numpy.ndarray): The x coordinates of the points.
+            y (numpy.ndarray): The y coordinates of the points.
+
+        Returns:
+            Tuple[Tuple[float, float], float]: The center coordinates and
+                radius, or None if the points don't describe a circle.
+        """
+        # Fit x² + y² + ax + by + c = 0 to the points.
+        system = np.column_stack((x, y, np.ones(len(x))))
+        (a, b, c), *_ = np.linalg.lstsq(system, -(x**2 + y**2), rcond=None)
+        center_x, center_y = -a / 2, -b / 2
+        radius_squared = center_x**2 + center_y**2 - c
+
+        if radius_squared <= 0:
+            return None
+
+        return (float(center_x), float(center_y)), float(
+            np.sqrt(radius_squared))
+
+    def fit_ring(self, center):
+        """Fit a circle through the middle of the ring seen from a center.
+
+        The rays that land furthest from the first fit, like those clipping
+        the corner of a dash, are dropped before fitting again.
+
+        Args:
+            center (Tuple[float, float]): The center to walk from.
+
+        Returns:
+            Tuple[Tuple[float, float], float]: The center coordinates and
+                radius, or None if too few rays crossed the ring.
+        """
+        codes = self.walk(center)
+
+        if not codes.size:
+            return None
+
+        hits, inner, outer = self.find_edges(codes, codes[0, 0])
+
+        if hits.sum() < self.min_hits:
+            return None
+
+        angles = 2 * np.pi * np.arange(self.rays)[hits] / self.rays
+        middle = (inner[hits] + outer[hits]) / 2
+        x = center[0] + middle * np.cos(angles)
+        y = center[1] + middle * np.sin(angles)
+        circle = self.fit_circle(x, y)
+
+        if circle is None:
+            return None
+
+        (center_x, center_y), radius = circle
+        residuals = np.abs(np.hypot(x - center_x, y - center_y) - radius)
+        inliers = residuals <= max(1, 2 * np.median(residuals))
+
+        if inliers.sum() < self.min_hits:
+            return circle
+
+        return self.fit_circle(x[inliers], y[inliers])
+
+    def locate(self, passes=2):
+        """Estimate the center and radius of the ring.
+
+        The first walk starts at the center of the image. Each following
+        walk starts at the center found by the walk before it, where the rays
+        cross the ring more squarely.
+
+        Args:
+            passes (int): The number of walks.
+
+        Returns:
+            Tuple[Tuple[float, float], float]: The center coordinates and
+                radius, or None if too few rays crossed the ring.
+        """
+        center = self.image.center_point.coords
+        circle = None
+
+        for _ in range(passes):
+            found = self.fit_ring((int(center[0]), int(center[1])))
+
+            if found is None:
+                break
+
+            circle = found
+            center = circle[0]
+
+        return circle
+
+    def get_candidates(self):
+        """Get the rings to try at the located center.
+
+        Rings that would reach the edge of the image are left out.
+
+        Returns:
+            List[Tuple[Tuple[int, int], float]]: The center coordinates and
+                radius of each ring, in the order they should be tried.
+        """
+        circle = self.locate()
+
+        if circle is None:
+            return []
+
+        (x, y), radius = circle
+        center = (int(x), int(y))
+        candidates = []
+
+        for scale in RADIUS_SCALES:
+            reach = radius * scale + 1
+            corners = np.array([(x - reach, y - reach), (x + reach, y + reach)])
+
+            if not self.sampler.out_of_bounds(corners).any():
+                candidates.append((center, radius * scale))
+
+        return candidates
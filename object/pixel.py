@@ -1,16 +1,176 @@
+from functools import lru_cache
+import numpy as np
+
 from utils.color_utils import get_color, get_brightness, get_most_likely_colors
 
 
+def image_size(image):
+    """Return the width and height of an image or an image array.
+
+    Args:
+        image (Union[PIL.Image, numpy.ndarray]): The image.
+
+    Returns:
+        Tuple[int, int]: The width and height.
+    """
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+
+    return image.size
+
+
+def read_pixel(image, coords):
+    """Return the RGB value of an image or an image array at a coordinate.
+
+    Args:
+        image (Union[PIL.Image, numpy.ndarray]): The image.
+        coords (Tuple[int, int]): The coordinates of the pixel.
+
+    Returns:
+        Tuple[int]: The Red, Green, Blue triplet.
+    """
+    if isinstance(image, np.ndarray):
+        return tuple(image[int(coords[1]), int(coords[0])].tolist())
+
+    return image.getpixel(coords)
+
+
+@lru_cache(maxsize=None)
+def pixel_limits(size, steps=3):
+    """Return the first coordinates past the edge of an image.
+
+    Every pixel of an image of the same size shares the same limits, so they
+    are only worked out once.
+
+    Args:
+        size (Tuple[int, int]): The width and height of the image.
+        steps (int): The pixel margin to keep from the edge.
+
+    Returns:
+        Tuple[int, int]: The x and y limits.
+    """
+    width, height = size
+
+    return width - steps, height - steps
+
+
 class Pixel:
-    """A pixel in an image."""
+    """A pixel in an image.
+
+    The bounds are checked when the pixel is created, but the image is only
+    read the first time the color or brightness is needed.
+    """
+
+    __slots__ = ('image', 'coords', 'x', 'y', '_rgb', '_colors',
+                 '_brightness_values')
+
+    def __init__(self, image, coords, rgb=None):
+        self._initialize(image, coords, rgb)
+
+        if self.out_of_bounds(coords):
+            raise PixelException(
+                f"The new coordinates {coords} are out of bounds.")
+
+    def _initialize(self, image, coords, rgb):
+        """Set the attributes of the pixel, without checking its bounds.
 
-    def __init__(self, image, coords):
+        Args:
+            image (Union[PIL.Image, numpy.ndarray]): The image.
+            coords (Tuple[int, int]): The coordinates of the pixel.
+            rgb (Tuple[int]): The RGB value of the pixel, or None to read it
+                from the image when it's needed.
+        """
         self.image = image
         self.coords = coords
         self.x = coords[0]
         self.y = coords[1]
-        self.colors = self.get_color(coords)
-        self.brightness_values = get_brightness(image.getpixel(coords))
+        self._rgb = rgb
+        self._colors = None
+        self._brightness_values = None
+
+    @classmethod
+    def from_array(cls, image, coords, pixels=None):
+        """Create a pixel for each of an array of coordinates.
+
+        The bounds of every pixel are checked at once and, when the image
+        array is given, the RGB values are gathered in a single lookup. The
+        coordinates keep their types, as with `Pixel`.
+
+        Args:
+            image (Union[PIL.Image, numpy.ndarray]): The image.
+            coords (numpy.ndarray): The (x, y) coordinates of each pixel.
+            pixels (numpy.ndarray): The image as a height x width x channels
+                array, to read the colors from.
+
+        Returns:
+            List[Pixel]: The pixels, in the same order as the coordinates.
+
+        Raises:
+            PixelException: If any of the coordinates are out of bounds.
+        """
+        if isinstance(coords, np.ndarray):
+            coords = coords.tolist()
+
+        points = np.asarray(coords).reshape(-1, 2)
+        max_x, max_y = pixel_limits(image_size(image))
+        outside = ((points[:, 0] < 0) | (points[:, 0] >= max_x) |
+                   (points[:, 1] < 0) | (points[:, 1] >= max_y))
+
+        if outside.any():
+            raise PixelException(
+                f"The new coordinates {tuple(points[outside.argmax()])} are "
+                "out of bounds.")
+
+        rgbs = [None] * len(points)
+
+        if pixels is not None:
+            indices = points.astype(int)
+            rgbs = pixels[indices[:, 1], indices[:, 0]].tolist()
+
+        pixel_list = []
+
+        for point, rgb in zip(coords, rgbs):
+            pixel = cls.__new__(cls)
+            pixel._initialize(image, tuple(point), rgb)
+            pixel_list.append(pixel)
+
+        return pixel_list
+
+    @property
+    def rgb(self):
+        """Return the RGB value of the pixel, reading it from the image once.
+
+        Returns:
+            Tuple[int]: The Red, Green, Blue triplet.
+        """
+        if self._rgb is None:
+            self._rgb = read_pixel(self.image, self.coords)
+
+        return self._rgb
+
+    @property
+    def colors(self):
+        """Return the names of the color of the pixel.
+
+        Returns:
+            List[str]: The color names.
+        """
+        if self._colors is None:
+            self._colors = get_color(self.rgb)
+
+        return self._colors
+
+    @property
+    def brightness_values(self):
+        """Return the brightness of the pixel.
+
+        Returns:
+            List[float]: The brightness percentages.
+        """
+        if self._brightness_values is None:
+            self._brightness_values = get_brightness(self.rgb)
+
+        return self._brightness_values
 
     @property
     def color(self):
@@ -47,9 +207,9 @@ class Pixel:
         """
         if not self.out_of_bounds(coords):
             if color_range == 'css2':
-                return get_color(self.image.getpixel(coords))
+                return get_color(read_pixel(self.image, coords))
 
-            return get_most_likely_colors(self.image.getpixel(coords))
+            return get_most_likely_colors(read_pixel(self.image, coords))
 
         raise PixelException(f"The new coordinates {coords} are out of bounds.")
 
@@ -62,10 +222,10 @@ class Pixel:
         Returns:
             bool: Whether the new coordinates are at the edge of the image.
         """
-        width, height = self.image.size
+        max_x, max_y = pixel_limits(image_size(self.image), steps)
 
-        return ((width - steps <= coords[0]) or (coords[0] < 0) or
-                (height - steps <= coords[1]) or (coords[1] < 0))
+        return ((max_x <= coords[0]) or (coords[0] < 0) or
+                (max_y <= coords[1]) or (coords[1] < 0))
 
     def __repr__(self):
         """Return a short, in line, description of the Pixel.
@@ -83,9 +243,9 @@ class Pixel:
         """
         desc = f'\n{self.__class__.__name__}:\n'
 
-        for attribute in self.__dict__:
+        for attribute in ('coords', 'x', 'y', 'colors', 'brightness_values'):
             key = attribute.replace('_', ' ').capitalize()
-            desc += f'    {key}: {self.__dict__[attribute]},\n'
+            desc += f'    {key}: {getattr(self, attribute)},\n'
 
         return desc
 
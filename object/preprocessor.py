@@ -0,0 +1,688 @@
+import warnings
+from collections import namedtuple
+from threading import Lock
+from timeit import default_timer as timer
+import numpy as np
+from PIL import Image as pil_image
+
+from object.candidates import ROI_TILE_SIZE
+from object.candidates import candidate_rings
+from object.candidates import image_center
+from object.candidates import point_tiles
+from object.candidates import ring_tiles
+from object.pixel import image_size
+from object.pixel import pixel_limits
+from image_filters.filter_pool import FILTER_POOL
+from image_filters.filters import median_sharpen_filter
+from image_filters.filters import median_sharpen_tiles
+from image_filters.filters import palette_filter
+from image_filters.filters import rag_merge_filter
+from image_filters.filters import rag_merge_multiscale
+from image_filters.filters import rag_merge_tiles
+from image_filters.filters import tile_filter_cost
+from image_filters.filters import to_array
+from image_filters.filters import to_rgb
+from image_filters.quality import MEDIAN
+from image_filters.quality import MERGE
+from image_filters.quality import UNFILTERED
+from image_filters.quality import choose_filter_path
+from image_filters.quality import estimate_quality
+from image_filters.quality import thumbnail
+
+# The color difference from the center that marks the ring when cropping.
+CROP_THRESHOLD = 80
+# The number of rows and columns of the thumbnail the ring is looked for on.
+CROP_SCANLINES = 16
+# The share of the cropped image the ring spans, as in the images that the
+# candidate rings are sized for.
+CROP_RING_SHARE = 0.85
+
+# The options an image is opened and filtered with, see `Preprocessor`,
+# `RoiPreprocessor` and `CascadePreprocessor`.
+ImageOptions = namedtuple('ImageOptions', [
+    'crop', 'compress', 'apply_filters', 'merge_filter', 'merge_size',
+    'quantize', 'merge_deadline', 'auto_filter', 'budget', 'working_size', 'roi'
+])
+ImageOptions.__new__.__defaults__ = (False, False, True, False, None, False,
+                                     None, False, None, None, False)
+
+
+def create_preprocessor(options):
+    """Create the preprocessor for the options of an image.
+
+    Args:
+        options (ImageOptions): The options of the image.
+
+    Returns:
+        Preprocessor: The preprocessor.
+
+    Raises:
+        ValueError: If a budget is combined with `roi` or `quantize`, which
+            the cascade can't honor.
+    """
+    if options.budget is not None and (options.roi or options.quantize):
+        raise ValueError('A budget can\'t be combined with roi or quantize.')
+
+    if options.budget is not None:
+        return CascadePreprocessor(options)
+
+    if options.roi:
+        return RoiPreprocessor(options)
+
+    return Preprocessor(options)
+
+
+class Preprocessor:
+    """Open an image and filter it as a whole, as its options ask for.
+
+    With a `working_size`, the image is decoded no larger than that on its
+    longest side, see `shrink`. With `crop`, it's then cropped to the square
+    around the ring before it's filtered, see `find_crop_box`.
+
+    With a `merge_deadline`, the RAG merge filter runs in the filter pool
+    and the whole image is merged. If it takes longer than the deadline, the
+    median filter and sharpen are used instead and `merge_fallback` is set.
+
+    With `auto_filter`, the quality of the image is measured on a thumbnail
+    first and decides the filters in place of `apply_filters` and
+    `merge_filter`. The scores are kept in `quality` and the filters chosen
+    in `filter_path`.
+    """
+
+    # The time the budget of the image runs out, only set for the cascade.
+    deadline = None
+    # Whether each tile of the image is filtered, only set for the tiles.
+    roi_tiles = None
+
+    def __init__(self, options):
+        self.options = options
+        self.crop_box = None
+        self.crop_reduction = 0
+        self.filter_seconds = 0
+        self.filter_path = None
+        self.quality = None
+        self.merge_fallback = False
+
+    @property
+    def crop_savings(self):
+        """Estimate the seconds of filtering that cropping the image saved.
+
+        The filters take about as long for each pixel, so the pixels cropped
+        off would have taken as long again as their share of the rest.
+
+        Returns:
+            float: The seconds saved.
+        """
+        if not self.crop_reduction:
+            return 0
+
+        return self.filter_seconds * self.crop_reduction / (
+            1 - self.crop_reduction)
+
+    def preprocess(self, image_path):
+        """Crop, compress, and filter to image.
+
+        Args:
+            image_path (Union[str, BinaryIO]): The path to the image, or the
+                image file.
+
+        Returns:
+            numpy.ndarray: The processed image array.
+        """
+        image = self.open(image_path)
+        image.load()
+        start = timer()
+        pixels = self.filter(image)
+        self.filter_seconds = timer() - start
+
+        return pixels
+
+    def open(self, image_path):
+        """Open the image, then shrink, crop and compress it.
+
+        Args:
+            image_path (Union[str, BinaryIO]): The path to the image, or the
+                image file.
+
+        Returns:
+            Image: The image, ready to filter.
+        """
+        image = pil_image.open(image_path)
+
+        if self.options.working_size:
+            image = Preprocessor.shrink(image, self.options.working_size)
+
+        if self.options.crop:
+            self.crop_box = self.find_crop_box(image)
+
+        if self.crop_box:
+            left, top, right, bottom = self.crop_box
+            self.crop_reduction = 1 - (right - left) * (bottom - top) / (
+                image.size[0] * image.size[1])
+            image = image.crop(self.crop_box)
+
+        if self.options.compress:
+            image = image.resize((256, 256))
+
+        return image
+
+    def filter(self, image):
+        """Filter the image, as the options of the image ask for.
+
+        Args:
+            image (Image): The image.
+
+        Returns:
+            numpy.ndarray: The filtered image array.
+        """
+        if self.options.apply_filters and self.options.auto_filter:
+            self.choose_filters(image)
+
+        return self.apply(image)
+
+    def apply(self, image):
+        """Apply the filters the options ask for to the whole image.
+
+        Args:
+            image (Image): The image.
+
+        Returns:
+            numpy.ndarray: The filtered image array.
+        """
+        if not self.options.apply_filters:
+            return to_array(image)
+
+        if self.options.merge_filter and self.options.merge_deadline:
+            return self.merge_in_pool(image)
+
+        return Preprocessor.run_filters(
+            image,
+            self.options.merge_filter,
+            merge_size=self.options.merge_size,
+            quantize=self.options.quantize)
+
+    def filter_rings(self, image, rings):
+        """Filter the tiles that the rings pass through, if they aren't yet.
+
+        Does nothing unless the image is filtered lazily, see
+        `RoiPreprocessor`.
+
+        Args:
+            image (object.image.Image): The image.
+            rings (List[Tuple[Tuple, float]]): The center coordinates and
+                radius of each ring.
+        """
+
+    def filter_points(self, image, points):
+        """Filter the tiles that the points fall in, if they aren't yet.
+
+        Does nothing unless the image is filtered lazily, see
+        `RoiPreprocessor`.
+
+        Args:
+            image (object.image.Image): The image.
+            points (numpy.ndarray): The (x, y) points.
+        """
+
+    def escalate(self, image, deadline=None):
+        """Apply the next filters of the cascade to the image, in place.
+
+        There are no more filters unless the image has a budget, see
+        `CascadePreprocessor`.
+
+        Args:
+            image (object.image.Image): The image.
+            deadline (float): The seconds the filters may take.
+
+        Returns:
+            str: The filter path now applied, or None.
+        """
+
+    def choose_filters(self, image):
+        """Choose the filters from the quality of the image.
+
+        Args:
+            image (Image): The image.
+        """
+        self.quality = estimate_quality(image)
+        self.filter_path = choose_filter_path(self.quality)
+        self.options = self.options._replace(
+            apply_filters=self.filter_path != UNFILTERED,
+            merge_filter=self.filter_path == MERGE)
+
+    def merge_in_pool(self, image):
+        """Apply the RAG merge filter in the filter pool, within the deadline.
+
+        If the merge filter misses the deadline or fails, the median filter
+        and sharpen are applied instead and `merge_fallback` is set.
+
+        Args:
+            image (Image): The image.
+
+        Returns:
+            numpy.ndarray: The filtered image array.
+        """
+        merged = self.run_merge(
+            to_array(to_rgb(image)), self.options.merge_deadline)
+
+        if merged is not None:
+            return merged
+
+        self.merge_fallback = True
+
+        return median_sharpen_filter(to_array(image))
+
+    def run_merge(self, pixels, deadline):
+        """Run the RAG merge filter in the filter pool.
+
+        Without a deadline the filter runs in this process instead.
+
+        Args:
+            pixels (numpy.ndarray): The uint8 RGB image array.
+            deadline (float): The seconds the filter may take, at most
+                `merge_deadline`, or None for no limit.
+
+        Returns:
+            numpy.ndarray: The filtered image array, or None if the filter
+                failed or missed the deadline.
+        """
+        merge_size = self.options.merge_size
+        deadlines = [
+            seconds for seconds in (deadline, self.options.merge_deadline)
+            if seconds is not None
+        ]
+
+        if not deadlines:
+            return Preprocessor.run_filters(
+                pil_image.fromarray(pixels), True, merge_size=merge_size)
+
+        deadline = min(deadlines)
+
+        if merge_size:
+            return FILTER_POOL.run(
+                'rag_merge_multiscale',
+                pixels,
+                deadline,
+                working_size=merge_size)
+
+        return FILTER_POOL.run('rag_merge_filter', pixels, deadline)
+
+    @staticmethod
+    def run_filters(image,
+                    merge_filter,
+                    tiles=None,
+                    merge_size=None,
+                    quantize=False):
+        """Filter the image so that it consolidates colors.
+
+        Notes:
+            The merge filter is separate because it is considerably more
+            computaionally intensive than the other filters, on the order of
+            multiple seconds. Segmenting a downscaled copy with `merge_size`
+            cuts most of that time.
+
+        Args:
+            image (Image): The image.
+            merge_filter (bool): Whether to apply the RAG merge filter.
+            tiles (numpy.ndarray): Whether each tile of the image is filtered,
+                or None to filter the whole image.
+            merge_size (int): The longest side the merge filter segments the
+                image at, or None to segment it at full resolution.
+            quantize (bool): Whether to quantize the image to the palette
+                colors instead of the median filter and sharpen.
+
+        Returns:
+            numpy.ndarray: The filtered image array.
+        """
+        if merge_filter:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+
+                if tiles is not None:
+                    return rag_merge_tiles(
+                        image, tiles, ROI_TILE_SIZE, working_size=merge_size)
+
+                if merge_size:
+                    return to_array(rag_merge_multiscale(image, merge_size))
+
+                return to_array(rag_merge_filter(image))
+
+        if quantize:
+            return palette_filter(to_array(image))
+
+        if tiles is not None:
+            return median_sharpen_tiles(to_array(image), tiles, ROI_TILE_SIZE)
+
+        return median_sharpen_filter(to_array(image))
+
+    @staticmethod
+    def shrink(image, working_size):
+        """Decode an image no larger than the working size.
+
+        The size is read from the header before any pixels are decoded. A
+        JPEG image is decoded straight at the smallest of its reduced scales
+        that is still larger than the working size, then every image is
+        resized down the rest of the way.
+
+        Args:
+            image (Image): The image, opened but not loaded.
+            working_size (int): The longest side to decode the image at.
+
+        Returns:
+            Image: The image, no larger than the working size.
+        """
+        size = Preprocessor.shrunk_size(image.size, working_size)
+
+        if size == image.size:
+            return image
+
+        if image.format == 'JPEG':
+            image.draft(image.mode, size)
+
+        if image.size == size:
+            return image
+
+        return image.resize(size, pil_image.BOX)
+
+    @staticmethod
+    def shrunk_size(size, working_size):
+        """Return the size an image is decoded at, with a working size.
+
+        Args:
+            size (Tuple[int, int]): The width and height of the image.
+            working_size (int): The longest side to decode the image at.
+
+        Returns:
+            Tuple[int, int]: The width and height, no larger than the working
+                size.
+        """
+        width, height = size
+        scale = working_size / max(width, height)
+
+        if scale >= 1:
+            return size
+
+        return (max(int(round(width * scale)), 1),
+                max(int(round(height * scale)), 1))
+
+    @staticmethod
+    def fits_candidates(side):
+        """Check whether every candidate ring fits in a square image.
+
+        The candidate rings reach past the ring the square is sized for, and
+        the pixels keep a margin from the edges, so a small square can be too
+        tight for them.
+
+        Args:
+            side (int): The side of the square image.
+
+        Returns:
+            bool: Whether every candidate ring is in bounds.
+        """
+        limit = pixel_limits((side, side))[0]
+
+        return all(
+            radius < min(x, y) and max(x, y) + radius < limit
+            for (x, y), radius in candidate_rings(image_center((side, side))))
+
+    @staticmethod
+    def find_crop_box(image):
+        """Find the square to crop the photo to, around the ring.
+
+        The ring is found on a thumbnail, as the pixels along a few scanlines
+        each way that differ from the color at the center, which the ring
+        surrounds. The square is centered on the ring and spans it as much as
+        the candidate rings expect, but stays inside the image. A small square
+        is padded until every candidate ring fits inside it.
+
+        Args:
+            image (Image): The image to crop.
+
+        Returns:
+            Tuple[int, int, int, int]: The left, top, right and bottom of the
+                square, or None if no ring was found or the square doesn't
+                fit in the image.
+        """
+        pixels = thumbnail(image).astype(np.int16)
+        height, width = pixels.shape[:2]
+        center = pixels[height // 2 - 1:height // 2 + 2, width // 2 -
+                        1:width // 2 + 2]
+        background = np.median(center.reshape(-1, 3), axis=0)
+        ring = np.abs(pixels - background).max(axis=2) > CROP_THRESHOLD
+
+        rows = np.linspace(0, height - 1, CROP_SCANLINES).astype(int)
+        columns = np.linspace(0, width - 1, CROP_SCANLINES).astype(int)
+        xs = np.flatnonzero(ring[rows].any(axis=0))
+        ys = np.flatnonzero(ring[:, columns].any(axis=1))
+
+        if not xs.size or not ys.size:
+            return None
+
+        scale_x, scale_y = image.size[0] / width, image.size[1] / height
+        side = int(
+            max((xs[-1] + 1 - xs[0]) * scale_x,
+                (ys[-1] + 1 - ys[0]) * scale_y) / CROP_RING_SHARE)
+
+        while side < min(image.size) and not Preprocessor.fits_candidates(side):
+            side += 1
+
+        if side >= min(image.size):
+            return None
+
+        center_x = (xs[0] + xs[-1] + 1) / 2 * scale_x
+        center_y = (ys[0] + ys[-1] + 1) / 2 * scale_y
+        left = min(max(int(center_x - side / 2), 0), image.size[0] - side)
+        top = min(max(int(center_y - side / 2), 0), image.size[1] - side)
+
+        return left, top, left + side, top + side
+
+
+class RoiPreprocessor(Preprocessor):
+    """Filter only the tiles of an image that the candidate rings pass through.
+
+    The image is split into tiles and a tile is only filtered once a ring
+    that passes through it is about to be sampled, so the pixels that are
+    never sampled are never filtered. The RAG merge filter works on whole
+    regions, so with it every tile any candidate ring passes through is
+    filtered up front instead. The palette filter is quick enough that it
+    always filters the whole image.
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.roi_tiles = None
+        self.roi_lock = Lock()
+        self.unfiltered = None
+
+    def apply(self, image):
+        """Apply the filters the options ask for to the tiles that need them.
+
+        Args:
+            image (Image): The image.
+
+        Returns:
+            numpy.ndarray: The image array, filtered where it's needed so far.
+        """
+        if not self.options.apply_filters or self.options.quantize or (
+                self.options.merge_filter and self.options.merge_deadline):
+            return super().apply(image)
+
+        if self.options.merge_filter:
+            self.roi_tiles = ring_tiles(
+                image.size, candidate_rings(image_center(image.size)))
+
+            return Preprocessor.run_filters(
+                image, True, self.roi_tiles, merge_size=self.options.merge_size)
+
+        self.unfiltered = to_array(image)
+        self.roi_tiles = ring_tiles(image.size, [])
+
+        return self.unfiltered.copy()
+
+    def filter_rings(self, image, rings):
+        """Filter the tiles that the rings pass through, if they aren't yet.
+
+        Args:
+            image (object.image.Image): The image.
+            rings (List[Tuple[Tuple, float]]): The center coordinates and
+                radius of each ring.
+        """
+        if self.unfiltered is not None:
+            self.filter_tiles(image, ring_tiles(image_size(image.image), rings))
+
+    def filter_points(self, image, points):
+        """Filter the tiles that the points fall in, if they aren't yet.
+
+        Args:
+            image (object.image.Image): The image.
+            points (numpy.ndarray): The (x, y) points.
+        """
+        if self.unfiltered is not None:
+            self.filter_tiles(image, point_tiles(
+                image_size(image.image), points))
+
+    def filter_tiles(self, image, tiles):
+        """Filter the tiles that aren't filtered yet.
+
+        The colors already sampled and the images derived from the newly
+        filtered tiles are dropped, so they're read again from the filtered
+        pixels.
+
+        Args:
+            image (object.image.Image): The image.
+            tiles (numpy.ndarray): Whether each tile is needed.
+        """
+        with self.roi_lock:
+            tiles = tiles & ~self.roi_tiles
+
+            if not tiles.any():
+                return
+
+            # Filtering a tile again doesn't change it, so once the tiles cost
+            # as much as the whole image, the whole image is filtered.
+            width, height = image_size(image.image)
+            if tile_filter_cost(tiles, ROI_TILE_SIZE,
+                                (width, height)) >= width * height:
+                tiles = ~self.roi_tiles
+                image.image[:] = median_sharpen_filter(self.unfiltered)
+            else:
+                median_sharpen_tiles(
+                    self.unfiltered, tiles, ROI_TILE_SIZE, out=image.image)
+
+            self.roi_tiles |= tiles
+            image.drop_samples(tiles)
+
+
+class CascadePreprocessor(Preprocessor):
+    """Leave an image unfiltered for detection to escalate through the filters.
+
+    With a `budget`, in seconds from when the image is opened, the image
+    starts out unfiltered so that detection can escalate through the filters
+    with `escalate` only as far as the time allows. With `auto_filter` too,
+    it starts out with the filters its quality asks for instead, and the
+    merge filter gives up at the `merge_deadline` as well as the budget. The
+    cascade filters the whole image with the median filter or the merge
+    filter, so it can't be combined with `roi` or `quantize`.
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.deadline = timer() + options.budget
+        self.raw = None
+
+    def remaining(self):
+        """Return the seconds left of the budget.
+
+        Returns:
+            float: The seconds left.
+        """
+        return max(self.deadline - timer(), 0)
+
+    def filter(self, image):
+        """Keep the decoded image array for the cascade to filter in stages.
+
+        The image starts out unfiltered, or with `auto_filter` with the
+        filters its quality asks for. If the merge filter misses the budget,
+        the median filter and sharpen are applied and `merge_fallback` is set.
+
+        Args:
+            image (Image): The image.
+
+        Returns:
+            numpy.ndarray: The image array to start the cascade from.
+        """
+        if not self.options.apply_filters:
+            return to_array(image)
+
+        self.raw = to_array(image)
+        self.filter_path = UNFILTERED
+
+        if not self.options.auto_filter:
+            return self.raw.copy()
+
+        self.quality = estimate_quality(image)
+        filter_path = choose_filter_path(self.quality)
+
+        if filter_path == UNFILTERED:
+            return self.raw.copy()
+
+        if filter_path == MERGE:
+            self.options = self.options._replace(merge_filter=True)
+
+        pixels = median_sharpen_filter(self.raw)
+        self.filter_path = MEDIAN
+
+        if filter_path == MERGE:
+            merged = self.run_merge(to_array(to_rgb(image)), self.remaining())
+
+            if merged is None:
+                self.merge_fallback = True
+            else:
+                pixels[..., :3] = merged
+                self.filter_path = MERGE
+
+        return pixels
+
+    def escalate(self, image, deadline=None):
+        """Apply the next filters of the cascade to the image, in place.
+
+        The image is filtered from its decoded array with the median filter
+        and sharpen, then with the RAG merge filter if `merge_filter` is set.
+        The merge filter runs in the filter pool, so it gives up when the
+        deadline passes. The colors sampled so far are dropped, as they were
+        read from the pixels before the filters.
+
+        Args:
+            image (object.image.Image): The image.
+            deadline (float): The seconds the filters may take, or None to
+                use the budget of the image.
+
+        Returns:
+            str: The filter path now applied, or None if there are no more
+                filters or the merge filter missed the deadline.
+        """
+        if self.raw is None:
+            return None
+
+        if deadline is None:
+            deadline = self.remaining()
+
+        if self.filter_path == UNFILTERED:
+            image.image[:] = median_sharpen_filter(self.raw)
+            self.filter_path = MEDIAN
+        elif self.filter_path == MEDIAN and self.options.merge_filter:
+            merged = self.run_merge(
+                to_array(to_rgb(pil_image.fromarray(self.raw))), deadline)
+
+            if merged is None:
+                self.merge_fallback = True
+                return None
+
+            image.image[..., :3] = merged
+            self.filter_path = MERGE
+        else:
+            return None
+
+        image.drop_samples()
+
+        return self.filter_path
@@ -2,6 +2,8 @@ from difflib import SequenceMatcher
 from profilehooks import timecall
 
 from configs.config import PRODUCT_MAP
+from configs.config import PRODUCT_INDEX
+from configs.config import PRODUCT_MATCHER
 from utils.logging_utils import logger
 
 LOGGER = logger('object')
@@ -14,17 +16,34 @@ class ProductException(Exception):
 class Product:
     """A product."""
 
-    def __init__(self, sequence):
+    def __init__(self, sequence, fuzzy=False):
+        self.sequence = sequence
         self.color_code = sequence.color_code
-        self.brightness_values = sequence.brightness_values
+        self.fuzzy = fuzzy
         self.product_name = self.get_name()
 
+    @property
+    def brightness_values(self):
+        """Return the brightness values, only collapsed if they're needed.
+
+        Returns:
+            str: The brightness values of the sequence.
+        """
+        return self.sequence.brightness_values
+
     @staticmethod
-    def is_valid(code):
+    def is_valid(code, fuzzy=False):
         """Determine whether the sequence is valid.
 
-        Check every rotation of the coded sequence to see if it exists in the
-        product map.
+        Look up the canonical rotation of the coded sequence in the product
+        index, so every rotation is checked with a single hash lookup. If
+        that fails, check whether a truncated rotation is part of a product.
+        Finally, if fuzzy matching is enabled, accept the most similar product
+        within the similarity threshold.
+
+        Args:
+            code (str): The coded sequence.
+            fuzzy (bool): Whether to fall back to fuzzy matching.
 
         Returns:
             str: The valid code or an empty string.
@@ -34,25 +53,23 @@ class Product:
             return code
 
         # O(n), n = code length.
-        for _ in code:
-            code = code[1:] + code[0]
-            if code in PRODUCT_MAP:
-                return code
-
-        # O(n * m), n = code length, m = number of pruducts.
-        for _ in code:
-            code = code[1:] + code[0]
-            for product in PRODUCT_MAP:
-                # If the products are 18 characters, then checking a substring
-                # of 16 characters will give a certainty of minimum 88%.
-                if (len(code) >= len(product) - 1 and
-                        code[:(len(product) - 2)] in product):
-                    return product
-
-        # O(nm^2+), n = code length, m = number of pruducts
-        # similar, _ = Product.check_similar(code, PRODUCT_MAP)
-        # if similar:
-        #     return similar
+        product = PRODUCT_INDEX.find_rotation(code)
+        if product:
+            return product
+
+        # O(n * k), n = code length, k = number of distinct product lengths.
+        # If the products are 18 characters, then checking a substring of 16
+        # characters will give a certainty of minimum 88%.
+        product = PRODUCT_INDEX.find_truncated(code)
+        if product:
+            return product
+
+        # Only the products sharing enough substrings with the code are
+        # compared, see ApproximateMatcher.
+        if fuzzy:
+            similar, _ = PRODUCT_MATCHER.match(code)
+            if similar:
+                return similar
 
         return ''
 
@@ -60,10 +77,9 @@ class Product:
     def check_similar(code, products):
         """Return a product code if it is within a threshhold of similarity.
 
-        Todo:
-            - This function is a huge speed bottleneck. Ideally I would like to
-            be able to register sequences that are similar but not exact
-            matches, but I want to find a faster way of doing it.
+        Note:
+            This function is a huge speed bottleneck, it is kept as the
+            reference for `ApproximateMatcher`, which is what `is_valid` uses.
 
         Args:
             code (str): The detected sequence from an image.
@@ -103,8 +119,9 @@ class Product:
         Returns:
             str: The product ID.
         """
-        valid_product_code = (Product.is_valid(self.color_code) or
-                              Product.is_valid(self.brightness_values))
+        valid_product_code = (Product.is_valid(self.color_code, self.fuzzy) or
+                              Product.is_valid(self.brightness_values,
+                                               self.fuzzy))
 
         if valid_product_code:
             return PRODUCT_MAP[valid_product_code]
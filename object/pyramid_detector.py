@@ -0,0 +1,166 @@
+#pylint: skip-file
+
+from profilehooks import timecall
+
+from configs.config import PRODUCT_MATCHER
+from object.coordinate_maps.dashed_ring_map import DashedRingMap
+from object.detector import Detector
+from object.pixel import Pixel
+from object.pixel import PixelException
+from object.product import Product
+from object.product import ProductException
+from object.sequence import Sequence
+from utils.logging_utils import logger
+
+LOGGER = logger('object')
+
+
+class PyramidDetector(Detector):
+    """
+    Detect an object from a given image, searching coarse to fine.
+
+    Every candidate ring is first scored on a downsampled level of the image
+    pyramid by how similar its code is to the closest product. Only the best
+    candidates are then read at full resolution, the rest are only tried in
+    priority order if none of those find a product.
+    """
+
+    def __init__(self,
+                 image,
+                 refine=2,
+                 min_radius=24,
+                 min_similarity=0.6,
+                 **kwargs):
+        super(PyramidDetector, self).__init__(image, **kwargs)
+        self.refine = refine
+        self.min_radius = min_radius
+        self.min_similarity = min_similarity
+
+    def get_coarse_level(self, candidates):
+        """Get the deepest pyramid level where every ring is still legible.
+
+        Args:
+            candidates (List[Tuple[Pixel, float]]): The candidates.
+
+        Returns:
+            int: The pyramid level.
+        """
+        radius = min(radius for _, radius in candidates)
+        level = 0
+
+        while radius / 2**(level + 1) >= self.min_radius:
+            level += 1
+
+        return level
+
+    def score_candidates(self, candidates, level):
+        """Score each candidate ring on a level of the image pyramid.
+
+        Scoring stops at the first ring that reads as a valid product, since
+        no other ring can rank above it.
+
+        Args:
+            candidates (List[Tuple[Pixel, float]]): The candidates.
+            level (int): The pyramid level.
+
+        Returns:
+            List[float]: The similarity of each ring to the closest product,
+                0 if it isn't similar to any, or -1 if it wasn't scored.
+        """
+        image_level = self.image.get_level(level)
+        scores = [-1] * len(candidates)
+        centers = {}
+        rings = {}
+
+        for index, (center_point, radius) in enumerate(candidates):
+            coords = (center_point.x / image_level.scale,
+                      center_point.y / image_level.scale)
+
+            if coords not in centers:
+                try:
+                    centers[coords] = Pixel(image_level.image, coords)
+                except PixelException:
+                    centers[coords] = None
+
+            if centers[coords]:
+                rings[index] = DashedRingMap(centers[coords],
+                                             radius / image_level.scale)
+
+        samples = image_level.sampler.sample_rings(
+            [ring.points for ring in rings.values()])
+
+        for (index, ring), ring_samples in zip(rings.items(), samples):
+            if ring_samples is None:
+                continue
+
+            # Only the colors are needed to score the ring.
+            code = Sequence(
+                image_level,
+                ring.center_point,
+                ring.points,
+                samples=ring_samples).color_code
+
+            if Product.is_valid(code):
+                scores[index] = 1
+            else:
+                _, similarity = PRODUCT_MATCHER.match(
+                    code, threshold=self.min_similarity)
+                scores[index] = max(similarity, 0)
+
+            if scores[index] == 1:
+                break
+
+        return scores
+
+    def rank_candidates(self, candidates):
+        """Order the candidates by their score on the coarse level.
+
+        Args:
+            candidates (List[Tuple[Pixel, float]]): The candidates.
+
+        Returns:
+            List[Tuple[Pixel, float]]: The candidates, best first. Ties keep
+                their priority order.
+        """
+        # The coarse levels are made from the whole image, so every ring
+        # needs to be filtered before they are.
+        self.image.filter_rings([
+            (center_point.coords, radius) for center_point, radius in candidates
+        ])
+        level = self.get_coarse_level(candidates)
+        scores = self.score_candidates(candidates, level)
+        order = sorted(range(len(candidates)), key=lambda index: -scores[index])
+
+        return [candidates[index] for index in order]
+
+    @timecall
+    def detect_product(self):
+        """Detect a product based on the image.
+
+        Returns:
+            str: The product name.
+        """
+        self.timings = []
+        candidates = self.get_candidates()
+        best = self.rank_candidates(candidates)[:self.refine]
+
+        for center_point, radius in best:
+            try:
+                product_name = self.time_product_name(center_point, radius)
+            except PixelException:
+                continue
+
+            if product_name:
+                return product_name
+
+        # Fall back to the full search for the rest of the candidates.
+        for center_point, radius in candidates:
+            if (center_point, radius) in best:
+                continue
+
+            product_name = self.time_product_name(center_point, radius)
+
+            if product_name:
+                return product_name
+
+        raise ProductException("Product not found.")
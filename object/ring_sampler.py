@@ -0,0 +1,281 @@
+import cv2
+import numpy as np
+
+from object.pixel import PixelException
+from utils.color_utils import CODE_NAMES
+from utils.color_tables import lookup_color_codes
+from utils.color_tables import lookup_brightness_values
+
+# Marks the pixels of a color plane that haven't been classified yet, no color
+# code is ever this large.
+UNCLASSIFIED = 255
+
+
+class RingSampler:
+    """Sample the colors and brightness values of many pixels at once.
+
+    Rather than building a `Pixel` for every coordinate on a ring, the image
+    is converted to an array a single time and every coordinate is gathered
+    with one index operation, then classified with the color lookup tables.
+
+    The color codes and brightness values are kept in planes the size of the
+    image, so that pixels shared by several rings are only classified once.
+    The planes are filled in as pixels are sampled, rather than classifying
+    the whole image up front.
+    """
+
+    def __init__(self, image, steps=3):
+        self.pixels = np.asarray(image)
+        self.height, self.width = self.pixels.shape[:2]
+        self.steps = steps
+        self.color_plane = None
+        self.brightness_plane = None
+
+    @property
+    def nbytes(self):
+        """Return the memory used by the color and brightness planes.
+
+        Returns:
+            int: The size of the planes in bytes.
+        """
+        if self.color_plane is None:
+            return 0
+
+        return self.color_plane.nbytes + self.brightness_plane.nbytes
+
+    def get_planes(self):
+        """Get the color code and brightness planes, allocating them once.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: The uint8 color code and
+                brightness planes, `UNCLASSIFIED` where nothing was sampled.
+        """
+        if self.color_plane is None:
+            self.brightness_plane = np.zeros(
+                (self.height, self.width), dtype=np.uint8)
+            self.color_plane = np.full(
+                (self.height, self.width), UNCLASSIFIED, dtype=np.uint8)
+
+        return self.color_plane, self.brightness_plane
+
+    def classify(self, points):
+        """Get the color code and brightness of each point from the planes.
+
+        Only the points that haven't been classified before are looked up in
+        the color tables. The brightness is stored before the color code, so
+        a point is never read as classified without its brightness.
+
+        Args:
+            points (numpy.ndarray): The (x, y) points, all in the image.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: The uint8 color codes and
+                brightness percentages.
+        """
+        color_plane, brightness_plane = self.get_planes()
+        x, y = points[:, 0], points[:, 1]
+        codes = color_plane[y, x]
+        unclassified = codes == UNCLASSIFIED
+
+        if unclassified.any():
+            x, y = x[unclassified], y[unclassified]
+            pixels = self.pixels[y, x]
+            brightness_plane[y, x] = lookup_brightness_values(pixels)
+            codes[unclassified] = color_plane[y, x] = lookup_color_codes(pixels)
+
+        return codes, brightness_plane[points[:, 1], points[:, 0]]
+
+    def check_bounds(self, coordinates):
+        """Convert the coordinates to points that are all in bounds.
+
+        Args:
+            coordinates (List[Tuple[int, int]]): The coordinates to sample.
+
+        Returns:
+            numpy.ndarray: The (x, y) points.
+
+        Raises:
+            PixelException: If any of the coordinates are out of bounds.
+        """
+        points = np.asarray(coordinates, dtype=int).reshape(-1, 2)
+        out_of_bounds = self.out_of_bounds(points)
+
+        if out_of_bounds.any():
+            coords = tuple(points[out_of_bounds][0])
+            raise PixelException(
+                f"The new coordinates {coords} are out of bounds.")
+
+        return points
+
+    def out_of_bounds(self, points):
+        """Check which of the points are at the edge of the image.
+
+        Uses the same margin as `Pixel.out_of_bounds`.
+
+        Args:
+            points (numpy.ndarray): The (x, y) points.
+
+        Returns:
+            numpy.ndarray: Whether each point is at the edge of the image.
+        """
+        x, y = points[:, 0], points[:, 1]
+
+        return ((self.width - self.steps <= x) | (x < 0) |
+                (self.height - self.steps <= y) | (y < 0))
+
+    def sample(self, coordinates):
+        """Get the RGB value of the image at each coordinate.
+
+        Args:
+            coordinates (List[Tuple[int, int]]): The coordinates to sample.
+
+        Returns:
+            numpy.ndarray: The RGB value for each coordinate.
+
+        Raises:
+            PixelException: If any of the coordinates are out of bounds.
+        """
+        points = self.check_bounds(coordinates)
+
+        return self.pixels[points[:, 1], points[:, 0]]
+
+    def get_colors(self, coordinates):
+        """Get the color name for each coordinate.
+
+        Args:
+            coordinates (List[Tuple[int, int]]): The coordinates to sample.
+
+        Returns:
+            List[str]: The color names.
+        """
+        return CODE_NAMES[lookup_color_codes(self.sample(coordinates))].tolist()
+
+    def get_brightness_values(self, coordinates):
+        """Get the rounded brightness percentage for each coordinate.
+
+        Args:
+            coordinates (List[Tuple[int, int]]): The coordinates to sample.
+
+        Returns:
+            List[int]: The brightness percentages.
+        """
+        return lookup_brightness_values(self.sample(coordinates)).tolist()
+
+    def sample_codes(self, coordinates):
+        """Get the color code and brightness of each coordinate in one pass.
+
+        Args:
+            coordinates (List[Tuple[int, int]]): The coordinates to sample.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: The uint8 color codes and
+                brightness percentages.
+
+        Raises:
+            PixelException: If any of the coordinates are out of bounds.
+        """
+        return self.classify(self.check_bounds(coordinates))
+
+    def sample_rings(self, rings):
+        """Get the color codes and brightness values of several rings at once.
+
+        The points of every ring are gathered and classified together. Rings
+        with any point out of bounds are not sampled.
+
+        Args:
+            rings (List[numpy.ndarray]): The (x, y) points of each ring.
+
+        Returns:
+            List[Tuple[numpy.ndarray, numpy.ndarray]]: The uint8 color codes
+                and brightness percentages of each ring, or None if it is out
+                of bounds.
+        """
+        points = np.concatenate(rings).reshape(-1, 2)
+        ends = np.cumsum([len(ring) for ring in rings])
+        out_of_bounds = self.out_of_bounds(points)
+
+        # Read the first pixel in place of the points out of bounds, their
+        # rings are discarded anyway.
+        points = np.where(out_of_bounds[:, None], 0, points)
+        codes, brightness_values = self.classify(points)
+        codes = np.split(codes, ends[:-1])
+        brightness_values = np.split(brightness_values, ends[:-1])
+        out_of_bounds = np.split(out_of_bounds, ends[:-1])
+
+        return [
+            None if outside.any() else (ring_codes, ring_brightness_values)
+            for ring_codes, ring_brightness_values, outside in zip(
+                codes, brightness_values, out_of_bounds)
+        ]
+
+
+class PolarSampler(RingSampler):
+    """Sample the rings around a single center from a polar unwrapped image.
+
+    The image is unwrapped with `cv2.warpPolar` a single time, so that row r
+    of the pixels holds the ring of radius r and column k holds the k-th
+    angle, counter clockwise from the leftmost point like `DashedRingMap`.
+    Sampling a ring at any radius is then a contiguous row read.
+
+    Only the rings that fit inside the image are unwrapped, since any larger
+    ring would reach the edge of the image anyway.
+    """
+
+    def __init__(self, image, center, angles=360, steps=3):
+        pixels = np.ascontiguousarray(np.asarray(image)[..., 0:3])
+        self.image_height, self.image_width = pixels.shape[:2]
+        x, y = center
+        max_radius = max(
+            int(min(x, y, self.image_width - x, self.image_height - y)), 0) + 1
+        warped = cv2.warpPolar(  #pylint: disable=no-member
+            pixels, (max_radius, angles), (x, y), max_radius,
+            cv2.INTER_NEAREST + cv2.WARP_POLAR_LINEAR)  #pylint: disable=no-member
+
+        # warpPolar starts at the right and puts the angles in the rows.
+        order = (angles // 2 - np.arange(angles)) % angles
+        super(PolarSampler, self).__init__(
+            np.ascontiguousarray(warped[order].transpose(1, 0, 2)), steps)
+
+        self.center = center
+        self.angles = angles
+        self.cosines = np.cos(2 * np.pi * np.arange(angles) / angles)
+        self.sines = np.sin(2 * np.pi * np.arange(angles) / angles)
+
+    def out_of_bounds(self, points):
+        """Check which of the polar points are at the edge of the image.
+
+        Each point is mapped back to the image coordinates it was read from
+        and checked with the same margin as `Pixel.out_of_bounds`.
+
+        Args:
+            points (numpy.ndarray): The (angle, radius) points.
+
+        Returns:
+            numpy.ndarray: Whether each point is at the edge of the image.
+        """
+        angles, radii = points[:, 0], points[:, 1]
+        x = np.trunc(self.center[0] - radii * self.cosines[angles])
+        y = np.trunc(self.center[1] + radii * self.sines[angles])
+
+        return ((radii >= self.height) | (self.image_width - self.steps <= x) |
+                (x < 0) | (self.image_height - self.steps <= y) | (y < 0))
+
+    def scan(self, radii):
+        """Get the color codes of the rings at several radii at once.
+
+        Args:
+            radii (List[int]): The radii of the rings.
+
+        Returns:
+            numpy.ndarray: The color codes, with a row for each radius.
+
+        Raises:
+            PixelException: If any of the rings are out of bounds.
+        """
+        radii = np.asarray(radii, dtype=int)
+        points = np.stack(
+            np.broadcast_arrays(np.arange(self.angles), radii[:, None]),
+            axis=-1)
+        codes, _ = self.classify(self.check_bounds(points.reshape(-1, 2)))
+
+        return codes.reshape(len(radii), -1)
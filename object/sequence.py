@@ -1,50 +1,101 @@
-from object.pixel import Pixel
 from utils.logging_utils import logger
+from utils.color_utils import CODE_NAMES
+from utils.color_utils import COLOR_CODES
 from utils.color_utils import sequence_to_color_code
-from utils.list_utils import collapse
+from utils.list_utils import collapse_codes
 
 LOGGER = logger('object')
 
 
 class Sequence:
-    """The sequences of colors and brightness values from an image."""
+    """The sequences of colors and brightness values from an image.
 
-    def __init__(self, image, center_coord, coordinates):
-        self.image = image.image
+    The ring is sampled once into an array of color codes and an array of
+    brightness values. The collapsed colors, color code and brightness values
+    are only worked out the first time they are used, so a ring whose color
+    code is a product never collapses its brightness values.
+    """
+
+    def __init__(self,
+                 image,
+                 center_coord,
+                 coordinates,
+                 sampler=None,
+                 samples=None):
         self.center_coord = center_coord
         self.coordinates = coordinates
-        self.colors = self.get_colors()
-        self.brightness_values = self.get_brightness_values()
-        self.color_code = sequence_to_color_code(self.colors)
-        self.sequence = self.calculate_sequence()
+        self.codes, self.brightness = (
+            samples or (sampler or image.sampler).sample_codes(coordinates))
+        self._colors = None
+        self._color_code = None
+        self._brightness_values = None
+
+    @property
+    def colors(self):
+        """Return the collapsed color names.
+
+        Returns:
+            List[str]: The color names.
+        """
+        if self._colors is None:
+            self._colors = self.get_colors()
+
+        return self._colors
+
+    @property
+    def color_code(self):
+        """Return the code of the collapsed colors.
+
+        Returns:
+            str: The color code.
+        """
+        if self._color_code is None:
+            self._color_code = sequence_to_color_code(self.colors)
+
+        return self._color_code
+
+    @property
+    def brightness_values(self):
+        """Return the code of the collapsed brightness values.
+
+        Returns:
+            str: The brightness values.
+        """
+        if self._brightness_values is None:
+            self._brightness_values = self.get_brightness_values()
+
+        return self._brightness_values
+
+    @property
+    def sequence(self):
+        """Return the codes and colors of the sequence.
+
+        Returns:
+            dict: The color code, colors and brightness values.
+        """
+        return self.calculate_sequence()
 
     def get_colors(self):
-        """Get the pixel color for each coordinate.
+        """Get the collapsed color names of the ring.
 
         Returns:
-            str: The integer representation of a color sequence.
+            List[str]: The color names.
         """
-        # Get the color of each pixel.
-        colors = [Pixel(self.image, coord).color for coord in self.coordinates]
+        center_code = COLOR_CODES[self.center_coord.color]
 
         # Collapse adjacent duplicates into a single element.
-        return collapse(colors, self.center_coord.color)
+        return CODE_NAMES[collapse_codes(self.codes, center_code)].tolist()
 
     def get_brightness_values(self):
-        """Get the brightness for each coordinate.
+        """Get the collapsed brightness values of the ring.
 
         Returns:
             str: The sequence of brightness values.
         """
-        # Get the brightness for each pixel.
-        brightness_values = [
-            Pixel(self.image, coord).brightness for coord in self.coordinates
-        ]
-
         # Collapse adjacent duplicates into a single element.
-        values = collapse(brightness_values, self.center_coord.brightness)
+        values = collapse_codes(self.brightness, self.center_coord.brightness)
 
-        return ''.join(map(str, values))
+        return ''.join(map(str, values.tolist()))
 
     def calculate_sequence(self):
         """Get the code corresponding to the colors in the sequence.
@@ -0,0 +1,79 @@
+import os
+import shutil
+from io import BytesIO
+
+
+class Storage:
+    """An abstract class for the storage the uploaded images are read from.
+
+    The images are downloaded into memory and handed to `Image` as file
+    objects, so nothing is written to disk or left to clean up.
+    """
+
+    def download(self, path, file_object):
+        """Abstract method for writing a stored file into a file object.
+
+        Args:
+            path (str): The path to the file in the storage.
+            file_object (BinaryIO): The file object to write to.
+        """
+
+    def open(self, path):
+        """Download a stored file into memory.
+
+        Args:
+            path (str): The path to the file in the storage.
+
+        Returns:
+            BytesIO: The file, read from the start.
+        """
+        buffer = BytesIO()
+        self.download(path, buffer)
+        buffer.seek(0)
+
+        return buffer
+
+
+class LocalStorage(Storage):
+    """Files stored in a local directory."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def download(self, path, file_object):
+        """Copy a file in the directory into a file object.
+
+        Args:
+            path (str): The path to the file, relative to the directory.
+            file_object (BinaryIO): The file object to write to.
+        """
+        with open(os.path.join(self.root, path), 'rb') as f:
+            shutil.copyfileobj(f, file_object)
+
+
+class MemoryStorage(Storage):
+    """Files held in memory, to run the app and its benchmarks offline."""
+
+    def __init__(self, files=None):
+        self.files = dict(files or {})
+
+    def upload(self, path, data):
+        """Store the contents of a file.
+
+        Args:
+            path (str): The path to the file in the storage.
+            data (bytes): The contents of the file.
+        """
+        self.files[path] = bytes(data)
+
+    def download(self, path, file_object):
+        """Write a stored file into a file object.
+
+        Args:
+            path (str): The path to the file in the storage.
+            file_object (BinaryIO): The file object to write to.
+
+        Raises:
+            KeyError: If no file is stored at the path.
+        """
+        file_object.write(self.files[path])
@@ -13,6 +13,7 @@ var toggleFullScreenButton;
 var switchCameraButton;
 var amountOfCameras = 0;
 var currentFacingMode = 'environment';
+var uploadFormat = getUploadFormat();
 
 document.addEventListener("DOMContentLoaded", function(event) {
 
@@ -194,6 +195,21 @@ function initCameraStream() {
 
 }
 
+// Upload WebP where the browser can encode it and JPEG otherwise, both far
+// smaller than PNG. Browsers that can't encode WebP return a PNG instead.
+function getUploadFormat() {
+
+    var canvas = document.createElement('canvas');
+    canvas.width = 1;
+    canvas.height = 1;
+
+    if(canvas.toDataURL('image/webp').indexOf('data:image/webp') == 0) {
+        return { type: 'image/webp', extension: '.webp' };
+    }
+
+    return { type: 'image/jpeg', extension: '.jpg' };
+}
+
 function takeSnapshot() {
     
     // if you'd like to show the canvas add it to the DOM
@@ -207,16 +223,16 @@ function takeSnapshot() {
 
     var storageRef = firebase.storage().ref();
     var id = (Math.floor(Math.random() * (1000000 - 1)) + 1).toString();
-    var ref = storageRef.child("images/" + id + ".png");
+    var ref = storageRef.child("images/" + id + uploadFormat.extension);
     context = canvas.getContext('2d');
     context.drawImage(video, 0, 0, width, height);
 
-    var data = canvas.toDataURL('image/png');
+    var data = canvas.toDataURL(uploadFormat.type, 0.92);
     ref.putString(data, 'data_url').then(function(snapshot) {
       console.log('Uploaded a data_url string!');
       var xhr = new XMLHttpRequest();
       var baseUrl = window.location.href.split('/')[0];
-      xhr.open('GET', baseUrl + "images/" + id, true);
+      xhr.open('GET', baseUrl + "images/" + id + uploadFormat.extension, true);
       xhr.send();
       xhr.onreadystatechange = processRequest;
       function processRequest(e) {
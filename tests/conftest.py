@@ -1,9 +1,11 @@
 from unittest.mock import Mock
 from unittest.mock import MagicMock
+import numpy as np
 from pytest import fixture
 
 from object.coordinate_maps.dashed_ring_map import DashedRingMap
 from object.pixel import Pixel
+from object.ring_sampler import RingSampler
 
 
 @fixture()
@@ -78,3 +80,36 @@ def pixel(large_image):
     A pixel.
     """
     return Pixel(large_image, (30, 30))
+
+
+@fixture()
+def ring_image():
+    """
+    A small image array with a few known colors.
+    """
+    image = np.full((6, 6, 3), 255, dtype=np.uint8)
+    image[1, 1] = (255, 0, 0)
+    image[1, 2] = (0, 0, 0)
+
+    return image
+
+
+@fixture()
+def dashed_ring_image():
+    """
+    A mock image of twelve red dashes on a white background, centered at
+    (56, 52) with a radius of 30, photographed with its center at (50, 50).
+    """
+    height, width = 100, 100
+    y, x = np.mgrid[0:height, 0:width]
+    distance = np.hypot(x - 56, y - 52)
+    angle = np.degrees(np.arctan2(y - 52, x - 56)) % 30
+
+    pixels = np.full((height, width, 3), 255, dtype=np.uint8)
+    pixels[(abs(distance - 30) <= 4) & (angle < 20)] = (255, 0, 0)
+
+    image = Mock()
+    image.sampler = RingSampler(pixels)
+    image.center_point.coords = (50, 50)
+
+    return image
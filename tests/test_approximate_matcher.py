@@ -0,0 +1,77 @@
+from utils.approximate_matcher import ApproximateMatcher
+from utils.approximate_matcher import cyclic_grams
+from utils.approximate_matcher import edit_distance
+from utils.approximate_matcher import pattern_masks
+
+PRODUCT = '020202030303040404050505000000010101'
+
+
+def test_cyclic_grams():
+    expected = ['012', '123', '230', '301']
+    actual = cyclic_grams('0123', 3)
+
+    assert expected == actual
+
+
+def test_edit_distance():
+    expected = 3
+    actual = edit_distance(pattern_masks('kitten'), 6, 'sitting')
+
+    assert expected == actual
+
+
+def test_approximate_matcher_exact_rotation():
+    code = '030303040404050505000000010101020202'
+    expected = (PRODUCT, 1)
+    actual = ApproximateMatcher([PRODUCT]).match(code)
+
+    assert expected == actual
+
+
+def test_approximate_matcher_almost_exact_values():
+    code = '020202030303040404050505000000010111'
+    expected = (PRODUCT, 0.97)
+    actual = ApproximateMatcher([PRODUCT]).match(code)
+
+    assert expected == actual
+
+
+def test_approximate_matcher_rotated_with_insertion():
+    code = '0303030404040505050000000101010202022'
+    expected = (PRODUCT, 0.97)
+    actual = ApproximateMatcher([PRODUCT]).match(code)
+
+    assert expected == actual
+
+
+def test_approximate_matcher_90_percent_similar():
+    code = '020202030303040404050505000000010999'
+    expected = (PRODUCT, 0.92)
+    actual = ApproximateMatcher([PRODUCT]).match(code)
+
+    assert expected == actual
+
+
+def test_approximate_matcher_below_threshold():
+    code = '020202030303040404050505000000999999'
+    expected = None
+    actual, _ = ApproximateMatcher([PRODUCT]).match(code)
+
+    assert expected == actual
+
+
+def test_approximate_matcher_unreachable_scores_zero():
+    code = '111111111111111111111111111111111111'
+    expected = (None, 0)
+    actual = ApproximateMatcher([PRODUCT]).match(code)
+
+    assert expected == actual
+
+
+def test_approximate_matcher_picks_most_similar():
+    other = '020202030303040404050505000000010999'
+    code = '020202030303040404050505000000010199'
+    expected = (other, 0.97)
+    actual = ApproximateMatcher([PRODUCT, other]).match(code)
+
+    assert expected == actual
@@ -0,0 +1,42 @@
+from pytest import raises
+
+from object.batch_detector import BatchDetector
+from object.coordinate_maps.polar_ring_map import PolarRingMap
+from object.image import Image
+from object.product import ProductException
+
+BASE_TEST_IMAGE_PATH = "/Users/axelthor/Projects/object/tests/test_images"
+
+
+def get_product(image_name, **kwargs):
+    """Return a product from the image name shorthand.
+    """
+    image = Image(f"{BASE_TEST_IMAGE_PATH}/{image_name}")
+    detector = BatchDetector(image, **kwargs)
+
+    return detector.detect_product()
+
+
+def test_batch_detect_circle_black_and_white():
+    product = get_product("circle_black_and_white.png")
+
+    assert product == 'circle-18-black-and-white'
+
+
+def test_batch_detect_circle_med_18_round():
+    product = get_product("circle_med_18_round.png")
+
+    assert product == 'circle-18-multi-color'
+
+
+def test_batch_detect_polar_real_test_circle_1():
+    product = get_product("real_test_circle_1.png", coordinate_map=PolarRingMap)
+
+    assert product == 'circle-18-multi-color'
+
+
+def test_batch_detect_circle_thick_18_square_one_off():
+    with raises(ProductException) as exception:
+        get_product("circle_thick_18_square_one_off.png")
+
+    assert str(exception.value) == 'Product not found.'
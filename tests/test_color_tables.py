@@ -0,0 +1,51 @@
+import numpy as np
+
+from utils.color_utils import get_color
+from utils.color_utils import get_brightness
+from utils.color_utils import COLOR_CODES
+from utils.color_tables import build_brightness_table
+from utils.color_tables import load_color_table
+from utils.color_tables import lookup_color_codes
+from utils.color_tables import lookup_brightness_values
+
+
+def test_color_table_matches_get_color(tmpdir):
+    """
+    Test that the color table is cached on disk and gives the same color as
+    naming each pixel.
+    """
+    load_color_table.cache_clear()
+    load_color_table(str(tmpdir))
+    load_color_table.cache_clear()
+    table = load_color_table(str(tmpdir))
+    load_color_table.cache_clear()
+
+    rgb = np.random.RandomState(0).randint(0, 256, (2000, 3))
+    expected = [COLOR_CODES[get_color(value)[0]] for value in rgb.tolist()]
+    actual = table[rgb[:, 0], rgb[:, 1], rgb[:, 2]].tolist()
+
+    assert expected == actual
+    assert len(tmpdir.listdir()) == 1
+    assert isinstance(table, np.memmap)
+
+
+def test_lookup_color_codes():
+    """
+    Test that the codes are looked up for each pixel.
+    """
+    expected = [COLOR_CODES['red'], COLOR_CODES['white']]
+    actual = lookup_color_codes([(255, 0, 0), (255, 255, 255)]).tolist()
+
+    assert expected == actual
+
+
+def test_lookup_brightness_values():
+    """
+    Test that the brightness table matches the rounded pixel brightness.
+    """
+    rgb = [(0, 0, 0), (55, 0, 0), (199, 175, 175), (255, 255, 255)]
+    expected = [round(get_brightness(value)[0] * 100) for value in rgb]
+    actual = lookup_brightness_values(rgb).tolist()
+
+    assert expected == actual
+    assert len(build_brightness_table()) == 256
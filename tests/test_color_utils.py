@@ -1,7 +1,11 @@
 from pytest import raises
 
 from utils.color_utils import get_color
+from utils.color_utils import get_colors
+from utils.color_utils import get_brightness
+from utils.color_utils import get_brightnesses
 from utils.color_utils import get_most_likely_colors
+from utils.color_utils import CSS3_INDEX
 from utils.color_utils import sequence_to_color_code
 from utils.color_utils import get_hue_name
 from utils.color_utils import ColorException
@@ -170,3 +174,47 @@ def test_get_hue_name_raises_exception_on_invalid_hue():
     """
     with raises(ColorException, match="Hue -1 not found."):
         get_hue_name(-1)
+
+
+def test_get_colors_matches_get_color():
+    """
+    Test that the vectorized color names are the same as naming each pixel.
+    """
+    channel = range(0, 256, 15)
+    rgb = [(red, green, blue) for red in channel for green in channel
+           for blue in channel]
+    expected = [get_color(value)[0] for value in rgb]
+    actual = get_colors(rgb).tolist()
+
+    assert expected == actual
+
+
+def test_get_brightnesses_matches_get_brightness():
+    """
+    Test that the vectorized brightness values are the same as for each pixel.
+    """
+    rgb = [(0, 0, 0), (55, 0, 0), (199, 175, 175), (255, 255, 255)]
+    expected = [get_brightness(value)[0] for value in rgb]
+    actual = get_brightnesses(rgb).tolist()
+
+    assert expected == actual
+
+
+def test_get_most_likely_colors_breaks_ties_by_name():
+    """
+    Test that colors at the same distance are returned in order of name.
+    """
+    expected = ['greenyellow', 'yellowgreen', 'chartreuse']
+    actual = get_most_likely_colors((191, 246, 23))
+
+    assert expected == actual
+
+
+def test_css3_index_query_array():
+    """
+    Test that an array of pixels returns the closest colors for each pixel.
+    """
+    expected = [['black', 'darkgreen'], ['white', 'snow']]
+    actual = CSS3_INDEX.query([(0, 0, 0), (255, 255, 255)], k=2).tolist()
+
+    assert expected == actual
@@ -1,3 +1,9 @@
+from object.candidates import candidate_rings
+from object.candidates import image_center
+from object.coordinate_maps.dashed_ring_map import DashedRingMap
+from object.pixel import Pixel
+
+
 def test_coordinate_maps_sort_coordinates(coordinate_map):
     """
     Test that the list of coordinates is sorted using the degree from the
@@ -24,3 +30,28 @@ def test_coordinate_map_get_coordinates(coordinate_map):
     actual = coordinate_map.get_coordinates()
 
     assert expected == actual
+
+
+def test_dashed_ring_map_reuses_template(center_pixel):
+    """
+    Test that rings with the same radius share a template wherever the center
+    is, and that the translated ring matches the ring at the new center.
+    """
+    first = DashedRingMap(Pixel(center_pixel.image, (10, 10)), 3.5)
+    hits = DashedRingMap.cache_info().hits
+    second = DashedRingMap(Pixel(center_pixel.image, (11, 11)), 3.5)
+
+    assert DashedRingMap.cache_info().hits == hits + 1
+    assert [(x + 1, y + 1) for x, y in first.coordinates] == second.coordinates
+
+
+def test_dashed_ring_map_warm_cache():
+    """
+    Test that warming the cache builds the templates for the candidate rings.
+    """
+    rings = candidate_rings(image_center((64, 48)))
+    DashedRingMap.warm_cache(rings)
+    hits = DashedRingMap.cache_info().hits
+    DashedRingMap.warm_cache(rings)
+
+    assert DashedRingMap.cache_info().hits == hits + len(rings)
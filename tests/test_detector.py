@@ -1,17 +1,27 @@
+from time import sleep
+from unittest.mock import Mock
+
+import numpy as np
+from PIL import Image as pil_image
 from pytest import raises
 
+from object.candidates import ROI_TILE_SIZE
+from object.coordinate_maps.polar_ring_map import PolarRingMap
 from object.detector import Detector
 from object.image import Image
+from object.preprocessor import Preprocessor
 from object.product import ProductException
 
 BASE_TEST_IMAGE_PATH = "/Users/axelthor/Projects/object/tests/test_images"
+UNPROCESSED_TEST_IMAGE_PATH = (
+    "/Users/axelthor/Projects/object/tests/test_images_unproccessed")
 
 
-def get_product(image_name):
+def get_product(image_name, **kwargs):
     """Return a product from the image name shorthand.
     """
     image = Image(f"{BASE_TEST_IMAGE_PATH}/{image_name}")
-    detector = Detector(image)
+    detector = Detector(image, **kwargs)
 
     return detector.detect_product()
 
@@ -132,6 +142,147 @@ def test_detect_circle_thick_18_square_sim_colors():
     assert product == 'circle-18-square-sim-colors'
 
 
+def test_detect_quantized_circle_thick_18_square_sim_colors():
+    image = Image(
+        f"{BASE_TEST_IMAGE_PATH}/circle_thick_18_square_sim_colors.png",
+        quantize=True)
+
+    assert Detector(image).detect_product() == 'circle-18-square-sim-colors'
+
+
+def test_detect_auto_filtered_real_test_circle_4():
+    image = Image(
+        f"{BASE_TEST_IMAGE_PATH}/real_test_circle_4.png", auto_filter=True)
+
+    assert image.preprocessor.filter_path == 'merge'
+    assert Detector(image).detect_product() == 'circle-18-multi-color'
+
+
+def test_detect_cascade_clean_image_in_first_stage():
+    image = Image(
+        f"{BASE_TEST_IMAGE_PATH}/circle_thick_18_square.png", budget=10)
+    result = Detector(image).detect_cascade()
+
+    assert result.product_name == 'circle-18-multi-color'
+    assert result.filter_path == 'unfiltered'
+    assert result.stages == 1
+
+
+def test_detect_cascade_escalates_to_median_filter():
+    image = Image(f"{BASE_TEST_IMAGE_PATH}/circle_med_18_round.png", budget=10)
+    result = Detector(image).detect_cascade()
+
+    assert result.product_name == 'circle-18-multi-color'
+    assert result.filter_path == 'median'
+    assert result.stages == 2
+    assert not result.timed_out
+
+
+def test_detect_cascade_without_product_tries_every_stage():
+    image = Image(
+        f"{BASE_TEST_IMAGE_PATH}/circle_thick_18_square_one_off.png", budget=10)
+    result = Detector(image).detect_cascade()
+
+    assert result.product_name == ''
+    assert result.stages == 2
+    assert not result.timed_out
+
+
+def test_detect_cascade_out_of_budget():
+    image = Image(f"{BASE_TEST_IMAGE_PATH}/circle_med_18_round.png")
+    result = Detector(image, budget=0).detect_cascade()
+
+    assert result.product_name == ''
+    assert result.timed_out
+
+    with raises(ProductException) as exception:
+        Detector(image, budget=0).detect_product()
+
+    assert exception.value.args[0] == 'Product not found within budget.'
+
+
+def test_detect_cascade_starts_from_auto_filters():
+    image = Image(
+        f"{BASE_TEST_IMAGE_PATH}/real_test_circle_1.png",
+        auto_filter=True,
+        budget=10)
+    result = Detector(image).detect_cascade()
+
+    assert image.preprocessor.quality
+    assert result.product_name == 'circle-18-multi-color'
+    assert result.filter_path == 'median'
+    assert result.stages == 2
+
+
+def test_budget_with_roi_or_quantize():
+    path = f"{BASE_TEST_IMAGE_PATH}/circle_med_18_round.png"
+
+    with raises(ValueError):
+        Image(path, budget=10, roi=True)
+
+    with raises(ValueError):
+        Image(path, budget=10, quantize=True)
+
+
+def test_detect_jpeg_decoded_at_working_size(tmpdir):
+    """
+    Test that a large JPEG is decoded at a reduced scale, no larger than the
+    working size, and its product is still found.
+    """
+    path = str(tmpdir.join('circle_thick_18_square.jpg'))
+    large = pil_image.open(f"{BASE_TEST_IMAGE_PATH}/circle_thick_18_square.png")
+    large.resize((2040, 2040)).save(path, quality=92)
+
+    jpeg = pil_image.open(path)
+    shrunk = Preprocessor.shrink(jpeg, 384)
+    image = Image(path, working_size=384)
+
+    assert jpeg.size == (510, 510)
+    assert shrunk.size == (384, 384)
+    assert image.image.shape[:2] == (384, 384)
+    assert Detector(image).detect_product() == 'circle-18-multi-color'
+
+
+def test_detect_cropped_around_ring():
+    """
+    Test that an uncropped photo is cropped to a square around the ring, and
+    its product is still found.
+    """
+    image = Image(
+        f"{UNPROCESSED_TEST_IMAGE_PATH}/circle_thick_18_square.png", crop=True)
+    left, top, right, bottom = image.preprocessor.crop_box
+
+    assert right - left == bottom - top == image.image.shape[0]
+    assert 0 < image.preprocessor.crop_reduction < 1
+    assert Detector(image).detect_product() == 'circle-18-multi-color'
+
+
+def test_crop_box_fits_candidate_rings():
+    """
+    Test that a tight square around the ring is padded until every candidate
+    ring can be sampled.
+    """
+    image = Image(
+        f"{BASE_TEST_IMAGE_PATH}/circle_thin_50_square.png", crop=True)
+    left, top, right, bottom = image.preprocessor.crop_box
+    detector = Detector(image)
+
+    assert right - left == bottom - top
+    assert Preprocessor.fits_candidates(right - left)
+
+    for center_point, radius in detector.get_grid_candidates():
+        detector.get_product_name(center_point, radius)
+
+
+def test_crop_box_without_ring():
+    """
+    Test that an image that's the same color all over isn't cropped.
+    """
+    image = pil_image.new('RGB', (300, 200), (255, 255, 255))
+
+    assert Preprocessor.find_crop_box(image) is None
+
+
 # Unknown product tests:
 
 
@@ -175,3 +326,115 @@ def test_detect_circle_thick_18_square_two_removed():
         get_product("circle_thick_18_square_two_removed.png")
 
     assert str(exception.value) == 'Product not found.'
+
+
+# Polar unwrapped rings:
+
+
+def test_detect_polar_circle_med_18_round():
+    product = get_product(
+        "circle_med_18_round.png", coordinate_map=PolarRingMap)
+
+    assert product == 'circle-18-multi-color'
+
+
+def test_detect_polar_real_test_circle_1():
+    product = get_product("real_test_circle_1.png", coordinate_map=PolarRingMap)
+
+    assert product == 'circle-18-multi-color'
+
+
+def test_detect_polar_circle_thick_18_square_one_off():
+    with raises(ProductException) as exception:
+        get_product(
+            "circle_thick_18_square_one_off.png", coordinate_map=PolarRingMap)
+
+    assert str(exception.value) == 'Product not found.'
+
+
+# Parallel search:
+
+
+class CenterPoint:
+    """A stand in for a center pixel."""
+
+    def __init__(self, coords):
+        self.coords = coords
+
+
+class DelayedDetector(Detector):
+    """A detector with candidates that take a given time to check."""
+
+    def __init__(self, candidates, **kwargs):
+        super().__init__(Mock(preprocessor=Mock(deadline=None)), **kwargs)
+        self.candidates = candidates
+
+    def get_grid_candidates(self):
+        return [(CenterPoint((index, index)), radius)
+                for index, radius in enumerate(self.candidates)]
+
+    def get_product_name(self, center_point, radius):
+        delay, product_name = radius
+        sleep(delay)
+
+        return product_name
+
+
+def test_detect_parallel_real_test_circle_1():
+    image = Image(f"{BASE_TEST_IMAGE_PATH}/real_test_circle_1.png")
+    detector = Detector(image, workers=4)
+
+    assert detector.detect_product() == 'circle-18-multi-color'
+    assert detector.timings
+
+
+def test_detect_parallel_highest_priority_wins():
+    """
+    Test that a slower candidate with a higher priority wins over a faster
+    one, and that the candidates after it are skipped.
+    """
+    candidates = [(0.05, ''), (0.1, 'first'), (0, 'second')] + [(0.2, '')] * 8
+    detector = DelayedDetector(candidates, workers=3)
+
+    assert detector.detect_product() == 'first'
+    assert len(detector.timings) == 3
+
+
+def test_detect_parallel_waits_for_running_candidates():
+    """
+    Test that the candidates still running when a product is found are
+    waited for, so the timings are complete when the search returns.
+    """
+    detector = DelayedDetector([(0.05, 'first'), (0.15, '')], workers=2)
+
+    assert detector.detect_product() == 'first'
+    assert len(detector.timings) == 2
+
+
+def test_detect_parallel_product_not_found():
+    detector = DelayedDetector([(0, '')] * 5, workers=2)
+
+    with raises(ProductException) as exception:
+        detector.detect_product()
+
+    assert str(exception.value) == 'Product not found.'
+    assert len(detector.timings) == 5
+
+
+def test_detect_roi_matches_whole_image():
+    """
+    Test that filtering only the tiles the rings pass through finds the same
+    product, and filters those tiles the same as the whole image.
+    """
+    path = f"{BASE_TEST_IMAGE_PATH}/circle_med_18_round.png"
+    image = Image(path, roi=True)
+    whole_image = Image(path)
+    product = Detector(image).detect_product()
+    size = ROI_TILE_SIZE
+    used = np.kron(image.preprocessor.roi_tiles,
+                   np.ones((size, size), dtype=bool))
+    used = used[:image.image.shape[0], :image.image.shape[1]]
+
+    assert product == Detector(whole_image).detect_product()
+    assert used.any()
+    assert np.array_equal(image.image[used], whole_image.image[used])
@@ -0,0 +1,59 @@
+import numpy as np
+from pytest import fixture
+from PIL import Image as pil_image
+
+from image_filters.filter_pool import FilterPool
+from image_filters.filters import median_sharpen_filter
+from image_filters.filters import rag_merge_multiscale
+from image_filters.filters import to_array
+from image_filters.filters import to_rgb
+from object.image import Image
+
+BASE_TEST_IMAGE_PATH = "/Users/axelthor/Projects/object/tests/test_images"
+IMAGE_PATH = f"{BASE_TEST_IMAGE_PATH}/circle_thick_18_square_all_colors.png"
+
+
+@fixture()
+def filter_pool():
+    pool = FilterPool(workers=1)
+    yield pool
+    pool.stop()
+
+
+def test_filter_pool_matches_filter(filter_pool):
+    """
+    Test that filtering in the pool gives the same image as in the process.
+    """
+    image = to_rgb(pil_image.open(IMAGE_PATH))
+    filter_pool.start()
+    filtered = filter_pool.run(
+        'rag_merge_multiscale', to_array(image), 60, working_size=64)
+
+    assert np.array_equal(filtered, to_array(rag_merge_multiscale(image, 64)))
+
+
+def test_filter_pool_misses_deadline(filter_pool):
+    """
+    Test that a filter that misses its deadline returns nothing and stops
+    the processes running it.
+    """
+    image = to_rgb(pil_image.open(IMAGE_PATH))
+    pool = filter_pool.start()
+
+    assert filter_pool.run('rag_merge_filter', to_array(image), 0.01) is None
+    assert filter_pool.pool is not pool
+
+
+def test_image_falls_back_without_pool(monkeypatch, filter_pool):
+    """
+    Test that the image is filtered with the median filter and sharpen when
+    the merge filter can't run in time.
+    """
+    monkeypatch.setattr(filter_pool, 'start_in_background', lambda: None)
+    monkeypatch.setattr('object.preprocessor.FILTER_POOL', filter_pool)
+    image = Image(IMAGE_PATH, merge_filter=True, merge_deadline=1)
+
+    assert image.preprocessor.merge_fallback
+    assert np.array_equal(
+        image.image, median_sharpen_filter(
+            to_array(pil_image.open(IMAGE_PATH))))
@@ -0,0 +1,122 @@
+import numpy as np
+from PIL import Image
+
+from image_filters.filters import label_means
+from image_filters.filters import median_filter
+from image_filters.filters import median_sharpen_filter
+from image_filters.filters import median_sharpen_tiles
+from image_filters.filters import mode_filter
+from image_filters.filters import palette_filter
+from image_filters.filters import rag_merge_multiscale
+from image_filters.filters import sharpen
+from image_filters.filters import sharpen_rows
+from image_filters.filters import to_array
+from utils.color_tables import lookup_color_codes
+
+BASE_TEST_IMAGE_PATH = "/Users/axelthor/Projects/object/tests/test_images"
+
+
+def test_median_sharpen_filter_matches_pil():
+    """
+    Test that the array filter gives the same image as the PIL filters.
+    """
+    image = Image.open(
+        f'{BASE_TEST_IMAGE_PATH}/circle_thick_18_square_all_colors.png')
+    expected = np.asarray(sharpen(median_filter(image)))
+    actual = median_sharpen_filter(to_array(image))
+
+    assert np.array_equal(expected, actual)
+
+
+def test_sharpen_rows_matches_pil_across_bands():
+    """
+    Test that sharpening a band at a time gives the same image as PIL.
+    """
+    pixels = np.random.RandomState(0).randint(0, 256,
+                                              (9, 7, 3)).astype(np.uint8)
+    expected = np.asarray(sharpen(Image.fromarray(pixels)))
+    sharpen_rows(pixels, band_rows=2)
+
+    assert np.array_equal(expected, pixels)
+
+
+def test_to_array_converts_black_and_white():
+    """
+    Test that black and white images are decoded as RGBA.
+    """
+    pixels = to_array(Image.new('1', (4, 3), 1))
+
+    assert pixels.shape == (3, 4, 4)
+    assert pixels.dtype == np.uint8
+    assert pixels.flags['C_CONTIGUOUS']
+
+
+def test_median_sharpen_tiles_matches_whole_image():
+    """
+    Test that filtering some tiles gives them the same pixels as filtering
+    the whole image, and leaves the other tiles as they were.
+    """
+    random = np.random.RandomState(0)
+    pixels = random.randint(0, 256, (150, 131, 4)).astype(np.uint8)
+    tiles = random.rand(10, 9) < 0.4
+    expected = median_sharpen_filter(pixels)
+    actual = median_sharpen_tiles(pixels, tiles, 16)
+    used = np.kron(tiles, np.ones((16, 16), dtype=bool))[:150, :131]
+
+    assert np.array_equal(expected[used], actual[used])
+    assert np.array_equal(pixels[~used], actual[~used])
+
+
+def test_label_means_averages_each_label():
+    """
+    Test that each pixel takes the truncated mean color of its label.
+    """
+    pixels = np.array(
+        [[[0, 10, 20], [3, 11, 20]], [[100, 0, 0], [9, 9, 9]]], dtype=np.uint8)
+    labels = np.array([[0, 0], [2, 2]])
+    means = label_means(pixels, labels)
+
+    assert means.dtype == np.uint8
+    assert means[0].tolist() == [[1, 10, 20], [1, 10, 20]]
+    assert means[1].tolist() == [[54, 4, 4], [54, 4, 4]]
+
+
+def test_rag_merge_multiscale_keeps_full_resolution():
+    """
+    Test that merging a downscaled copy gives a full size RGB image.
+    """
+    image = Image.open(
+        f'{BASE_TEST_IMAGE_PATH}/circle_thick_18_square_all_colors.png')
+    merged = rag_merge_multiscale(image, working_size=64)
+
+    assert merged.mode == 'RGB'
+    assert merged.size == image.size
+
+
+def test_mode_filter_removes_isolated_codes():
+    """
+    Test that a code surrounded by another takes the code around it, and that
+    ties keep the pixel's own code.
+    """
+    codes = np.full((5, 5), 7, dtype=np.uint8)
+    codes[2, 2] = 0
+    codes[:, 4] = 3
+
+    mode = mode_filter(codes)
+
+    assert mode[2, 2] == 7
+    assert (mode[:, 4] == 3).all()
+
+
+def test_palette_filter_keeps_the_mode_codes():
+    """
+    Test that the quantized image is classified as the mode filtered codes.
+    """
+    pixels = to_array(
+        Image.open(f'{BASE_TEST_IMAGE_PATH}/real_test_circle_1.png'))
+    codes = lookup_color_codes(pixels[..., :3])
+    quantized = palette_filter(pixels)
+
+    assert quantized.shape == pixels.shape
+    assert np.array_equal(
+        lookup_color_codes(quantized[..., :3]), mode_filter(codes))
@@ -1,9 +1,13 @@
+import numpy as np
+
 from utils.list_utils import left_strip
 from utils.list_utils import most_common_element
 from utils.list_utils import groupby_with_delimiter
 from utils.list_utils import group_by
 from utils.list_utils import shift_slice
 from utils.list_utils import collapse
+from utils.list_utils import collapse_codes
+from utils.list_utils import collapse_list
 
 
 def test_list_utils_left_strip_single_element():
@@ -346,3 +350,46 @@ def test_list_utils_collapse_large_list(center_element):
     actual = collapse(elements, center_element)
 
     assert expected == actual
+
+
+def test_list_utils_collapse_wraps_around(center_element):
+    """
+    Test that a group split by the start of the list is collapsed with the
+    end of the list.
+    """
+    elements = ['3', '3', '1', '2', '1', '4', '3']
+    expected = ['2', '3']
+    actual = collapse(elements, center_element)
+
+    assert expected == actual
+    assert collapse_list(elements, center_element) == actual
+
+
+def test_list_utils_collapse_no_center_element(center_element):
+    """
+    Test that adjacent elements are grouped when there is no center element.
+    """
+    elements = ['2', '2', '3', '2']
+    expected = ['2', '3', '2']
+    actual = collapse(elements, center_element)
+
+    assert expected == actual
+
+
+def test_list_utils_collapse_codes():
+    """
+    Test that each group of codes collapses to its most common code, ties
+    going to the first code in the group.
+    """
+    codes = np.array([1, 2, 3, 3, 1, 5, 4, 1, 1, 6])
+    expected = [3, 5, 6]
+    actual = collapse_codes(codes, 1)
+
+    assert expected == actual.tolist()
+
+
+def test_list_utils_collapse_codes_only_center():
+    """
+    Test that codes of only the center code collapse to nothing.
+    """
+    assert collapse_codes(np.array([1, 1, 1]), 1).tolist() == []
@@ -0,0 +1,53 @@
+from pytest import approx
+
+from object.detector import Detector
+from object.image import Image
+from object.localizer import RadialLocalizer
+
+BASE_TEST_IMAGE_PATH = "/Users/axelthor/Projects/object/tests/test_images"
+
+
+def test_radial_localizer_locate(dashed_ring_image):
+    """
+    Test that the center and radius of an off center ring are found.
+    """
+    (x, y), radius = RadialLocalizer(dashed_ring_image).locate()
+
+    assert x == approx(56, abs=1)
+    assert y == approx(52, abs=1)
+    assert radius == approx(30, abs=1)
+
+
+def test_radial_localizer_locate_without_ring(dashed_ring_image):
+    """
+    Test that nothing is located when the rays don't cross a ring.
+    """
+    dashed_ring_image.sampler.pixels[:] = 255
+
+    assert RadialLocalizer(dashed_ring_image).locate() is None
+    assert RadialLocalizer(dashed_ring_image).get_candidates() == []
+
+
+def test_radial_localizer_get_candidates(dashed_ring_image):
+    """
+    Test that the rings to try are centered on the located center, starting
+    with the located radius.
+    """
+    candidates = RadialLocalizer(dashed_ring_image).get_candidates()
+    radius = candidates[0][1]
+
+    assert [center for center, _ in candidates] == [(56, 52)] * 3
+    assert [ring_radius for _, ring_radius in candidates] == [
+        radius, radius * 1.05, radius * 0.95
+    ]
+
+
+def test_detect_located_circle_med_18_round():
+    """
+    Test that the off center ring is found from the first, located, ring.
+    """
+    image = Image(f"{BASE_TEST_IMAGE_PATH}/circle_med_18_round.png")
+    detector = Detector(image, localizer=RadialLocalizer)
+
+    assert detector.detect_product() == 'circle-18-multi-color'
+    assert len(detector.timings) == 1
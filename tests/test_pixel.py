@@ -1,5 +1,7 @@
+import numpy as np
 from pytest import raises
 
+from object.pixel import Pixel
 from object.pixel import PixelException
 
 
@@ -29,3 +31,63 @@ def test_pixel_color_is_out_of_bounds(pixel):
     """
     with raises(PixelException):
         pixel.get_color((1, -1))
+
+
+def test_pixel_reads_the_image_lazily(large_image):
+    """
+    Test that the image is only read once the color is needed, and only once.
+    """
+    pixel = Pixel(large_image, (30, 30))
+
+    assert large_image.getpixel.call_count == 0
+    assert pixel.color == 'grey'
+    assert pixel.brightness == 39
+    assert large_image.getpixel.call_count == 1
+
+
+def test_pixel_out_of_bounds_on_creation(large_image):
+    """
+    Test that a pixel can't be created at the edge of the image.
+    """
+    with raises(PixelException):
+        Pixel(large_image, (98, 30))
+
+
+def test_pixel_has_no_instance_dict(pixel):
+    """
+    Test that the pixel attributes are slotted.
+    """
+    assert not hasattr(pixel, '__dict__')
+
+
+def test_pixels_from_array(large_image):
+    """
+    Test that the bulk constructor reads the colors from the image array.
+    """
+    pixels = np.zeros((100, 100, 3), dtype=np.uint8)
+    pixels[20, 10] = (255, 255, 255)
+    created = Pixel.from_array(large_image, np.array([(10, 20), (5, 5)]),
+                               pixels)
+
+    assert [pixel.coords for pixel in created] == [(10, 20), (5, 5)]
+    assert [pixel.color for pixel in created] == ['white', 'black']
+    assert large_image.getpixel.call_count == 0
+
+
+def test_pixels_from_array_keeps_coordinate_types(large_image):
+    """
+    Test that the bulk constructor keeps integer coordinates as integers.
+    """
+    created = Pixel.from_array(large_image, [(10, 20.5), (5, 5)])
+
+    assert [pixel.coords for pixel in created] == [(10, 20.5), (5, 5)]
+    assert isinstance(created[0].x, int)
+    assert isinstance(created[1].y, int)
+
+
+def test_pixels_from_array_out_of_bounds(large_image):
+    """
+    Test that the bulk constructor raises if any pixel is out of bounds.
+    """
+    with raises(PixelException):
+        Pixel.from_array(large_image, [(10, 10), (10, -1)])
@@ -53,3 +53,35 @@ def test_product_check_similar_different_values():
     actual = tuple(Product.check_similar(code, product_map))
 
     assert expected == actual
+
+
+def test_product_is_valid_rotation():
+    code = '333444555000111222'
+    expected = '222333444555000111'
+    actual = Product.is_valid(code)
+
+    assert expected == actual
+
+
+def test_product_is_valid_truncated():
+    code = '22333444555000111'
+    expected = '222333444555000111'
+    actual = Product.is_valid(code)
+
+    assert expected == actual
+
+
+def test_product_is_valid_unknown_code():
+    code = '222333444555000999'
+    expected = ''
+    actual = Product.is_valid(code)
+
+    assert expected == actual
+
+
+def test_product_is_valid_fuzzy():
+    code = '222333474555000111'
+    expected = ('', '222333444555000111')
+    actual = (Product.is_valid(code), Product.is_valid(code, fuzzy=True))
+
+    assert expected == actual
@@ -0,0 +1,53 @@
+from pytest import raises
+
+from object.image import Image
+from object.product import ProductException
+from object.pyramid_detector import PyramidDetector
+
+BASE_TEST_IMAGE_PATH = "/Users/axelthor/Projects/object/tests/test_images"
+
+
+def get_detector(image_name):
+    """Return a detector for the image name shorthand.
+    """
+    image = Image(f"{BASE_TEST_IMAGE_PATH}/{image_name}")
+
+    return PyramidDetector(image)
+
+
+def test_image_get_level():
+    """
+    Test that each pyramid level halves the image and is only built once.
+    """
+    image = Image(f"{BASE_TEST_IMAGE_PATH}/circle_med_18_round.png")
+    level = image.get_level(1)
+
+    assert level.scale == 2
+    assert level.image.shape[:2] == ((image.image.shape[0] + 1) // 2,
+                                     (image.image.shape[1] + 1) // 2)
+    assert image.get_level(1) is level
+    assert image.get_level(0).image is image.image
+
+
+def test_pyramid_detect_circle_med_18_round():
+    """
+    Test that the off center ring is found by the coarse search, so only the
+    one candidate is read at full resolution.
+    """
+    detector = get_detector("circle_med_18_round.png")
+
+    assert detector.detect_product() == 'circle-18-multi-color'
+    assert len(detector.timings) == 1
+
+
+def test_pyramid_detect_circle_thick_18_square_sim_colors():
+    detector = get_detector("circle_thick_18_square_sim_colors.png")
+
+    assert detector.detect_product() == 'circle-18-square-sim-colors'
+
+
+def test_pyramid_detect_circle_thick_18_square_one_off():
+    with raises(ProductException) as exception:
+        get_detector("circle_thick_18_square_one_off.png").detect_product()
+
+    assert str(exception.value) == 'Product not found.'
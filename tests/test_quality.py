@@ -0,0 +1,45 @@
+import numpy as np
+from PIL import Image
+
+from image_filters.quality import MEDIAN
+from image_filters.quality import MERGE
+from image_filters.quality import UNFILTERED
+from image_filters.quality import choose_filter_path
+from image_filters.quality import estimate_quality
+from image_filters.quality import flat_noise
+
+BASE_TEST_IMAGE_PATH = "/Users/axelthor/Projects/object/tests/test_images"
+
+
+def quality_path(image_name):
+    """Return the filter path chosen for the image name shorthand.
+    """
+    image = Image.open(f'{BASE_TEST_IMAGE_PATH}/{image_name}')
+
+    return choose_filter_path(estimate_quality(image))
+
+
+def test_flat_noise_ignores_edges():
+    """
+    Test that the edges of a clean image aren't measured as noise, while
+    noise added to it is.
+    """
+    gray = np.zeros((64, 64), dtype=np.uint8)
+    gray[:, 32:] = 255
+    noise = np.random.RandomState(0).randint(-8, 9, gray.shape)
+    noisy = np.clip(gray + noise, 0, 255).astype(np.uint8)
+
+    assert flat_noise(gray) == 0
+    assert flat_noise(noisy) > 1
+
+
+def test_choose_unfiltered_for_clean_image():
+    assert quality_path('circle_thick_18_square.png') == UNFILTERED
+
+
+def test_choose_median_for_photo():
+    assert quality_path('real_test_circle_1.png') == MEDIAN
+
+
+def test_choose_merge_for_photo_with_scattered_colors():
+    assert quality_path('real_test_circle_4.png') == MERGE
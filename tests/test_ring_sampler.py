@@ -0,0 +1,129 @@
+import numpy as np
+from pytest import raises
+
+from object.pixel import PixelException
+from object.ring_sampler import PolarSampler
+from object.ring_sampler import RingSampler
+from object.ring_sampler import UNCLASSIFIED
+from utils.color_utils import COLOR_CODES
+
+
+def test_ring_sampler_get_colors(ring_image):
+    """
+    Test that the colors are returned in the order of the coordinates.
+    """
+    expected = ['red', 'black', 'white']
+    actual = RingSampler(ring_image).get_colors([(1, 1), (2, 1), (1, 2)])
+
+    assert expected == actual
+
+
+def test_ring_sampler_get_brightness_values(ring_image):
+    """
+    Test that the brightness values are returned as rounded percentages.
+    """
+    expected = [100, 0, 100]
+    actual = RingSampler(ring_image).get_brightness_values([(1, 1), (2, 1),
+                                                            (1, 2)])
+
+    assert expected == actual
+
+
+def test_ring_sampler_out_of_bounds(ring_image):
+    """
+    Test that sampling at the edge of the image raises an exception.
+    """
+    with raises(PixelException):
+        RingSampler(ring_image).get_colors([(1, 1), (-1, 1)])
+
+
+def test_polar_sampler_reads_rings_as_rows(ring_image):
+    """
+    Test that each row of the unwrapped image is the ring at that radius,
+    starting from the leftmost point.
+    """
+    sampler = PolarSampler(ring_image, (1, 1), angles=4)
+
+    expected = ['white', 'white', 'black', 'white']
+    actual = sampler.get_colors([(0, 1), (1, 1), (2, 1), (3, 1)])
+
+    assert expected == actual
+    assert sampler.scan(
+        [1]).tolist() == [[COLOR_CODES[color] for color in expected]]
+
+
+def test_polar_sampler_out_of_bounds(ring_image):
+    """
+    Test that rings reaching the edge of the image raise an exception.
+    """
+    sampler = PolarSampler(ring_image, (1, 1), angles=4)
+
+    with raises(PixelException):
+        sampler.get_colors([(0, 2), (1, 2), (2, 2), (3, 2)])
+
+
+def test_ring_sampler_sample_rings(ring_image):
+    """
+    Test that several rings are sampled at once and that rings out of bounds
+    are skipped.
+    """
+    rings = [
+        np.array([(1, 1), (2, 1)]),
+        np.array([(1, 1), (-1, 1)]),
+        np.array([(1, 2)]),
+    ]
+
+    red, black, white = (
+        COLOR_CODES[color] for color in ('red', 'black', 'white'))
+    expected = [([red, black], [100, 0]), None, ([white], [100])]
+    actual = [
+        samples and tuple(values.tolist()
+                          for values in samples)
+        for samples in RingSampler(ring_image).sample_rings(rings)
+    ]
+
+    assert expected == actual
+
+
+def test_ring_sampler_sample_codes(ring_image):
+    """
+    Test that the color codes and brightness values are sampled together.
+    """
+    codes, brightness_values = RingSampler(ring_image).sample_codes([(1, 1),
+                                                                     (2, 1)])
+
+    assert codes.tolist() == [COLOR_CODES['red'], COLOR_CODES['black']]
+    assert brightness_values.tolist() == [100, 0]
+
+
+def test_ring_sampler_planes_fill_as_sampled(ring_image):
+    """
+    Test that only the sampled pixels are classified into the planes.
+    """
+    sampler = RingSampler(ring_image)
+
+    assert sampler.nbytes == 0
+
+    sampler.sample_codes([(1, 1), (2, 1)])
+    color_plane, brightness_plane = sampler.get_planes()
+
+    assert color_plane.dtype == np.uint8
+    assert color_plane[1, 1:3].tolist() == [
+        COLOR_CODES['red'], COLOR_CODES['black']
+    ]
+    assert brightness_plane[1, 1:3].tolist() == [100, 0]
+    assert (color_plane == UNCLASSIFIED).sum() == 34
+    assert sampler.nbytes == 2 * 6 * 6
+
+
+def test_ring_sampler_reads_classified_pixels_from_planes(ring_image):
+    """
+    Test that pixels already classified aren't read from the image again.
+    """
+    sampler = RingSampler(ring_image)
+    sampler.sample_codes([(1, 1)])
+    sampler.pixels = np.zeros_like(ring_image)
+    codes, brightness_values = sampler.sample_codes([(1, 1), (2, 2)])
+
+    assert codes.tolist() == [COLOR_CODES['red'], COLOR_CODES['black']]
+    assert brightness_values.tolist() == [100, 0]
@@ -0,0 +1,57 @@
+from utils.rotation_index import RotationIndex
+
+
+def test_rotation_index_find_rotation():
+    """
+    Test that a code is found from any of its rotations.
+    """
+    index = RotationIndex(['222333444555000111', '666666666666666666'])
+    expected = '222333444555000111'
+    actual = index.find_rotation('444555000111222333')
+
+    assert expected == actual
+
+
+def test_rotation_index_find_rotation_not_found():
+    """
+    Test that an empty string is returned when no rotation matches.
+    """
+    index = RotationIndex(['222333444555000111'])
+    expected = ''
+    actual = index.find_rotation('222333444555000112')
+
+    assert expected == actual
+
+
+def test_rotation_index_find_truncated():
+    """
+    Test that a code with a missing element is found from its fragments.
+    """
+    index = RotationIndex(['222333444555000111'])
+    expected = '222333444555000111'
+    actual = index.find_truncated('22333444555000111')
+
+    assert expected == actual
+
+
+def test_rotation_index_find_truncated_too_short():
+    """
+    Test that a code more than one element shorter than the product is not
+    found.
+    """
+    index = RotationIndex(['222333444555000111'])
+    expected = ''
+    actual = index.find_truncated('4444555000111222')
+
+    assert expected == actual
+
+
+def test_rotation_index_find_truncated_first_product_wins():
+    """
+    Test that the first indexed code is returned when several match.
+    """
+    index = RotationIndex(['0123456', '9123450'])
+    expected = '0123456'
+    actual = index.find_truncated('012345')
+
+    assert expected == actual
@@ -0,0 +1,42 @@
+from unittest.mock import Mock
+
+import numpy as np
+
+from object.sequence import Sequence
+from utils.color_utils import COLOR_CODES
+
+
+def get_sequence(colors, brightness_values):
+    """Return a sequence sampled with the colors and brightness values around
+    a white center.
+    """
+    center = Mock()
+    center.color = 'white'
+    center.brightness = 100
+    codes = np.array([COLOR_CODES[color] for color in colors], dtype=np.uint8)
+    brightness = np.array(brightness_values, dtype=np.uint8)
+
+    return Sequence(Mock(), center, None, samples=(codes, brightness))
+
+
+def test_sequence_color_code():
+    """
+    Test that the color codes are collapsed into the color code.
+    """
+    sequence = get_sequence(['white', 'red', 'red', 'white', 'blue', 'white'],
+                            [100, 50, 50, 100, 40, 100])
+
+    assert sequence.colors == ['red', 'blue']
+    assert sequence.color_code == '04'
+
+
+def test_sequence_brightness_values_are_lazy():
+    """
+    Test that the brightness values are only collapsed when they're used.
+    """
+    sequence = get_sequence(['white', 'red', 'white', 'blue', 'white'],
+                            [100, 50, 100, 40, 100])
+
+    assert sequence.color_code == '04'
+    assert sequence._brightness_values is None
+    assert sequence.brightness_values == '5040'
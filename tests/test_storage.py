@@ -0,0 +1,39 @@
+from pytest import raises
+
+from object.detector import Detector
+from object.image import Image
+from object.storage import LocalStorage
+from object.storage import MemoryStorage
+
+BASE_TEST_IMAGE_PATH = "/Users/axelthor/Projects/object/tests/test_images"
+
+
+def test_memory_storage_open():
+    storage = MemoryStorage()
+    storage.upload('images/1.png', b'image')
+
+    assert storage.open('images/1.png').read() == b'image'
+
+
+def test_memory_storage_missing_file():
+    with raises(KeyError):
+        MemoryStorage().open('images/1.png')
+
+
+def test_local_storage_open(tmpdir):
+    tmpdir.mkdir('images').join('1.png').write_binary(b'image')
+
+    assert LocalStorage(str(tmpdir)).open('images/1.png').read() == b'image'
+
+
+def test_detect_image_in_memory():
+    """
+    Test that an image downloaded into memory is detected without being
+    written to disk.
+    """
+    with open(f'{BASE_TEST_IMAGE_PATH}/circle_thick_18_square.png', 'rb') as f:
+        storage = MemoryStorage({'images/1.png': f.read()})
+
+    image = Image(storage.open('images/1.png'))
+
+    assert Detector(image).detect_product() == 'circle-18-multi-color'
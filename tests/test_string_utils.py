@@ -1,4 +1,6 @@
 from utils.string_utils import are_rotations
+from utils.string_utils import least_rotation
+from utils.string_utils import canonical_rotation
 
 
 def test_are_rotations():
@@ -34,3 +36,31 @@ def test_are_not_rotations_invalid_order():
     actual = are_rotations('bacd', 'abcd')
 
     assert expected == actual
+
+
+def test_least_rotation():
+    expected = 1
+    actual = least_rotation('cab')
+
+    assert expected == actual
+
+
+def test_canonical_rotation():
+    expected = 'abcd'
+    actual = canonical_rotation('cdab')
+
+    assert expected == actual
+
+
+def test_canonical_rotation_repeated_characters():
+    expected = '001001'
+    actual = canonical_rotation('100100')
+
+    assert expected == actual
+
+
+def test_canonical_rotation_empty():
+    expected = ''
+    actual = canonical_rotation('')
+
+    assert expected == actual
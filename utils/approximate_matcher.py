@@ -0,0 +1,382 @@
+from collections import Counter
+from collections import namedtuple
+
+from utils.string_utils import canonical_rotation
+
+
+def cyclic_grams(code, size):
+    """Return the substrings of a given size, wrapping around the end.
+
+    Examples:
+        >>> cyclic_grams('0123', 3)
+        ['012', '123', '230', '301']
+
+    Args:
+        code (str): The code.
+        size (int): The length of the substrings.
+
+    Returns:
+        List[str]: The substring starting at each position of the code.
+    """
+    if len(code) < size:
+        return []
+
+    doubled = code + code[:size - 1]
+
+    return [doubled[start:start + size] for start in range(len(code))]
+
+
+def pattern_masks(pattern):
+    """Return the bit mask of positions of each character in the pattern.
+
+    Args:
+        pattern (str): The pattern.
+
+    Returns:
+        Dict[str, int]: The position mask for each character.
+    """
+    masks = {}
+
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << position)
+
+    return masks
+
+
+def rotate_masks(masks, rotation, length):
+    """Rotate the position masks as if the pattern had been rotated.
+
+    Args:
+        masks (Dict[str, int]): The position mask for each character.
+        rotation (int): The number of characters to rotate left by.
+        length (int): The length of the pattern.
+
+    Returns:
+        Dict[str, int]: The position masks of the rotated pattern.
+    """
+    full = (1 << length) - 1
+
+    return {
+        char: ((mask >> rotation) | (mask << (length - rotation))) & full
+        for char, mask in masks.items()
+    }
+
+
+def edit_distance(masks, length, text, limit=None):
+    """Return the Levenshtein distance between a pattern and a text.
+
+    Uses Myers' bit-parallel algorithm, which processes the whole pattern as a
+    single integer for each character of the text.
+
+    Args:
+        masks (Dict[str, int]): The position mask of each pattern character.
+        length (int): The length of the pattern.
+        text (str): The text.
+        limit (int): Stop early once the distance can't be below this.
+
+    Returns:
+        int: The edit distance.
+    """
+    if not length:
+        return len(text)
+
+    full = (1 << length) - 1
+    high = 1 << (length - 1)
+    positive, negative = full, 0
+    score = length
+
+    for index, char in enumerate(text):
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | (~(horizontal | positive) & full)
+        horizontal_negative = positive & horizontal
+
+        if horizontal_positive & high:
+            score += 1
+        elif horizontal_negative & high:
+            score -= 1
+
+        # Each remaining character can reduce the score by at most one.
+        remaining = len(text) - index - 1
+        if limit is not None and score - remaining > limit:
+            return score - remaining
+
+        horizontal_positive = ((horizontal_positive << 1) | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (
+            ~(vertical | horizontal_positive) & full)
+        negative = horizontal_positive & vertical
+
+    return score
+
+
+# An indexed code, with the position masks of its characters for the edit
+# distance and the positions of each of its cyclic q-grams.
+IndexedCode = namedtuple('IndexedCode', ['code', 'masks', 'positions'])
+
+
+class ApproximateMatcher:
+    """Find the code most similar to a scanned code, from any rotation.
+
+    Similarity is one minus the edit distance to the closest rotation of a
+    code, divided by the length of the longer of the two.
+
+    Every code is indexed by its cyclic q-grams. An edit can destroy at most
+    q of them, so the number of q-grams a scanned code shares with a code
+    gives a bound on their distance. Only codes that can reach the threshold
+    are verified, best bound first, with the bit-parallel edit distance. The
+    positions of the shared q-grams vote for the rotation the scanned code
+    starts at, so only the rotations near the winning votes are verified.
+    """
+
+    def __init__(self, codes, gram_size=5, threshold=0.9):
+        self.codes = []
+        self.gram_size = gram_size
+        self.threshold = threshold
+        self.rotations = {}
+        self.postings = {}
+        self.lengths = {}
+
+        for code_id, code in enumerate(codes):
+            self.rotations.setdefault(canonical_rotation(code), code)
+            self.lengths.setdefault(len(code), []).append(code_id)
+            positions = {}
+
+            for position, gram in enumerate(cyclic_grams(code, gram_size)):
+                positions.setdefault(gram, []).append(position)
+
+            for gram, gram_positions in positions.items():
+                self.postings.setdefault(gram, []).append((code_id,
+                                                           len(gram_positions)))
+
+            self.codes.append(IndexedCode(code, pattern_masks(code), positions))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def max_distance(self, code_length, other_length, threshold):
+        """Return the largest edit distance that still meets the threshold.
+
+        Similarities are rounded to two decimals before they are compared to
+        the threshold, the same as `Product.check_similar`.
+
+        Args:
+            code_length (int): The length of the scanned code.
+            other_length (int): The length of the indexed code.
+            threshold (float): The minimum similarity.
+
+        Returns:
+            int: The maximum edit distance.
+        """
+        longest = max(code_length, other_length, 1)
+        distance = int(longest * (1 - threshold))
+
+        while round(1 - (distance + 1) / longest, 2) >= threshold:
+            distance += 1
+
+        return distance
+
+    def likely_rotations(self, code_id, grams, spread):
+        """Return the rotations of an indexed code the scanned code aligns with.
+
+        Each shared q-gram votes for the rotation that lines it up with the
+        same q-gram in the indexed code. Insertions and deletions shift the
+        alignment by one rotation each, so the rotations within the spread of
+        the two most voted rotations are returned.
+
+        Args:
+            code_id (int): The index of the indexed code.
+            grams (List[str]): The cyclic q-grams of the scanned code.
+            spread (int): The number of edits to allow for.
+
+        Returns:
+            List[int]: The rotations to verify.
+        """
+        length = len(self.codes[code_id].code)
+        positions = self.codes[code_id].positions
+        votes = Counter()
+
+        for start, gram in enumerate(grams):
+            for position in positions.get(gram, ()):
+                votes[(position - start) % length] += 1
+
+        if not votes:
+            return range(max(length, 1))
+
+        rotations = []
+
+        for rotation, _ in votes.most_common(2):
+            for shift in range(-spread, spread + 1):
+                if (rotation + shift) % length not in rotations:
+                    rotations.append((rotation + shift) % length)
+
+        return rotations
+
+    def rotation_distance(self, code_id, code, rotations, limit):
+        """Return the edit distance from the code to the closest rotation.
+
+        Args:
+            code_id (int): The index of the indexed code.
+            code (str): The scanned code.
+            rotations (List[int]): The rotations of the indexed code to try.
+            limit (int): Rotations further than this can stop early.
+
+        Returns:
+            int: The smallest edit distance over the rotations.
+        """
+        masks = self.codes[code_id].masks
+        length = len(self.codes[code_id].code)
+        best = None
+
+        for rotation in rotations:
+            distance = edit_distance(
+                rotate_masks(masks, rotation, length), length, code, limit)
+
+            if best is None or distance < best:
+                best = distance
+                limit = min(limit, distance)
+
+            if not best:
+                break
+
+        return best
+
+    def shared_grams(self, grams):
+        """Count the q-grams each indexed code shares with the scanned code.
+
+        Args:
+            grams (List[str]): The cyclic q-grams of the scanned code.
+
+        Returns:
+            Dict[int, int]: The number of shared q-grams of each indexed code
+                that shares any.
+        """
+        shared = {}
+
+        for gram, count in Counter(grams).items():
+            for code_id, other_count in self.postings.get(gram, ()):
+                shared[code_id] = shared.get(
+                    code_id, 0) + (other_count
+                                   if other_count < count else count)
+
+        return shared
+
+    def candidates(self, code, grams, threshold):
+        """Return the indexed codes that can be similar enough to the code.
+
+        The number of q-grams a code shares with the scanned code, and the
+        difference in their lengths, bound their edit distance from below.
+
+        Args:
+            code (str): The scanned code.
+            grams (List[str]): The cyclic q-grams of the scanned code.
+            threshold (float): The minimum similarity.
+
+        Returns:
+            List[Tuple[int, int]]: The lower bound of the edit distance and
+                the index of each candidate, best bound first.
+        """
+        shared = self.shared_grams(grams)
+        candidates = []
+
+        # The most edits allowed against each code length, skipping lengths
+        # that are too different to ever meet the threshold.
+        most_edits = {}
+        for length in self.lengths:
+            edits = self.max_distance(len(code), length, threshold)
+            if abs(len(code) - length) <= edits:
+                most_edits[length] = edits
+
+        for code_id, count in shared.items():
+            length = len(self.codes[code_id].code)
+
+            if length in most_edits:
+                bound = max(
+                    abs(len(code) - length),
+                    -(-(len(grams) - count) // self.gram_size))
+
+                if bound <= most_edits[length]:
+                    candidates.append((bound, code_id))
+
+        # Codes without shared grams are only reachable when the scanned code
+        # is short enough for every one of its grams to be destroyed.
+        for length, edits in most_edits.items():
+            bound = max(
+                abs(len(code) - length), -(-len(grams) // self.gram_size))
+
+            if bound <= edits:
+                candidates += [(bound, code_id)
+                               for code_id in self.lengths[length]
+                               if code_id not in shared]
+
+        return sorted(candidates)
+
+    def verify(self, code, grams, candidates, threshold):
+        """Find the candidate most similar to the code.
+
+        The candidates whose bound can't beat the best similarity so far are
+        skipped.
+
+        Args:
+            code (str): The scanned code.
+            grams (List[str]): The cyclic q-grams of the scanned code.
+            candidates (List[Tuple[int, int]]): The lower bound of the edit
+                distance and the index of each candidate, best bound first.
+            threshold (float): The minimum similarity.
+
+        Returns:
+            str, float: The most similar code, or None, and the similarity.
+        """
+        best_code, best_similarity = None, 0
+
+        for bound, code_id in candidates:
+            other = self.codes[code_id].code
+            longest = max(len(code), len(other))
+
+            if 1 - bound / longest < best_similarity:
+                continue
+
+            rotations = self.likely_rotations(
+                code_id, grams,
+                self.max_distance(len(code), len(other), threshold))
+            distance = self.rotation_distance(
+                code_id, code, rotations, int(longest * (1 - best_similarity)))
+            similarity = round(1 - distance / longest, 2)
+
+            if similarity > best_similarity:
+                best_code, best_similarity = other, similarity
+
+        return best_code, best_similarity
+
+    def match(self, code, threshold=None):
+        """Return the most similar code if it is within the threshold.
+
+        Only the codes that can reach the threshold are verified, so a miss
+        reports the best similarity among those, or 0 if no code could reach
+        the threshold. Unlike `Product.check_similar`, the similarity of the
+        closest code is not worked out when it's below the threshold.
+
+        Args:
+            code (str): The scanned code.
+            threshold (float): The minimum similarity, defaults to the
+                matcher's threshold.
+
+        Returns:
+            str, float: The similar code, or None, and the similarity.
+        """
+        if threshold is None:
+            threshold = self.threshold
+
+        exact = self.rotations.get(canonical_rotation(code))
+        if exact is not None:
+            return exact, 1
+
+        grams = cyclic_grams(code, self.gram_size)
+        best_code, best_similarity = self.verify(
+            code, grams, self.candidates(code, grams, threshold), threshold)
+
+        if best_similarity >= threshold:
+            return best_code, best_similarity
+
+        return None, best_similarity
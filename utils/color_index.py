@@ -0,0 +1,70 @@
+import numpy as np
+import webcolors
+
+
+class NearestColorIndex:
+    """An index for finding the closest named colors to RGB values.
+
+    The palette is parsed into an array once, so a query only has to compute
+    the distances to each palette color rather than re-parsing every hex
+    string. With ~140 palette colors a vectorized scan is faster than walking
+    a tree, and it answers a whole array of pixels in one call.
+
+    Ties are broken by color name so that the result is deterministic.
+    """
+
+    def __init__(self, hex_to_names, chunk_size=65536):
+        palette = sorted(hex_to_names.items(), key=lambda item: item[1])
+        self.names = np.array([name for _, name in palette])
+        self.palette = np.array(
+            [webcolors.hex_to_rgb(hex_value) for hex_value, _ in palette],
+            dtype=np.int64)
+        self.chunk_size = chunk_size
+
+    def query(self, rgb, k=3):
+        """Get the k closest color names for each RGB value.
+
+        Args:
+            rgb (numpy.ndarray): The Red, Green, Blue triplets.
+            k (int): The number of names to return per RGB value.
+
+        Returns:
+            numpy.ndarray: The closest names for each RGB value, in order of
+                likelihood.
+        """
+        rgb = np.asarray(rgb, dtype=np.int64)[..., 0:3]
+        shape = rgb.shape[:-1]
+        rgb = rgb.reshape(-1, 3)
+        k = min(k, len(self.names))
+        nearest = np.empty((len(rgb), k), dtype=np.int64)
+
+        for start in range(0, len(rgb), self.chunk_size):
+            nearest[start:start + self.chunk_size] = self.nearest(
+                rgb[start:start + self.chunk_size], k)
+
+        return self.names[nearest].reshape(shape + (k,))
+
+    def nearest(self, rgb, k):
+        """Get the indices of the k closest palette colors for each RGB value.
+
+        Args:
+            rgb (numpy.ndarray): The N x 3 Red, Green, Blue triplets.
+            k (int): The number of palette colors to return per RGB value.
+
+        Returns:
+            numpy.ndarray: The N x k palette indices, closest first.
+        """
+        distances = ((rgb[:, None, :] - self.palette[None, :, :])**2).sum(-1)
+
+        # Make every key unique so that equal distances fall back to the
+        # palette order, which is sorted by name.
+        keys = distances * len(self.palette) + np.arange(len(self.palette))
+
+        if k < len(self.palette):
+            candidates = np.argpartition(keys, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.tile(np.arange(len(self.palette)), (len(rgb), 1))
+
+        order = np.argsort(np.take_along_axis(keys, candidates, axis=1), axis=1)
+
+        return np.take_along_axis(candidates, order, axis=1)
@@ -0,0 +1,128 @@
+import os
+import json
+import hashlib
+from functools import lru_cache
+import numpy as np
+
+from configs.config import CACHE_DIR
+from configs.config import COLOR_CODE_MAP
+from configs.config import COLOR_RANGE_MAP
+from configs.config import COLOR_THRESHOLDS
+from utils.color_utils import get_color_codes
+
+
+def color_table_key():
+    """Return a hash of the color config that the color table is built from.
+
+    Any change to the color ranges, codes or thresholds produces a new key so
+    that a stale table is never loaded from the cache.
+
+    Returns:
+        str: The hex digest of the color config.
+    """
+    config = json.dumps(
+        {
+            'ranges': sorted(COLOR_RANGE_MAP.items()),
+            'codes': COLOR_CODE_MAP,
+            'thresholds': COLOR_THRESHOLDS
+        },
+        sort_keys=True)
+
+    return hashlib.sha1(config.encode()).hexdigest()[:16]
+
+
+def build_color_table(planes_per_chunk=16):
+    """Build the table of color codes for every RGB value.
+
+    The table is indexed as `table[red, green, blue]`. It is built a few red
+    planes at a time to keep the intermediate float arrays small.
+
+    Args:
+        planes_per_chunk (int): The number of red values to classify at once.
+
+    Returns:
+        numpy.ndarray: The 256 x 256 x 256 table of color codes.
+    """
+    table = np.empty((256, 256, 256), dtype=np.uint8)
+    channel = np.arange(256)
+
+    for red in range(0, 256, planes_per_chunk):
+        rgb = np.stack(
+            np.meshgrid(
+                channel[red:red + planes_per_chunk],
+                channel,
+                channel,
+                indexing='ij'),
+            axis=-1)
+        table[red:red + planes_per_chunk] = get_color_codes(rgb)
+
+    return table
+
+
+def build_brightness_table():
+    """Build the table of brightness percentages for every channel value.
+
+    The brightness of a pixel only depends on its largest channel so the table
+    is indexed by `max(red, green, blue)` rather than by the full RGB value.
+
+    Returns:
+        numpy.ndarray: The brightness percentage for each channel value.
+    """
+    return np.round(np.arange(256) / 255 * 100).astype(np.uint8)
+
+
+@lru_cache(maxsize=None)
+def load_color_table(cache_dir=CACHE_DIR):
+    """Load the color table, building and caching it on disk if it's missing.
+
+    The table is memory mapped so that every worker shares the same pages
+    rather than each holding its own copy.
+
+    Args:
+        cache_dir (str): The directory the table is cached in.
+
+    Returns:
+        numpy.ndarray: The read only color table.
+    """
+    table_path = os.path.join(cache_dir, f'color_table_{color_table_key()}.npy')
+
+    if not os.path.exists(table_path):
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Write to a temporary file first so that another worker never loads a
+        # partially written table.
+        temp_path = f'{table_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            np.save(f, build_color_table())
+        os.replace(temp_path, table_path)
+
+    return np.load(table_path, mmap_mode='r')
+
+
+BRIGHTNESS_TABLE = build_brightness_table()
+
+
+def lookup_color_codes(rgb):
+    """Get the color code for each RGB value from the color table.
+
+    Args:
+        rgb (numpy.ndarray): The Red, Green, Blue triplets.
+
+    Returns:
+        numpy.ndarray: The color code of each RGB value.
+    """
+    rgb = np.asarray(rgb)
+
+    return load_color_table()[rgb[..., 0], rgb[..., 1], rgb[..., 2]]
+
+
+def lookup_brightness_values(rgb):
+    """Get the brightness percentage for each RGB value from the table.
+
+    Args:
+        rgb (numpy.ndarray): The Red, Green, Blue triplets.
+
+    Returns:
+        numpy.ndarray: The brightness percentage of each RGB value.
+    """
+    return BRIGHTNESS_TABLE[np.asarray(rgb)[..., 0:3].max(axis=-1)]
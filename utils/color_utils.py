@@ -1,15 +1,29 @@
 #pylint: disable=too-many-return-statements,too-many-branches
 import colorsys
+import numpy as np
 import webcolors
 
 from configs.config import COLOR_RANGE_MAP
 from configs.config import COLOR_CODE_MAP
+from configs.config import COLOR_THRESHOLDS
+from utils.color_index import NearestColorIndex
 
 
 class ColorException(Exception):
     pass
 
 
+# Integer versions of the color codes so that whole arrays of pixels can be
+# classified with index operations. Hues without a color are marked with 255.
+COLOR_CODES = {name: int(code) for name, code in COLOR_CODE_MAP.items()}
+CODE_NAMES = np.array(sorted(COLOR_CODES, key=COLOR_CODES.get))
+HUE_CODES = np.array(
+    [COLOR_CODES.get(COLOR_RANGE_MAP.get(hue), 255) for hue in range(360)],
+    dtype=np.uint8)
+
+CSS3_INDEX = NearestColorIndex(webcolors.css3_hex_to_names)
+
+
 def sequence_to_color_code(sequence):
     """Create a deterministic code of fixed length from the color sequence.
 
@@ -68,13 +82,17 @@ def get_color(rgb):
     hue = int(hsv[0] * 360)
     saturation = hsv[1]
     brightness = hsv[2] / 255
+    limits = COLOR_THRESHOLDS
 
-    if brightness < 0.20:
+    if brightness < limits['black_brightness']:
         color = 'black'
-    elif saturation < 0.09 and brightness > 0.8:
+    elif (saturation < limits['white_saturation'] and
+          brightness > limits['white_brightness']):
         color = 'white'
-    elif ((saturation < 0.25 and brightness < 0.40) or
-          (saturation < 0.15 and brightness < 0.80)):
+    elif ((saturation < limits['dark_grey_saturation'] and
+           brightness < limits['dark_grey_brightness']) or
+          (saturation < limits['light_grey_saturation'] and
+           brightness < limits['light_grey_brightness'])):
         color = 'grey'
     else:
         color = get_hue_name(hue)
@@ -97,30 +115,122 @@ def get_brightness(rgb):
     return [brightness]
 
 
-def get_most_likely_colors(rgb):
+def rgb_to_hsv_array(rgb):
+    """Convert an array of RGB values to hue, saturation and value arrays.
+
+    This mirrors `colorsys.rgb_to_hsv` operation for operation so that the
+    results are identical to converting each pixel one at a time.
+
+    Args:
+        rgb (numpy.ndarray): The Red, Green, Blue triplets, any extra channels
+            are ignored.
+
+    Returns:
+        Tuple[numpy.ndarray]: The hue, saturation and value arrays.
+    """
+    rgb = np.asarray(rgb, dtype=np.float64)[..., 0:3]
+    red, green, blue = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    maxc = rgb.max(axis=-1)
+    minc = rgb.min(axis=-1)
+    rangec = maxc - minc
+    achromatic = rangec == 0
+
+    # Avoid dividing by zero, the achromatic values are overwritten below.
+    safe_maxc = np.where(achromatic, 1, maxc)
+    safe_rangec = np.where(achromatic, 1, rangec)
+
+    saturation = np.where(achromatic, 0.0, rangec / safe_maxc)
+    red_c = (maxc - red) / safe_rangec
+    green_c = (maxc - green) / safe_rangec
+    blue_c = (maxc - blue) / safe_rangec
+
+    hue = np.where(
+        red == maxc, blue_c - green_c,
+        np.where(green == maxc, 2.0 + red_c - blue_c, 4.0 + green_c - red_c))
+    hue = np.where(achromatic, 0.0, np.mod(hue / 6.0, 1.0))
+
+    return hue, saturation, maxc
+
+
+def get_color_codes(rgb):
+    """Get the integer color codes for an array of RGB values.
+
+    The vectorized equivalent of `get_color`, it applies the same thresholds
+    to every pixel at once.
+
+    Args:
+        rgb (numpy.ndarray): The Red, Green, Blue triplets.
+
+    Returns:
+        numpy.ndarray: The color code of each RGB value.
+
+    Raises:
+        ColorException: If a hue isn't in any color range.
+    """
+    hsv = rgb_to_hsv_array(rgb)
+    hue = (hsv[0] * 360).astype(int)
+    saturation = hsv[1]
+    brightness = hsv[2] / 255
+    limits = COLOR_THRESHOLDS
+
+    black = brightness < limits['black_brightness']
+    white = ((saturation < limits['white_saturation']) &
+             (brightness > limits['white_brightness']))
+    grey = (((saturation < limits['dark_grey_saturation']) &
+             (brightness < limits['dark_grey_brightness'])) |
+            ((saturation < limits['light_grey_saturation']) &
+             (brightness < limits['light_grey_brightness'])))
+
+    codes = HUE_CODES[hue]
+    hue_not_found = (codes == 255) & ~(black | white | grey)
+
+    if hue_not_found.any():
+        raise ColorException(f"Hue {hue[hue_not_found][0]} not found.")
+
+    codes = np.where(grey, COLOR_CODES['grey'], codes)
+    codes = np.where(white, COLOR_CODES['white'], codes)
+    codes = np.where(black, COLOR_CODES['black'], codes)
+
+    return codes.astype(np.uint8)
+
+
+def get_colors(rgb):
+    """Get the names of the colors for an array of RGB values.
+
+    Args:
+        rgb (numpy.ndarray): The Red, Green, Blue triplets.
+
+    Returns:
+        numpy.ndarray: The color name for each RGB value.
+    """
+    return CODE_NAMES[get_color_codes(rgb)]
+
+
+def get_brightnesses(rgb):
+    """Get the brightness percentage for an array of RGB values.
+
+    The vectorized equivalent of `get_brightness`.
+
+    Args:
+        rgb (numpy.ndarray): The Red, Green, Blue triplets.
+
+    Returns:
+        numpy.ndarray: The brightness percentage of each pixel.
+    """
+    return rgb_to_hsv_array(rgb)[2] / 255
+
+
+def get_most_likely_colors(rgb, k=3):
     """Get the name of a color for a RGB value.
 
     Resolve the three closest human readable names for a RBG value.
 
     Args:
         rgb (List[int]): The Red, Green, Blue triplet.
+        k (int): The number of names to return.
 
     Returns:
         List[str]: The closest color names from the RGB value.
     """
-    min_colors = {}
-
-    for key, name in webcolors.css3_hex_to_names.items():
-        r_c, g_c, b_c = webcolors.hex_to_rgb(key)
-        rd = (r_c - rgb[0])**2
-        gd = (g_c - rgb[1])**2
-        bd = (b_c - rgb[2])**2
-        min_colors[(rd + gd + bd)] = name
-
-    # Sort the keys based on the minimum values, indicating liklihood.
-    min_colors = [
-        min_colors[key] for key in sorted(min_colors.keys(), reverse=False)
-    ]
-
-    # Return the 3 most likely colors in order of likelihood.
-    return min_colors[:3]
+    # Return the most likely colors in order of likelihood.
+    return CSS3_INDEX.query(rgb, k).tolist()
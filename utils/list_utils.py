@@ -1,5 +1,6 @@
 from itertools import groupby
 from collections import Counter
+import numpy as np
 
 
 def left_strip(elements, element_to_strip):
@@ -145,6 +146,68 @@ def shift_slice(unshifted_list, element_to_shift_on):
     return unshifted_list
 
 
+def collapse_codes(codes, center_code):
+    """Collapse an array of integer codes into a sequence.
+
+    Gives the same result as `collapse_list`, but the runs and delimiters are
+    found with array operations. The codes are rotated to start at the first
+    center code, so a segment that wraps around the end of the ring is
+    counted once. The most common code of each segment is found by counting
+    every (segment, code) pair at once, ties going to the code that occurs
+    first in the segment.
+
+    Args:
+        codes (numpy.ndarray): The non negative integer codes.
+        center_code (int): The code of the center color.
+
+    Returns:
+        numpy.ndarray: The collapsed sequence of codes.
+
+    Example:
+        >>> collapse_codes(np.array([1, 2, 2, 1, 3, 1]), 1)
+        array([2, 3])
+    """
+    codes = np.asarray(codes)
+    is_center = codes == center_code
+
+    if not is_center.any():
+        # If the ring is solid just group the adjacent codes.
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = codes[1:] != codes[:-1]
+
+        return codes[keep]
+
+    # Rotate the codes so that they start with the center code.
+    first = int(is_center.argmax())
+    codes = np.concatenate((codes[first:], codes[:first]))
+    is_center = np.concatenate((is_center[first:], is_center[:first]))
+
+    # Every run of codes after a center code starts a new segment.
+    starts = np.zeros(len(codes), dtype=bool)
+    starts[1:] = is_center[:-1] & ~is_center[1:]
+    segments = np.cumsum(starts)[~is_center] - 1
+    values = codes[~is_center]
+
+    if not len(values):
+        return values
+
+    # Give every (segment, code) pair a key, then find how often each key
+    # occurs and where it first occurs.
+    size = int(values.max()) + 1
+    keys, first_seen, counts = np.unique(
+        segments * size + values, return_index=True, return_counts=True)
+
+    # Sort the pairs by segment, then most common, then first occurence, and
+    # take the first pair of each segment.
+    pair_segments = keys // size
+    order = np.lexsort((first_seen, -counts, pair_segments))
+    pair_segments = pair_segments[order]
+    take = np.ones(len(order), dtype=bool)
+    take[1:] = pair_segments[1:] != pair_segments[:-1]
+
+    return (keys % size)[order][take]
+
+
 def collapse(colors, center_color):
     """Collapse the colors into a sequence.
 
@@ -157,6 +220,40 @@ def collapse(colors, center_color):
     The end result being a list of one color per dash in the sequence and
     all of the delimiting colors removed.
 
+    The colors are numbered and collapsed with `collapse_codes`.
+
+    Args:
+        List[str]: The sequence of colors from the image.
+
+    Returns:
+        List[str]: The collapsed sequence of colors.
+    """
+    if not len(colors):
+        return []
+
+    names, codes = np.unique(np.asarray(colors), return_inverse=True)
+    center = np.flatnonzero(names == center_color)
+    center_code = center[0] if len(center) else -1
+
+    return names[collapse_codes(codes.reshape(-1), center_code)].tolist()
+
+
+def collapse_list(colors, center_color):
+    """Collapse the colors into a sequence, one list operation at a time.
+
+    Note:
+        This is quadratic in the worst case, it is kept as the reference for
+        `collapse`, which gives the same result from arrays.
+
+    The numbers of colors in the list will be determined by how many points
+    were sampled from the image so we need to collapse them into one color
+    per distinct change in color. A distinct change in color is indicated by
+    changing from the delimiting color (center color) to a new color and
+    back to the delimiting color. The max of each of these groups is taken
+    in cause there is a small margin of error in the color identification.
+    The end result being a list of one color per dash in the sequence and
+    all of the delimiting colors removed.
+
     Args:
         List[str]: The sequence of colors from the image.
 
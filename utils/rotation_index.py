@@ -0,0 +1,79 @@
+from utils.string_utils import canonical_rotation
+
+
+class RotationIndex:
+    """An index of codes that can be looked up from any of their rotations.
+
+    Each code is stored under its canonical (minimal) rotation, so a scanned
+    sequence only has to be canonicalised once to find its code with a single
+    hash lookup, however many codes there are.
+
+    Truncated sequences are found through a second map of code fragments. A
+    code of length n matches a fragment if any of its n - 2 long cyclic
+    windows appears in the code.
+    """
+
+    def __init__(self, codes):
+        self.order = {}
+        self.rotations = {}
+        self.fragments = {}
+
+        for order, code in enumerate(codes):
+            self.order[code] = order
+            self.rotations.setdefault(canonical_rotation(code), code)
+
+            fragment_length = max(len(code) - 2, 0)
+            fragments = self.fragments.setdefault(fragment_length, {})
+
+            for start in range(len(code) - fragment_length + 1):
+                fragment = code[start:start + fragment_length]
+                fragments.setdefault(fragment, []).append(code)
+
+    def __len__(self):
+        return len(self.order)
+
+    def find_rotation(self, code):
+        """Find the indexed code that is a rotation of the given code.
+
+        Args:
+            code (str): The scanned code.
+
+        Returns:
+            str: The indexed code or an empty string.
+        """
+        return self.rotations.get(canonical_rotation(code), '')
+
+    def find_truncated(self, code):
+        """Find the indexed code that contains a truncated rotation of the code.
+
+        Check the cyclic windows of the code in the same order as rotating it
+        one character at a time. When several codes match the same window the
+        first indexed one is returned.
+
+        Args:
+            code (str): The scanned code.
+
+        Returns:
+            str: The indexed code or an empty string.
+        """
+        doubled = code + code
+
+        for rotation in range(1, len(code) + 1):
+            matches = []
+
+            for fragment_length, fragments in self.fragments.items():
+                # The code has to be at most one character shorter than the
+                # codes that the fragment was taken from.
+                if len(code) < fragment_length + 1:
+                    continue
+
+                window = doubled[rotation:rotation + fragment_length]
+                matches += [
+                    match for match in fragments.get(window, ())
+                    if len(code) >= len(match) - 1
+                ]
+
+            if matches:
+                return min(matches, key=self.order.get)
+
+        return ''
@@ -23,3 +23,63 @@ def are_rotations(string1, string2):
         return True
 
     return False
+
+
+def least_rotation(string):
+    """Return the index of the lexicographically minimal rotation of a string.
+
+    Uses Booth's algorithm, which finds the rotation in O(n) by running the
+    Knuth-Morris-Pratt failure function over the doubled string.
+
+    Examples:
+        >>> least_rotation("cab")
+        1
+
+    Args:
+        string (str): The string to rotate.
+
+    Returns:
+        int: The index the minimal rotation starts at.
+    """
+    doubled = string + string
+    failure = [-1] * len(doubled)
+    start = 0
+
+    for end in range(1, len(doubled)):
+        char = doubled[end]
+        index = failure[end - start - 1]
+
+        while index != -1 and char != doubled[start + index + 1]:
+            if char < doubled[start + index + 1]:
+                start = end - index - 1
+            index = failure[index]
+
+        if char != doubled[start + index + 1]:
+            if char < doubled[start]:
+                start = end
+            failure[end - start] = -1
+        else:
+            failure[end - start] = index + 1
+
+    return start
+
+
+def canonical_rotation(string):
+    """Return the lexicographically minimal rotation of a string.
+
+    Every rotation of a string has the same canonical rotation, so it can be
+    used as a key to look up a string regardless of where it starts.
+
+    Examples:
+        >>> canonical_rotation("cdab")
+        'abcd'
+
+    Args:
+        string (str): The string to rotate.
+
+    Returns:
+        str: The minimal rotation.
+    """
+    start = least_rotation(string)
+
+    return string[start:] + string[:start]